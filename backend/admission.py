@@ -0,0 +1,97 @@
+"""
+Admission control for scarce scraping resources.
+
+Headless Chrome instances and detail-page fetches are limited across all
+job workers, and across every API process that shares ``lock_dir`` (e.g.
+``uvicorn --workers N``). Each slot is a lock file, and holding a slot means
+holding an exclusive ``flock`` on it. The kernel drops that lock when its
+process exits, so a slot held by a killed or crashed worker is free again
+right away instead of being lost until a restart.
+
+The API process turns its config into limits that the executor's pool
+initializer installs in every worker. A job that cannot get a slot waits
+(and stays cancellable) instead of starting yet another browser, so heavy
+load slows jobs down rather than exhausting the container's memory.
+
+Outside the job workers (scripts, tests) no limits are installed and the
+slots are free, as they are on platforms without ``fcntl``.
+
+A relative ``lock_dir`` is resolved against the project root, so every
+process shares the same slots whatever its working directory.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# How often a waiting job retries the slot files
+_POLL_S = 0.2
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_LOCK_DIR = None
+_MAX_BROWSERS = 0
+_MAX_FETCHES = 0
+
+
+def create_limits(settings: dict) -> tuple:
+    """Limits for ``settings`` ({"lock_dir": path, "max_browsers": int, "max_fetches": int}).
+
+    Returns:
+        (lock_dir, max_browsers, max_fetches), the arguments of install_limits.
+    """
+    lock_dir = os.path.normpath(os.path.join(_ROOT, settings.get("lock_dir", "./cache/admission")))
+    os.makedirs(lock_dir, exist_ok=True)
+    if fcntl is None:
+        print("  [admission] fcntl unavailable; browser and fetch slots are not limited")
+    return lock_dir, settings.get("max_browsers", 2), settings.get("max_fetches", 8)
+
+
+def install_limits(lock_dir, max_browsers: int, max_fetches: int):
+    """Use the limits from create_limits in this process."""
+    global _LOCK_DIR, _MAX_BROWSERS, _MAX_FETCHES
+    _LOCK_DIR, _MAX_BROWSERS, _MAX_FETCHES = lock_dir, max_browsers, max_fetches
+
+
+def _acquire(kind: str, count: int, cancel=None) -> int:
+    """File descriptor holding the lock of one free ``kind`` slot; waits for one."""
+    paths = [os.path.join(_LOCK_DIR, f"{kind}-{i}.lock") for i in range(count)]
+    while True:
+        for path in paths:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return fd
+            except BlockingIOError:
+                os.close(fd)
+        if cancel:
+            cancel.raise_if_cancelled()
+        time.sleep(_POLL_S)
+
+
+@contextmanager
+def _slot(kind: str, count: int, cancel=None):
+    if _LOCK_DIR is None or not count or fcntl is None:
+        yield
+        return
+    fd = _acquire(kind, count, cancel)
+    try:
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+def browser_slot(cancel=None):
+    """Hold one of the ``max_browsers`` browser slots for the enclosed block."""
+    return _slot("browser", _MAX_BROWSERS, cancel)
+
+
+def fetch_slot(cancel=None):
+    """Hold one of the ``max_fetches`` detail-fetch slots for the enclosed block."""
+    return _slot("fetch", _MAX_FETCHES, cancel)
@@ -0,0 +1,84 @@
+"""
+Dynamic micro-batching for low-latency endpoints.
+
+Concurrent callers each submit one item; a single worker task collects
+whatever is queued (waiting at most ``max_wait_ms`` for more once the first
+item arrives), runs the blocking batch function in a thread and hands every
+caller its own result. Under load batches fill up and throughput scales;
+a lone request only pays the short wait window.
+
+When a batch raises, its items are run again one at a time, so only the
+caller whose item fails gets the exception.
+"""
+
+import asyncio
+
+
+class MicroBatcher:
+    def __init__(self, batch_fn, max_batch_size: int = 32, max_wait_ms: float = 10):
+        """
+        Args:
+            batch_fn:        Blocking callable(list[item]) -> list[result],
+                             one result per item, in order.
+            max_batch_size:  Upper bound on items per call of batch_fn.
+            max_wait_ms:     How long to wait for more items after the first.
+        """
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = None
+        self._worker = None
+
+    def _ensure_worker(self):
+        # Created lazily so the queue and task belong to the serving event loop
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, item):
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _collect(self) -> list:
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _call(self, batch: list):
+        """Run batch_fn over ``batch`` and resolve its futures."""
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(None, self.batch_fn, [item for item, _ in batch])
+        except Exception as exc:
+            if len(batch) == 1:
+                future = batch[0][1]
+                if not future.done():
+                    future.set_exception(exc)
+                return
+            # Isolate the failing item instead of failing every caller
+            for pair in batch:
+                await self._call([pair])
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _run(self):
+        while True:
+            await self._call(await self._collect())
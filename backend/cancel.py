@@ -0,0 +1,123 @@
+"""
+Cooperative job cancellation and timeouts.
+
+A CancelToken is created per running job. A watcher thread polls the job
+store for a cancel request (set by ``DELETE /api/jobs/{id}``) and checks the
+job and stage deadlines. Once the token fires, registered callbacks release
+resources right away (quit the browser, stop the pipeline queues) and the
+job code raises JobCancelled at its next check.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+
+class JobCancelled(Exception):
+    """The job was cancelled; it should unwind and release its resources."""
+
+
+class JobTimeout(JobCancelled):
+    """The job, or one of its stages, ran past its configured timeout."""
+
+
+class CancelToken:
+    def __init__(self, is_cancelled=None, timeout: float = None, poll_interval: float = 1.0):
+        """
+        Args:
+            is_cancelled:   Optional callable() -> bool, polled by the watcher.
+            timeout:        Seconds before the whole job times out, or None.
+            poll_interval:  Seconds between polls of ``is_cancelled``.
+        """
+        self._is_cancelled = is_cancelled
+        self._poll_interval = poll_interval
+        self._fired = threading.Event()
+        self._closed = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+        self._deadlines = {}  # name → (deadline, timeout)
+        self.error = None
+        if timeout:
+            self._deadlines["job"] = (time.monotonic() + timeout, timeout)
+        self._watcher = threading.Thread(target=self._watch, name="cancel-watcher", daemon=True)
+        self._watcher.start()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._fired.is_set()
+
+    def cancel(self, error: JobCancelled = None):
+        with self._lock:
+            if self._fired.is_set():
+                return
+            self.error = error or JobCancelled("Cancelled")
+            self._fired.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as exc:
+                print(f"  [cancel] cleanup failed: {exc}")
+
+    def raise_if_cancelled(self):
+        if self._fired.is_set():
+            raise self.error
+
+    def on_cancel(self, callback):
+        """Run ``callback`` once the token fires (immediately if it already has).
+
+        Returns:
+            A function that unregisters the callback.
+        """
+        with self._lock:
+            if not self._fired.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._unregister(callback)
+        callback()
+        return lambda: None
+
+    def _unregister(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    @contextmanager
+    def stage(self, name: str, timeout: float = None):
+        """Time out when the enclosed block runs longer than ``timeout`` seconds."""
+        if timeout:
+            with self._lock:
+                self._deadlines[name] = (time.monotonic() + timeout, timeout)
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._deadlines.pop(name, None)
+        self.raise_if_cancelled()
+
+    def close(self):
+        self._closed.set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _watch(self):
+        # The first check runs immediately, so a job cancelled while it was
+        # still queued stops before doing any work
+        while not self._fired.is_set():
+            with self._lock:
+                expired = [(name, timeout) for name, (deadline, timeout) in self._deadlines.items()
+                           if time.monotonic() >= deadline]
+            if expired:
+                name, timeout = expired[0]
+                self.cancel(JobTimeout(f"{name} timed out after {timeout:g}s"))
+            elif self._is_cancelled is not None:
+                try:
+                    if self._is_cancelled():
+                        self.cancel(JobCancelled("Cancelled by user"))
+                except Exception as exc:
+                    print(f"  [cancel] could not poll cancel flag: {exc}")
+            if self._closed.wait(self._poll_interval):
+                return
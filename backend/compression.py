@@ -0,0 +1,135 @@
+"""
+Response compression for JSON payloads, negotiated with Accept-Encoding.
+
+Only JSON and NDJSON bodies are compressed: Server-Sent Events must reach
+the client unbuffered, and the CSV/Parquet/Excel downloads are served as
+they are. Brotli is used when the ``brotli`` package is installed and the
+client accepts it, gzip otherwise. Streamed bodies (NDJSON) are compressed
+chunk by chunk with a flush after each, so rows still arrive as they are
+produced.
+"""
+
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def _accepted(header: str) -> dict:
+    """{coding: q} from an Accept-Encoding header."""
+    codings = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding:
+            codings[coding.strip().lower()] = q
+    return codings
+
+
+def negotiate(header: str):
+    """The coding to use for ``header``: "br", "gzip" or None."""
+    codings = _accepted(header)
+    for coding in (("br", "gzip") if brotli is not None else ("gzip",)):
+        if codings.get(coding, codings.get("*", 0)) > 0:
+            return coding
+    return None
+
+
+class _Gzip:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+class _Brotli:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.finish()
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing JSON/NDJSON responses of at least ``minimum_size`` bytes."""
+
+    MEDIA_TYPES = ("application/json", "application/x-ndjson")
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        coding = negotiate(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _Responder(self, coding, send).send)
+
+
+class _Responder:
+    def __init__(self, middleware: CompressionMiddleware, coding: str, send):
+        self.middleware = middleware
+        self.coding = coding
+        self._send = send
+        self._start = None
+        self._compressor = None
+        self._passthrough = False
+
+    def _eligible(self, headers: list) -> bool:
+        values = {name.lower(): value for name, value in headers}
+        media_type = values.get(b"content-type", b"").decode("latin-1").split(";")[0].strip()
+        return media_type in CompressionMiddleware.MEDIA_TYPES and b"content-encoding" not in values
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            if self._eligible(message.get("headers", [])):
+                self._start = message  # sent with the first body chunk
+            else:
+                self._passthrough = True
+                await self._send(message)
+            return
+        if self._passthrough or message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self._compressor is None:
+            if not more_body and len(body) < self.middleware.minimum_size:
+                # Too small to be worth it; send unchanged
+                self._passthrough = True
+                await self._send(self._start)
+                await self._send(message)
+                return
+            self._compressor = (_Brotli(self.middleware.brotli_quality) if self.coding == "br"
+                                else _Gzip(self.middleware.gzip_level))
+            headers = [(name, value) for name, value in self._start.get("headers", [])
+                       if name.lower() != b"content-length"]
+            headers += [(b"content-encoding", self.coding.encode()), (b"vary", b"Accept-Encoding")]
+            await self._send({**self._start, "headers": headers})
+
+        data = self._compressor.chunk(body) if more_body else self._compressor.finish(body)
+        await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
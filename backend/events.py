@@ -0,0 +1,92 @@
+"""
+Job events — push job progress to Server-Sent Events subscribers.
+
+Worker processes put ``(job_id, fields)`` on a multiprocessing queue after
+each job store update (see backend.jobs.init_worker). A listener thread in
+the API process fans them out to the subscribers of that job, each of which
+keeps only the merged latest state, so a burst of progress updates reaches
+a client as a single event.
+
+Events only reach the API process that runs the executor; streams served by
+other workers fall back to re-reading the job store every few seconds.
+
+The same queue carries the workers' metrics snapshots (see backend.metrics),
+kept here per worker process for GET /metrics.
+"""
+
+import asyncio
+import multiprocessing
+import threading
+
+# Queue messages are (job_id, fields), or (METRICS, (pid, snapshot))
+METRICS = "__metrics__"
+
+
+class _Subscriber:
+    def __init__(self, loop):
+        self.loop = loop
+        self.changed = asyncio.Event()
+        self.pending = {}
+
+    def push(self, fields: dict):
+        # Runs on the loop thread: merge so only the latest values are sent
+        self.pending.update(fields)
+        self.changed.set()
+
+    def take(self) -> dict:
+        fields, self.pending = self.pending, {}
+        self.changed.clear()
+        return fields
+
+
+class JobEvents:
+    def __init__(self):
+        # spawn context to match the executor's worker pools
+        self.queue = multiprocessing.get_context("spawn").Queue()
+        self._subscribers = {}  # job_id → set of _Subscriber
+        self._lock = threading.Lock()
+        self._listener = None
+        self.worker_metrics = {}  # pid → latest metrics snapshot of that worker
+
+    def start(self):
+        if self._listener is None:
+            self._listener = threading.Thread(target=self._listen, name="job-events", daemon=True)
+            self._listener.start()
+
+    def stop(self):
+        if self._listener is not None:
+            self.queue.put(None)
+            self._listener.join(timeout=5)
+            self._listener = None
+
+    def _listen(self):
+        while True:
+            event = self.queue.get()
+            if event is None:
+                return
+            if event[0] == METRICS:
+                pid, snapshot = event[1]
+                self.worker_metrics[pid] = snapshot
+            else:
+                self.publish(*event)
+
+    def publish(self, job_id: str, fields: dict):
+        """Deliver ``fields`` to every subscriber of ``job_id`` (any thread)."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(job_id, ()))
+        for subscriber in subscribers:
+            subscriber.loop.call_soon_threadsafe(subscriber.push, dict(fields))
+
+    def subscribe(self, job_id: str) -> _Subscriber:
+        """Register a subscriber on the running event loop; pair with unsubscribe."""
+        subscriber = _Subscriber(asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.setdefault(job_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, job_id: str, subscriber: _Subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(job_id, set())
+            subscribers.discard(subscriber)
+            if not subscribers:
+                self._subscribers.pop(job_id, None)
@@ -0,0 +1,155 @@
+"""
+Job executor — dedicated process pools per job class.
+
+Selenium, spaCy and the classifier used to run as FastAPI BackgroundTasks
+in the API's threadpool, competing with request handling under the GIL.
+Each job class (scrape, predict, ingest) now gets its own process pool with
+a configurable number of workers, fed from a bounded FIFO queue kept here
+so queue positions are known and queued jobs can be dropped cheaply.
+Worker processes are long-lived, so the predict pool keeps models warm.
+"""
+
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+
+class QueueFull(Exception):
+    """Raised when a job class already has ``max_queued`` jobs waiting."""
+
+
+class _JobClass:
+    def __init__(self, name: str, workers: int, max_queued: int):
+        self.name = name
+        self.workers = workers
+        self.max_queued = max_queued
+        self.pending = deque()  # (job_id, fn, args)
+        self.running = set()
+        self.pool = None
+
+
+class JobExecutor:
+    def __init__(self, settings: dict, on_error=None, initializer=None, initargs=()):
+        """
+        Args:
+            settings:     {job_class: {"workers": int, "max_queued": int}}
+            on_error:     Optional callable(job_id, exception) for jobs whose
+                          worker died before the runner could record the error.
+            initializer:  Optional callable(*initargs) run in every new worker.
+        """
+        # spawn: never fork the API process with its threads and sockets
+        self._context = multiprocessing.get_context("spawn")
+        # Re-entrant: a future that is already done runs its callback inline
+        self._lock = threading.RLock()
+        self._on_error = on_error
+        self._initializer = initializer
+        self._initargs = initargs
+        self._classes = {
+            name: _JobClass(name, cfg.get("workers", 1), cfg.get("max_queued", 20))
+            for name, cfg in settings.items()
+        }
+
+    def submit(self, job_class: str, job_id: str, fn, *args) -> int:
+        """Queue ``fn(job_id, *args)``; returns the job's queue position (0 = started).
+
+        ``fn`` must be a module-level function so it can be sent to a worker.
+        """
+        cls = self._classes[job_class]
+        with self._lock:
+            if len(cls.pending) >= cls.max_queued:
+                raise QueueFull(f"Too many queued {job_class} jobs")
+            cls.pending.append((job_id, fn, args))
+            self._dispatch(cls)
+            return self._position(cls, job_id)
+
+    def position(self, job_id: str):
+        """1-based position of a queued job, 0 when running, None when unknown."""
+        with self._lock:
+            for cls in self._classes.values():
+                position = self._position(cls, job_id)
+                if position is not None:
+                    return position
+        return None
+
+    def cancel(self, job_id: str) -> bool:
+        """Drop a job that is still queued; False when it is running or unknown."""
+        with self._lock:
+            for cls in self._classes.values():
+                for entry in cls.pending:
+                    if entry[0] == job_id:
+                        cls.pending.remove(entry)
+                        return True
+        return False
+
+    def job_ids(self) -> list:
+        """Ids of the jobs queued or running in this executor."""
+        with self._lock:
+            return [job_id for cls in self._classes.values()
+                    for job_id in [*cls.running, *(entry[0] for entry in cls.pending)]]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                name: {"workers": cls.workers, "running": len(cls.running),
+                       "queued": len(cls.pending)}
+                for name, cls in self._classes.items()
+            }
+
+    def shutdown(self) -> list:
+        """Drop the queued jobs and stop the pools; returns the dropped job ids."""
+        dropped = []
+        with self._lock:
+            for cls in self._classes.values():
+                dropped += [entry[0] for entry in cls.pending]
+                cls.pending.clear()
+                if cls.pool is not None:
+                    cls.pool.shutdown(wait=False, cancel_futures=True)
+                    cls.pool = None
+        return dropped
+
+    # ── internals (called with self._lock held) ──────────────────────────────
+
+    @staticmethod
+    def _position(cls: _JobClass, job_id: str):
+        if job_id in cls.running:
+            return 0
+        for i, (pending_id, _, _) in enumerate(cls.pending):
+            if pending_id == job_id:
+                return i + 1
+        return None
+
+    def _pool(self, cls: _JobClass) -> ProcessPoolExecutor:
+        if cls.pool is None:
+            cls.pool = ProcessPoolExecutor(
+                max_workers=cls.workers, mp_context=self._context,
+                initializer=self._initializer, initargs=self._initargs,
+            )
+        return cls.pool
+
+    def _dispatch(self, cls: _JobClass):
+        while cls.pending and len(cls.running) < cls.workers:
+            job_id, fn, args = cls.pending.popleft()
+            try:
+                future = self._pool(cls).submit(fn, job_id, *args)
+            except BrokenProcessPool:
+                cls.pool = None
+                future = self._pool(cls).submit(fn, job_id, *args)
+            cls.running.add(job_id)
+            future.add_done_callback(
+                lambda f, cls=cls, job_id=job_id: self._finished(cls, job_id, f)
+            )
+
+    def _finished(self, cls: _JobClass, job_id: str, future):
+        exc = None if future.cancelled() else future.exception()
+        if exc is not None:
+            # Runners record their own errors; this only catches crashed workers
+            print(f"  [executor] {cls.name} job {job_id} failed: {exc}")
+            if self._on_error is not None:
+                self._on_error(job_id, exc)
+        with self._lock:
+            cls.running.discard(job_id)
+            if isinstance(exc, BrokenProcessPool):
+                cls.pool = None  # replaced on the next dispatch
+            self._dispatch(cls)
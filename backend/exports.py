@@ -0,0 +1,91 @@
+"""
+Job result exports — CSV, Parquet and Excel, built on download.
+
+Exports are generated from a job's Arrow result file the first time a format
+is requested and kept next to the results, so later downloads are plain file
+responses. CSV and Parquet are streamed to the client while they are
+written. An Excel workbook is a zip that openpyxl only assembles once the
+sheet is complete, so an xlsx download is built first and then served; its
+first byte waits for the whole export. Nested columns (``articles``) are
+exported as the JSON text they are stored as.
+"""
+
+import os
+import uuid
+
+import pyarrow as pa
+
+from .results import iter_batches, read_schema
+
+# format → (media type, file extension)
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", ".csv"),
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", ".xlsx"),
+}
+
+_CHUNK_SIZE = 1 << 20
+
+
+def export_path(exports_dir: str, job_id: str, fmt: str) -> str:
+    return os.path.join(exports_dir, job_id + EXPORT_FORMATS[fmt][1])
+
+
+# ── Writers — each yields once per record batch written ──────────────────────
+
+def _write_csv(result_ref: str, path: str):
+    from pyarrow import csv
+
+    with pa.OSFile(path, "wb") as sink, csv.CSVWriter(sink, read_schema(result_ref)) as writer:
+        for batch in iter_batches(result_ref):
+            writer.write_batch(batch)
+            yield
+
+
+def _write_parquet(result_ref: str, path: str):
+    import pyarrow.parquet as pq
+
+    with pa.OSFile(path, "wb") as sink, pq.ParquetWriter(sink, read_schema(result_ref)) as writer:
+        for batch in iter_batches(result_ref):
+            writer.write_batch(batch)
+            yield
+
+
+def _write_xlsx(result_ref: str, path: str):
+    from openpyxl import Workbook
+
+    # Write-only mode keeps one row in memory; the zip, and with it every
+    # byte of the file, is only written by save()
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(read_schema(result_ref).names)
+    for batch in iter_batches(result_ref):
+        columns = [column.to_pylist() for column in batch.columns]
+        for row in zip(*columns):
+            sheet.append(row)
+        yield
+    workbook.save(path)
+
+
+_WRITERS = {"csv": _write_csv, "parquet": _write_parquet, "xlsx": _write_xlsx}
+
+
+def stream_export(result_ref: str, path: str, fmt: str):
+    """Write the ``fmt`` export of ``result_ref`` to ``path``, yielding its bytes.
+
+    Bytes are yielded as the writer produces them (for xlsx: all at the
+    end); ``path`` only appears once the export is complete, so an
+    interrupted download leaves no cache entry.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    open(tmp_path, "wb").close()
+    try:
+        with open(tmp_path, "rb") as written:
+            for _ in _WRITERS[fmt](result_ref, tmp_path):
+                yield from iter(lambda: written.read(_CHUNK_SIZE), b"")
+            yield from iter(lambda: written.read(_CHUNK_SIZE), b"")
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -0,0 +1,360 @@
+"""
+Background jobs — scrape, predict and ingest.
+
+The runners only talk to the shared job store and the filesystem, so they
+can run in any process: backend.executor starts them in dedicated worker
+pools, away from the API's event loop and request threadpool.
+"""
+
+import json
+import os
+import time
+import uuid
+from datetime import date, datetime
+
+from .admission import install_limits
+from .cancel import CancelToken, JobCancelled, JobTimeout
+from .events import METRICS as METRICS_EVENT
+from .job_store import open_job_store
+from .metrics import REGISTRY, JobMetrics
+from .results import ResultWriter, iter_results, result_path, write_results
+
+# ---------------------------------------------------------------------------
+# Config
+# ---------------------------------------------------------------------------
+_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+with open(os.path.join(_root, "config.json")) as f:
+    CONFIG = json.load(f)
+
+# ---------------------------------------------------------------------------
+# Job store — shared by every uvicorn worker; results are stored by reference
+# ---------------------------------------------------------------------------
+RESULTS_DIR = os.path.abspath(os.environ.get("JOB_RESULTS_DIR") or os.path.join(_root, "job_results"))
+EXPORTS_DIR = os.path.join(RESULTS_DIR, "exports")
+
+JOB_STORE_URL = (os.environ.get("JOB_STORE_URL")
+                 or "sqlite:///" + os.path.join(RESULTS_DIR, "jobs.sqlite3"))
+JOBS = open_job_store(JOB_STORE_URL)
+
+
+# ---------------------------------------------------------------------------
+# Worker setup — run in every worker process by the executor's pool initializer
+# ---------------------------------------------------------------------------
+_EVENTS = None
+_METRICS_PUBLISHED = 0.0
+_METRICS_INTERVAL_S = 5
+
+
+def init_worker(events_queue, limits):
+    """Pool initializer: publish job updates to the API and share its resource limits."""
+    global _EVENTS
+    _EVENTS = events_queue
+    install_limits(*limits)
+
+
+def update_job(job_id: str, **fields):
+    """Update the job store and push the change to event subscribers."""
+    JOBS.update(job_id, **fields)
+    if _EVENTS is not None:
+        _EVENTS.put((job_id, fields))
+        if time.monotonic() - _METRICS_PUBLISHED >= _METRICS_INTERVAL_S:
+            publish_metrics()
+
+
+def publish_metrics():
+    """Send this worker's cumulative metrics to the API process for /metrics."""
+    global _METRICS_PUBLISHED
+    if _EVENTS is not None:
+        _METRICS_PUBLISHED = time.monotonic()
+        _EVENTS.put((METRICS_EVENT, (os.getpid(), REGISTRY.snapshot())))
+
+
+def _cancel_token(job_id: str) -> CancelToken:
+    """Token that fires on DELETE /api/jobs/{id} or when the job times out.
+
+    Its watcher also refreshes the job's ``heartbeat_at`` every
+    ``heartbeat_s``, so the API does not reap a running job as stale.
+    """
+    heartbeat_s = CONFIG.get("timeouts", {}).get("heartbeat_s", 30)
+    last_beat = [0.0]
+
+    def poll():
+        if time.monotonic() - last_beat[0] >= heartbeat_s:
+            last_beat[0] = time.monotonic()
+            JOBS.update(job_id, heartbeat_at=time.time())
+        return (JOBS.get(job_id) or {}).get("cancel_requested", False)
+
+    return CancelToken(poll, timeout=CONFIG.get("timeouts", {}).get("job_s"))
+
+
+def _stage(cancel: CancelToken, name: str):
+    return cancel.stage(name, CONFIG.get("timeouts", {}).get(f"{name}_s"))
+
+
+def _fail(job_id: str, exc: Exception, job_metrics: JobMetrics):
+    status = "cancelled" if isinstance(exc, JobCancelled) and not isinstance(exc, JobTimeout) else "error"
+    update_job(job_id, status=status, error=str(exc), metrics=job_metrics.finish(status))
+
+
+# ---------------------------------------------------------------------------
+# Lazy subsystems
+# ---------------------------------------------------------------------------
+_LAW_STORE_AVAILABLE = None
+
+
+def law_store_available() -> bool:
+    """Whether the law DB can be used: psycopg2 imports and law_store.configured()."""
+    global _LAW_STORE_AVAILABLE
+    if _LAW_STORE_AVAILABLE is None:
+        try:
+            from . import law_store
+            _LAW_STORE_AVAILABLE = law_store.configured()
+            if not _LAW_STORE_AVAILABLE:
+                print(f"  [law-store] not configured (set {', '.join(law_store.REQUIRED_ENV)})")
+        except Exception:
+            _LAW_STORE_AVAILABLE = False
+    return _LAW_STORE_AVAILABLE
+
+
+def scrape_cache():
+    """Process-wide ScrapeCache from ``CONFIG["scraping"]["cache"]``, or None."""
+    settings = CONFIG["scraping"].get("cache")
+    if not settings:
+        return None
+    from .scrape_cache import ScrapeCache
+    from .sqlite_cache import shared_cache
+
+    return shared_cache(ScrapeCache, settings["path"], min_age_days=settings.get("min_age_days", 1))
+
+
+def model_registry():
+    """Process-wide model registry; starts the artifact watcher on first use."""
+    from .predictor import get_registry
+
+    registry = get_registry(CONFIG["predictions"])
+    registry.start_watching(CONFIG["predictions"].get("reload_interval", 60))
+    return registry
+
+
+# ---------------------------------------------------------------------------
+# Job runners — executed in the worker pools of backend.executor
+# ---------------------------------------------------------------------------
+def run_scrape(job_id: str, start_date: date, end_date: date, doc_types: list):
+    from .scrape_cache import scrape_with_cache
+    from .scraper import scrape_documents
+
+    cancel = _cancel_token(job_id)
+    job_metrics = JobMetrics("scrape")
+
+    def scrape(types, start, end, progress):
+        """(documents, incomplete) of one scrape; see scrape_documents."""
+        incomplete = set()
+        documents = scrape_documents(
+            start_date=datetime.combine(start, datetime.min.time()),
+            end_date=datetime.combine(end, datetime.min.time()),
+            doc_types=types,
+            url_searchpage=CONFIG["scraping"]["url_searchpage"],
+            url_detail_page=CONFIG["scraping"]["url_detail_page"],
+            progress_callback=progress,
+            cancel=cancel,
+            fetch_timeout=CONFIG.get("timeouts", {}).get("fetch_s", 15),
+            incomplete=incomplete,
+        )
+        return documents, incomplete
+
+    def fetch_progress(done, total):
+        update_job(job_id, progress=int(done / total * 100),
+                   progress_text=f"Fetching detail {done}/{total}")
+
+    def days_progress(done, total):
+        update_job(job_id, progress=int(done / total * 100),
+                   progress_text=f"Scraped {int(done)}/{total} days not in the cache")
+
+    try:
+        update_job(job_id, status="scraping", progress_text="Launching browser…")
+
+        cache = scrape_cache()
+        with _stage(cancel, "scrape"):
+            if cache is None:
+                results, _ = scrape(doc_types, start_date, end_date, fetch_progress)
+                cache_stats = None
+            else:
+                # Only days not scraped by an earlier job are fetched
+                results, cache_stats = scrape_with_cache(
+                    cache, start_date, end_date, doc_types, scrape,
+                    progress_callback=days_progress,
+                )
+
+        result_ref = result_path(RESULTS_DIR, job_id)
+        write_results(result_ref, results)
+
+        # Automatically ingest substantive articles into the law DB. The
+        # ingest job is announced with the final status, so a client that
+        # stops listening once the scrape is done still learns about it.
+        ingest_job_id = None
+        if law_store_available():
+            ingest_job_id = str(uuid.uuid4())
+            JOBS.create(ingest_job_id, status="queued", progress_text="Waiting to start…", error=None,
+                        scrape_job_id=job_id)
+
+        update_job(
+            job_id,
+            status="done", progress=100,
+            result_ref=result_ref, count=len(results),
+            export_name=f"{start_date}_{end_date}_scraping_results",
+            ingest_job_id=ingest_job_id,
+            scrape_cache=cache_stats,
+            metrics=job_metrics.finish("done"),
+        )
+
+        if ingest_job_id:
+            run_ingest(ingest_job_id, job_id)
+
+    except Exception as exc:
+        _fail(job_id, exc, job_metrics)
+    finally:
+        cancel.close()
+        publish_metrics()
+
+
+def run_predict(job_id: str, scrape_job_id: str):
+    from .predictor import (
+        cascade_summary, get_lemma_cache, get_prediction_cache, predict_in_batches,
+    )
+
+    def progress(done, total):
+        update_job(job_id, progress=int(done / total * 100),
+                   progress_text=f"Predicted {done}/{total}")
+
+    cancel = _cancel_token(job_id)
+    job_metrics = JobMetrics("predict")
+    try:
+        update_job(job_id, status="running")
+        model_registry()
+        scrape_job = JOBS.get(scrape_job_id) or {}
+
+        if scrape_job.get("status") != "done":
+            raise ValueError("Scrape job is not complete")
+
+        ts = str(datetime.now().timestamp()).replace(".", "_")
+
+        # Rows are streamed to the result file as each micro-batch finishes
+        counts = {}
+        result_ref = result_path(RESULTS_DIR, job_id)
+        with _stage(cancel, "predict"), ResultWriter(result_ref) as writer:
+            # Input rows are read batch by batch from the memory-mapped scrape result
+            for batch in predict_in_batches(iter_results(scrape_job["result_ref"]),
+                                            CONFIG["predictions"],
+                                            progress_callback=progress, stats=counts,
+                                            total=scrape_job.get("count", 0)):
+                writer.write(batch.to_dict(orient="records"))
+                cancel.raise_if_cancelled()
+
+        lemma_cache = get_lemma_cache(CONFIG["predictions"])
+        prediction_cache = get_prediction_cache(CONFIG["predictions"])
+        update_job(
+            job_id,
+            status="done",
+            progress=100,
+            count=writer.count,
+            predicted=counts.get("predicted", 0),
+            cached=counts.get("cached", 0),
+            cascade=cascade_summary(counts) if "cascade_documents" in counts else None,
+            lemma_cache=lemma_cache.stats() if lemma_cache else None,
+            prediction_cache=prediction_cache.stats() if prediction_cache else None,
+            result_ref=result_ref,
+            export_name=f"{ts}_predictions",
+            metrics=job_metrics.finish("done"),
+        )
+    except Exception as exc:
+        _fail(job_id, exc, job_metrics)
+    finally:
+        cancel.close()
+        publish_metrics()
+
+
+def run_pipeline_job(job_id: str, start_date: date, end_date: date, doc_types: list):
+    """Scrape, ingest and predict in one pipelined job (see backend.pipeline)."""
+    from .pipeline import run_pipeline
+    from .predictor import cascade_summary
+
+    def progress(stages):
+        listed, predicted = stages["listed"], stages["predicted"]
+        # The total is only known once the listing stage has finished
+        percent = int(predicted / listed * 100) if stages["listing_done"] and listed else 0
+        update_job(job_id, progress=percent, stages=stages,
+                   progress_text=f"Fetched {stages['fetched']}/{listed}, predicted {predicted}")
+
+    cancel = _cancel_token(job_id)
+    job_metrics = JobMetrics("pipeline")
+    try:
+        update_job(job_id, status="running", progress_text="Launching browser…")
+        model_registry()
+        counts = {}
+        result_ref = result_path(RESULTS_DIR, job_id)
+        with ResultWriter(result_ref) as writer:
+            stages = run_pipeline(start_date, end_date, doc_types, CONFIG, writer,
+                                  ingest=law_store_available(),
+                                  progress_callback=progress, stats=counts, cancel=cancel)
+        update_job(
+            job_id,
+            status="done",
+            progress=100,
+            stages=stages,
+            count=writer.count,
+            predicted=counts.get("predicted", 0),
+            cached=counts.get("cached", 0),
+            cascade=cascade_summary(counts) if "cascade_documents" in counts else None,
+            result_ref=result_ref,
+            export_name=f"{start_date}_{end_date}_pipeline_results",
+            metrics=job_metrics.finish("done"),
+        )
+    except Exception as exc:
+        _fail(job_id, exc, job_metrics)
+    finally:
+        cancel.close()
+        publish_metrics()
+
+
+def run_ingest(job_id: str, scrape_job_id: str):
+    """Embed substantive articles from a completed scrape job and store in law_chunks."""
+    from .law_store import create_table, get_stats, store_chunks
+
+    cancel = _cancel_token(job_id)
+    job_metrics = JobMetrics("ingest")
+    try:
+        update_job(job_id, status="ingesting")
+        scrape_job = JOBS.get(scrape_job_id) or {}
+
+        if scrape_job.get("status") != "done":
+            raise ValueError("Scrape job is not complete")
+
+        to_embed = [r for r in iter_results(scrape_job["result_ref"])
+                    if r.get("embed") and r.get("articles")]
+
+        if not to_embed:
+            update_job(job_id, status="done", chunks_stored=0,
+                       message="No substantive articles found to embed.",
+                       metrics=job_metrics.finish("done"))
+            return
+
+        update_job(job_id, progress_text=f"Embedding {sum(len(r['articles']) for r in to_embed)} chunks…")
+        with _stage(cancel, "ingest"):
+            create_table()
+            stored = store_chunks(to_embed, cancel=cancel)
+        stats  = get_stats()
+
+        update_job(
+            job_id,
+            status="done",
+            chunks_stored=stored,
+            db_total=stats["total_chunks"],
+            message=f"Stored {stored} chunks. DB now has {stats['total_chunks']} law chunks total.",
+            metrics=job_metrics.finish("done"),
+        )
+    except Exception as exc:
+        _fail(job_id, exc, job_metrics)
+    finally:
+        cancel.close()
+        publish_metrics()
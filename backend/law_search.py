@@ -0,0 +1,164 @@
+"""
+Law search — async semantic search over the law_chunks table.
+
+Serves /api/law-search from the event loop: the query is embedded with the
+async OpenAI client and the nearest chunks are read over an asyncpg
+connection pool, so concurrent searches wait on I/O together instead of
+each holding a threadpool slot like law_store.search_law_chunks does.
+Embeddings of recent queries are kept in a small LRU cache.
+"""
+
+import asyncio
+import os
+from collections import OrderedDict
+from datetime import date
+from typing import Optional
+
+from .law_store import (
+    EMBEDDING_MODEL, MIGRATIONS_SQL, PENDING_PUB_DATES_SQL, connection_params, count_tokens,
+    pub_day_updates,
+)
+from .metrics import inc, timed
+
+SEARCH_COLUMNS = "chunk_id, numac, doc_type, title, pub_date, pub_day, article_num, text, url"
+
+
+class LawSearch:
+    def __init__(self, settings: dict):
+        """
+        Args:
+            settings:  config.json "law_search" section (pool sizes,
+                       embedding cache size).
+        """
+        self._settings = settings
+        self._pool = None
+        self._client = None
+        self._lock = None
+        self._embeddings = OrderedDict()  # query → embedding (text form)
+
+    async def _ready(self):
+        if self._pool is not None:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._pool is not None:
+                return
+            import asyncpg
+            from openai import AsyncOpenAI
+
+            params = connection_params()
+            self._client = AsyncOpenAI(api_key=os.environ["OPENAI_API_KEY"])
+            pool = await asyncpg.create_pool(
+                host=params["host"],
+                port=params["port"],
+                database=params["database"],
+                user=params["user"],
+                password=params["password"],
+                ssl=params["sslmode"],
+                min_size=self._settings.get("pool_min_size", 1),
+                max_size=self._settings.get("pool_max_size", 10),
+            )
+            print(f"  [law-search] pool ready ({self._settings.get('pool_max_size', 10)} connections)")
+            try:
+                await self._migrate(pool)
+            except Exception as exc:
+                print(f"  [law-search] pub_day migration failed: {exc}")
+            self._pool = pool
+
+    @staticmethod
+    async def _migrate(pool):
+        """Add and backfill pub_day on tables ingested before it existed.
+
+        The date filters read pub_day, so without this they would match
+        nothing until the next ingest ran create_table().
+        """
+        async with pool.acquire() as conn:
+            if await conn.fetchval("SELECT to_regclass('law_chunks')") is None:
+                return
+            for migration_sql in MIGRATIONS_SQL:
+                await conn.execute(migration_sql)
+            updates = pub_day_updates(row[0] for row in await conn.fetch(PENDING_PUB_DATES_SQL))
+            if updates:
+                await conn.executemany(
+                    "UPDATE law_chunks SET pub_day = $1 WHERE pub_date = $2 AND pub_day IS NULL",
+                    updates,
+                )
+                print(f"  [law-search] backfilled pub_day for {len(updates)} publication dates")
+
+    async def _embed(self, query: str) -> str:
+        vector = self._embeddings.get(query)
+        inc("ria_cache_lookups_total", cache="query_embedding",
+            result="hit" if vector is not None else "miss")
+        if vector is not None:
+            self._embeddings.move_to_end(query)
+            return vector
+        with timed("law_search_embed"):
+            resp = await self._client.embeddings.create(model=EMBEDDING_MODEL, input=query[:8000])
+        count_tokens(resp)
+        vector = "[" + ",".join(str(x) for x in resp.data[0].embedding) + "]"
+        self._embeddings[query] = vector
+        while len(self._embeddings) > self._settings.get("embedding_cache_size", 1024):
+            self._embeddings.popitem(last=False)
+        return vector
+
+    async def search(
+        self,
+        query: str,
+        k: int = 8,
+        doc_types: Optional[list[str]] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+    ) -> list[dict]:
+        """
+        Nearest law chunks to ``query``.
+
+        Args:
+            query:      Natural language query or proposal text.
+            k:          Number of results to return.
+            doc_types:  Optional list of doc_types to restrict the search to.
+            date_from:  Optional first publication day (inclusive).
+            date_to:    Optional last publication day (inclusive). Chunks
+                        without a parsed publication day never match a
+                        date filter.
+
+        Returns:
+            List of dicts with the SEARCH_COLUMNS and similarity.
+        """
+        await self._ready()
+        vector = await self._embed(query)
+
+        params = [vector]
+        conditions = []
+        if doc_types:
+            params.append(list(doc_types))
+            conditions.append(f"doc_type = ANY(${len(params)}::text[])")
+        if date_from:
+            params.append(date_from)
+            conditions.append(f"pub_day >= ${len(params)}")
+        if date_to:
+            params.append(date_to)
+            conditions.append(f"pub_day <= ${len(params)}")
+        params.append(k)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        sql = f"""
+            SELECT {SEARCH_COLUMNS},
+                   1 - (embedding <=> $1::text::vector) AS similarity
+            FROM law_chunks
+            {where}
+            ORDER BY embedding <=> $1::text::vector
+            LIMIT ${len(params)}
+        """
+        with timed("law_search_query"):
+            async with self._pool.acquire() as conn:
+                rows = await conn.fetch(sql, *params)
+        return [dict(row) for row in rows]
+
+    async def close(self):
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
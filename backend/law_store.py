@@ -15,6 +15,9 @@ import numpy as np
 import psycopg2
 from psycopg2.extras import execute_values
 
+from .metrics import inc, timed
+from .pub_dates import parse_pub_date
+
 # ── Load credentials from RIA-Project .env ───────────────────────────────────
 try:
     from dotenv import load_dotenv
@@ -28,6 +31,11 @@ except ImportError:
 
 _OPENAI_CLIENT = None
 
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+REQUIRED_ENV = ("POSTGRES_HOST", "POSTGRES_DATABASE", "POSTGRES_USER", "POSTGRES_PASSWORD",
+                "OPENAI_API_KEY")
+
 
 def _openai():
     global _OPENAI_CLIENT
@@ -37,15 +45,25 @@ def _openai():
     return _OPENAI_CLIENT
 
 
+def connection_params() -> dict:
+    """Postgres connection settings from the environment (psycopg2 keywords)."""
+    return {
+        "host": os.environ["POSTGRES_HOST"],
+        "port": int(os.environ.get("POSTGRES_PORT", 25060)),
+        "database": os.environ["POSTGRES_DATABASE"],
+        "user": os.environ["POSTGRES_USER"],
+        "password": os.environ["POSTGRES_PASSWORD"],
+        "sslmode": os.environ.get("POSTGRES_SSLMODE", "require"),
+    }
+
+
+def configured() -> bool:
+    """Whether the environment names a database and an OpenAI key to embed with."""
+    return all(os.environ.get(name) for name in REQUIRED_ENV)
+
+
 def _connect():
-    return psycopg2.connect(
-        host=os.environ["POSTGRES_HOST"],
-        port=int(os.environ.get("POSTGRES_PORT", 25060)),
-        database=os.environ["POSTGRES_DATABASE"],
-        user=os.environ["POSTGRES_USER"],
-        password=os.environ["POSTGRES_PASSWORD"],
-        sslmode=os.environ.get("POSTGRES_SSLMODE", "require"),
-    )
+    return psycopg2.connect(**connection_params())
 
 
 # ── Schema ────────────────────────────────────────────────────────────────────
@@ -58,6 +76,7 @@ CREATE TABLE IF NOT EXISTS law_chunks (
     doc_type    TEXT    NOT NULL,
     title       TEXT,
     pub_date    TEXT,
+    pub_day     DATE,
     article_num TEXT    NOT NULL,
     text        TEXT    NOT NULL,
     word_count  INTEGER,
@@ -72,8 +91,29 @@ CREATE_INDEXES_SQL = [
     "CREATE INDEX IF NOT EXISTS law_chunks_embedding_idx ON law_chunks USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100);",
     "CREATE INDEX IF NOT EXISTS law_chunks_numac_idx     ON law_chunks (numac);",
     "CREATE INDEX IF NOT EXISTS law_chunks_doctype_idx   ON law_chunks (doc_type);",
+    "CREATE INDEX IF NOT EXISTS law_chunks_pubday_idx    ON law_chunks (pub_day);",
 ]
 
+# Tables created before pub_day existed; backfill_pub_days fills the column
+MIGRATIONS_SQL = [
+    "ALTER TABLE IF EXISTS law_chunks ADD COLUMN IF NOT EXISTS pub_day DATE;",
+]
+
+PENDING_PUB_DATES_SQL = """
+SELECT DISTINCT pub_date FROM law_chunks
+WHERE pub_day IS NULL AND pub_date IS NOT NULL AND pub_date <> ''
+"""
+
+
+def pub_day_updates(pub_dates) -> list:
+    """(pub_day, pub_date) pairs for the ``pub_dates`` texts that parse_pub_date understands."""
+    updates = []
+    for text in pub_dates:
+        day = parse_pub_date(text)
+        if day is not None:
+            updates.append((day, text))
+    return updates
+
 
 def create_table(conn=None):
     """Create law_chunks table and indexes if they don't exist."""
@@ -84,6 +124,16 @@ def create_table(conn=None):
         with conn.cursor() as cur:
             cur.execute("CREATE EXTENSION IF NOT EXISTS vector;")
             cur.execute(CREATE_TABLE_SQL)
+            for migration_sql in MIGRATIONS_SQL:
+                cur.execute(migration_sql)
+            cur.execute(PENDING_PUB_DATES_SQL)
+            updates = pub_day_updates(row[0] for row in cur.fetchall())
+            cur.executemany(
+                "UPDATE law_chunks SET pub_day = %s WHERE pub_date = %s AND pub_day IS NULL",
+                updates,
+            )
+            if updates:
+                print(f"  [law-store] backfilled pub_day for {len(updates)} publication dates")
             for idx_sql in CREATE_INDEXES_SQL:
                 try:
                     cur.execute(idx_sql)
@@ -101,22 +151,35 @@ def create_table(conn=None):
 def embed_text(text: str) -> list[float]:
     """Embed a single text string using OpenAI text-embedding-3-small."""
     text = text[:8000]  # token safety
-    resp = _openai().embeddings.create(
-        model="text-embedding-3-small",
-        input=text,
-    )
+    with timed("embed_text"):
+        resp = _openai().embeddings.create(
+            model=EMBEDDING_MODEL,
+            input=text,
+        )
+    count_tokens(resp)
     return resp.data[0].embedding
 
 
-def embed_batch(texts: list[str], batch_size: int = 100) -> list[list[float]]:
-    """Embed a list of texts in batches."""
+def count_tokens(resp):
+    """Add an embeddings response's token usage to ``ria_embedding_tokens_total``."""
+    usage = getattr(resp, "usage", None)
+    if usage is not None:
+        inc("ria_embedding_tokens_total", usage.total_tokens)
+
+
+def embed_batch(texts: list[str], batch_size: int = 100, cancel=None) -> list[list[float]]:
+    """Embed a list of texts in batches; stops between batches once ``cancel`` fires."""
     results = []
     for i in range(0, len(texts), batch_size):
+        if cancel:
+            cancel.raise_if_cancelled()
         batch = [t[:8000] for t in texts[i: i + batch_size]]
-        resp = _openai().embeddings.create(
-            model="text-embedding-3-small",
-            input=batch,
-        )
+        with timed("embed_batch"):
+            resp = _openai().embeddings.create(
+                model=EMBEDDING_MODEL,
+                input=batch,
+            )
+        count_tokens(resp)
         results.extend([r.embedding for r in resp.data])
     return results
 
@@ -130,15 +193,18 @@ def make_chunk_id(numac: str, article_num: str) -> str:
 
 # ── Store ─────────────────────────────────────────────────────────────────────
 
-def store_chunks(items: list[dict], conn=None) -> int:
+def store_chunks(items: list[dict], conn=None, cancel=None) -> int:
     """
     Embed and store article chunks from scraper output.
 
     Args:
-        items:  List of scraper result dicts with embed=True.
-                Each item must have: ref_number, doc_type, short_text,
-                pub_date, url, articles (list of {article_num, text})
-        conn:   Optional existing psycopg2 connection (for testing).
+        items:   List of scraper result dicts with embed=True.
+                 Each item must have: ref_number, doc_type, short_text,
+                 pub_date, url, articles (list of {article_num, text})
+        conn:    Optional existing psycopg2 connection (for testing).
+        cancel:  Optional backend.cancel.CancelToken. Checked between
+                 embedding batches and before committing; a cancelled call
+                 rolls back, so no partial upsert is left behind.
 
     Returns:
         Number of rows upserted.
@@ -167,6 +233,7 @@ def store_chunks(items: list[dict], conn=None) -> int:
                 "doc_type":   item["doc_type"],
                 "title":      item.get("short_text", "")[:500],
                 "pub_date":   item.get("pub_date", ""),
+                "pub_day":    parse_pub_date(item.get("pub_date", "")),
                 "article_num": art["article_num"],
                 "text":       art["text"],
                 "word_count": len(art["text"].split()),
@@ -186,13 +253,18 @@ def store_chunks(items: list[dict], conn=None) -> int:
     texts = [texts[i] for i in unique_indices]
 
     print(f"  Embedding {len(texts)} chunks...", end=" ", flush=True)
-    embeddings = embed_batch(texts)
+    try:
+        embeddings = embed_batch(texts, cancel=cancel)
+    except Exception:
+        if own:
+            conn.close()
+        raise
     print("done")
 
     rows = [
         (
             m["chunk_id"], m["numac"], m["doc_type"], m["title"],
-            m["pub_date"], m["article_num"], m["text"], m["word_count"],
+            m["pub_date"], m["pub_day"], m["article_num"], m["text"], m["word_count"],
             m["url"], "nl",
             embeddings[i],
         )
@@ -201,7 +273,7 @@ def store_chunks(items: list[dict], conn=None) -> int:
 
     upsert_sql = """
         INSERT INTO law_chunks
-            (chunk_id, numac, doc_type, title, pub_date,
+            (chunk_id, numac, doc_type, title, pub_date, pub_day,
              article_num, text, word_count, url, language, embedding)
         VALUES %s
         ON CONFLICT (chunk_id) DO UPDATE SET
@@ -210,16 +282,24 @@ def store_chunks(items: list[dict], conn=None) -> int:
             embedding   = EXCLUDED.embedding,
             title       = EXCLUDED.title,
             pub_date    = EXCLUDED.pub_date,
+            pub_day     = EXCLUDED.pub_day,
             url         = EXCLUDED.url
     """
 
     try:
-        with conn.cursor() as cur:
-            execute_values(
-                cur, upsert_sql, rows,
-                template="(%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s::vector)",
-            )
-        conn.commit()
+        with timed("upsert"):
+            with conn.cursor() as cur:
+                execute_values(
+                    cur, upsert_sql, rows,
+                    template="(%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s::vector)",
+                )
+            if cancel:
+                cancel.raise_if_cancelled()
+            conn.commit()
+        inc("ria_documents_total", len({m["numac"] for m in meta}), stage="embedded")
+    except Exception:
+        conn.rollback()
+        raise
     finally:
         if own:
             conn.close()
@@ -0,0 +1,109 @@
+"""
+Lemma cache — SQLite store of spaCy lemmatization results.
+
+Table: lemmas
+  Each row = the lemma string of one document text for one spaCy setup
+  Key: (sha256 of the cleaned text, spaCy model + versions)
+  Eviction: least recently used rows beyond max_entries
+"""
+
+import hashlib
+import time
+
+from .sqlite_cache import SQLiteCache, chunked
+
+CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS lemmas (
+    text_hash   TEXT NOT NULL,
+    model       TEXT NOT NULL,
+    lemmas      TEXT NOT NULL,
+    last_used   REAL NOT NULL,
+    PRIMARY KEY (text_hash, model)
+);
+CREATE INDEX IF NOT EXISTS lemmas_last_used_idx ON lemmas (last_used);
+"""
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def spacy_model_key(model_name: str) -> str:
+    """Identify a spaCy setup: lemmas change when the model or spaCy changes."""
+    import spacy
+
+    version = spacy.util.get_package_version(model_name) or "unknown"
+    return f"{model_name}=={version}/spacy=={spacy.__version__}"
+
+
+class LemmaCache(SQLiteCache):
+    """Persistent text-hash → lemma-string cache shared by all processes."""
+
+    NAME = "lemma"
+    SCHEMA_SQL = CREATE_TABLE_SQL
+
+    def __init__(self, path: str, max_entries: int = 50000):
+        self.max_entries = max_entries
+        super().__init__(path)
+
+    def get_many(self, hashes: list, model: str) -> dict:
+        """Return {text_hash: lemmas} for the cached hashes and mark them used."""
+        found = {}
+        unique = list(dict.fromkeys(hashes))
+        conn = self._connect()
+        try:
+            with conn:
+                for chunk in chunked(unique):
+                    placeholders = ",".join(["?"] * len(chunk))
+                    rows = conn.execute(
+                        f"SELECT text_hash, lemmas FROM lemmas "
+                        f"WHERE model = ? AND text_hash IN ({placeholders})",
+                        [model, *chunk],
+                    ).fetchall()
+                    found.update(rows)
+                    conn.execute(
+                        f"UPDATE lemmas SET last_used = ? "
+                        f"WHERE model = ? AND text_hash IN ({placeholders})",
+                        [time.time(), model, *chunk],
+                    )
+        finally:
+            conn.close()
+
+        hits = sum(1 for h in hashes if h in found)
+        self.record(hits, len(hashes) - hits)
+        return found
+
+    def put_many(self, items: dict, model: str):
+        """Store {text_hash: lemmas} and evict the least recently used overflow."""
+        if not items:
+            return
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO lemmas (text_hash, model, lemmas, last_used) "
+                    "VALUES (?, ?, ?, ?)",
+                    [(h, model, lemmas, now) for h, lemmas in items.items()],
+                )
+                self._evict(conn)
+        finally:
+            conn.close()
+
+    def _evict(self, conn):
+        overflow = conn.execute("SELECT COUNT(*) FROM lemmas").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM lemmas WHERE rowid IN "
+                "(SELECT rowid FROM lemmas ORDER BY last_used LIMIT ?)",
+                (overflow,),
+            )
+
+    def stats(self) -> dict:
+        """Hit/miss counters of this process plus the current number of entries."""
+        conn = self._connect()
+        try:
+            entries = conn.execute("SELECT COUNT(*) FROM lemmas").fetchone()[0]
+        finally:
+            conn.close()
+        return {**super().stats(), "entries": entries}
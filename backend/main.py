@@ -1,27 +1,57 @@
-import json
+import time
+
+# Startup is measured from the first line of this module
+_IMPORT_STARTED = time.perf_counter()
+
+import asyncio
 import os
+import threading
 import uuid
-from datetime import date, datetime
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import Optional
 
-import pandas as pd
-from fastapi import BackgroundTasks, FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 
-from .predictor import predict_documents
-from .scraper import scrape_documents
+from .admission import create_limits
+from .compression import CompressionMiddleware
+from .events import JobEvents
+from .executor import JobExecutor, QueueFull
+from .exports import EXPORT_FORMATS, export_path, stream_export
+from . import metrics
+from .jobs import (
+    CONFIG, EXPORTS_DIR, JOB_STORE_URL, JOBS, RESULTS_DIR, init_worker, law_store_available,
+    model_registry, run_ingest, run_pipeline_job, run_predict, run_scrape,
+)
+from .prediction_cache import open_prediction_cache
+from .responses import FastJSONResponse, dumps
+from .results import decode_cursor, iter_from, read_page, read_results
+from .retention import Retention, touch
 
-try:
-    from .law_store import create_table, store_chunks, get_stats
-    _LAW_STORE_AVAILABLE = True
-except Exception:
-    _LAW_STORE_AVAILABLE = False
+# Heavy subsystems — pandas, the predictor (NumPy/TensorFlow), the scraper
+# (Selenium, BeautifulSoup) and the law store (psycopg2) — are imported on
+# first use, so /health and job polling never wait for them.
+
+# Job statuses that never change again
+_TERMINAL_STATUSES = ("done", "error", "cancelled")
 
 # ---------------------------------------------------------------------------
 # App setup
 # ---------------------------------------------------------------------------
-app = FastAPI(title="RIA Assessments API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # startup() and shutdown() are defined under "Lifecycle" below
+    startup()
+    yield
+    await shutdown()
+
+
+app = FastAPI(title="RIA Assessments API", default_response_class=FastJSONResponse,
+              lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -30,23 +60,83 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# ---------------------------------------------------------------------------
-# Config
-# ---------------------------------------------------------------------------
-_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# gzip/brotli for JSON and NDJSON bodies only (never the SSE streams)
+app.add_middleware(CompressionMiddleware, **CONFIG.get("api", {}).get("compression", {}))
 
-with open(os.path.join(_root, "config.json")) as f:
-    CONFIG = json.load(f)
 
-SCRAPED_DIR = os.path.join(_root, "scraped_data")
-PREDICT_DIR = os.path.join(_root, "predictions")
-os.makedirs(SCRAPED_DIR, exist_ok=True)
-os.makedirs(PREDICT_DIR, exist_ok=True)
+@app.middleware("http")
+async def record_request_time(request: Request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+    # Route templates, not raw paths, so job ids don't explode the label set
+    route = request.scope.get("route")
+    metrics.observe("ria_http_request_seconds", time.perf_counter() - started,
+                    method=request.method, route=getattr(route, "path", "other"),
+                    status=response.status_code)
+    return response
 
 # ---------------------------------------------------------------------------
-# In-memory job store  {job_id: {...}}
+# Lazy subsystems
 # ---------------------------------------------------------------------------
-JOBS: dict = {}
+STARTUP: dict = {}
+
+
+_CLASSIFY_BATCHER = None
+
+
+def _classify_batcher():
+    """Micro-batcher in front of the warm predictor for /api/classify."""
+    global _CLASSIFY_BATCHER
+    if _CLASSIFY_BATCHER is None:
+        from .batcher import MicroBatcher
+        from .predictor import classify_texts
+
+        model_registry()
+        settings = CONFIG.get("api", {})
+        _CLASSIFY_BATCHER = MicroBatcher(
+            lambda texts: classify_texts(texts, CONFIG["predictions"]),
+            max_batch_size=settings.get("classify_max_batch", 32),
+            max_wait_ms=settings.get("classify_max_wait_ms", 10),
+        )
+    return _CLASSIFY_BATCHER
+
+
+def _warm_classifier():
+    """Load exactly what /api/classify uses: the configured bundles and spaCy."""
+    from .predictor import configured_modes
+
+    model_registry().warm()
+    if "tokenizer" in configured_modes(CONFIG["predictions"]):
+        from scripts.tokenizer import load_nlp
+
+        load_nlp()
+
+
+def _warm_up():
+    """Prepare what the API process itself serves, in the background.
+
+    Scraping and the other jobs run in the worker pools, so the API process
+    never needs Selenium. The classifier models (and spaCy or the sentence
+    encoder behind them) are only loaded up front when ``api.warm_classifier``
+    is set; otherwise the first /api/classify request loads them, so API
+    processes that never classify do not hold a copy.
+    """
+    started = time.perf_counter()
+    steps = {
+        "pandas": lambda: __import__("pandas"),
+        "law_store": law_store_available,
+    }
+    if CONFIG.get("api", {}).get("warm_classifier", False):
+        steps["classifier"] = _warm_classifier
+    for name, step in steps.items():
+        try:
+            step()
+        except Exception as exc:
+            # Each subsystem still loads lazily on first use; never break the API
+            STARTUP.setdefault("warm_errors", {})[name] = str(exc)
+            print(f"  [startup] warm-up of {name} failed: {exc}")
+    STARTUP["warmup_s"] = round(time.perf_counter() - started, 3)
+    print(f"  [startup] warm-up finished in {STARTUP['warmup_s']:.2f}s")
 
 
 # ---------------------------------------------------------------------------
@@ -58,104 +148,158 @@ class ScrapeRequest(BaseModel):
     doc_types: list[str] = ["Koninklijk besluit"]
 
 
+class ClassifyRequest(BaseModel):
+    text: Optional[str] = None
+    texts: list[str] = []
+
+
 # ---------------------------------------------------------------------------
-# Background tasks
+# Job executor — process pools per job class, created on first submit
 # ---------------------------------------------------------------------------
-def _run_scrape(job_id: str, req: ScrapeRequest):
-    def progress(done, total):
-        JOBS[job_id]["progress"] = int(done / total * 100)
-        JOBS[job_id]["progress_text"] = f"Fetching detail {done}/{total}"
-
-    try:
-        JOBS[job_id]["status"] = "scraping"
-        JOBS[job_id]["progress_text"] = "Launching browser…"
-
-        results = scrape_documents(
-            start_date=datetime.combine(req.start_date, datetime.min.time()),
-            end_date=datetime.combine(req.end_date, datetime.min.time()),
-            doc_types=req.doc_types,
-            url_searchpage=CONFIG["scraping"]["url_searchpage"],
-            url_detail_page=CONFIG["scraping"]["url_detail_page"],
-            progress_callback=progress,
-        )
+_EXECUTOR = None
+_EXECUTOR_LOCK = threading.Lock()
 
-        filename = f"{req.start_date}_{req.end_date}_scraping_results.xlsx"
-        filepath = os.path.join(SCRAPED_DIR, filename)
-        pd.DataFrame(results).to_excel(filepath)
+# Progress pushed from the workers to /api/jobs/{id}/events
+EVENTS = JobEvents()
 
-        JOBS[job_id].update(
-            status="done", progress=100,
-            result=results, count=len(results),
-            excel_file=filepath, filename=filename,
-        )
+# Browser / detail-fetch slots shared by every job worker (lock files, see backend.admission)
+# ADMISSION_LOCK_DIR overrides config.json's lock_dir, as JOB_RESULTS_DIR does the results folder
+_ADMISSION = {**CONFIG.get("admission", {}),
+              **({"lock_dir": os.environ["ADMISSION_LOCK_DIR"]} if os.environ.get("ADMISSION_LOCK_DIR") else {})}
+LIMITS = create_limits(_ADMISSION)
 
-        # Automatically ingest substantive articles into the law DB
-        if _LAW_STORE_AVAILABLE:
-            ingest_job_id = str(uuid.uuid4())
-            JOBS[ingest_job_id] = {"status": "queued", "progress_text": "Waiting to start…", "error": None}
-            JOBS[job_id]["ingest_job_id"] = ingest_job_id
-            _run_ingest(ingest_job_id, job_id)
+def _evict_predictions(now: float) -> int:
+    cache = open_prediction_cache(CONFIG["predictions"].get("prediction_cache"))
+    return cache.evict(now) if cache else 0
 
-    except Exception as exc:
-        JOBS[job_id].update(status="error", error=str(exc))
 
+# Job TTLs, the byte budget for result/export files and prediction cache eviction
+RETENTION = Retention(JOBS, RESULTS_DIR, EXPORTS_DIR, CONFIG.get("retention", {}), owner=JOB_STORE_URL,
+                      evictions=(_evict_predictions,))
 
-def _run_predict(job_id: str, scrape_job_id: str):
-    try:
-        JOBS[job_id]["status"] = "running"
-        scrape_job = JOBS.get(scrape_job_id, {})
 
-        if scrape_job.get("status") != "done":
-            raise ValueError("Scrape job is not complete")
+def _job_crashed(job_id: str, exc: Exception):
+    fields = {"status": "error", "error": f"Worker crashed: {exc}"}
+    JOBS.update(job_id, **fields)
+    EVENTS.publish(job_id, fields)
 
-        dataset = pd.DataFrame(scrape_job["result"])
-        result = predict_documents(dataset, CONFIG["predictions"])
 
-        ts = str(datetime.now().timestamp()).replace(".", "_")
-        filename = f"{ts}_predictions.xlsx"
-        filepath = os.path.join(PREDICT_DIR, filename)
-        result.to_excel(filepath)
+def _executor() -> JobExecutor:
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = JobExecutor(CONFIG["jobs"], on_error=_job_crashed,
+                                    initializer=init_worker, initargs=(EVENTS.queue, LIMITS))
+    return _EXECUTOR
 
-        JOBS[job_id].update(
-            status="done",
-            result=result.to_dict(orient="records"),
-            excel_file=filepath,
-            filename=filename,
-        )
-    except Exception as exc:
-        JOBS[job_id].update(status="error", error=str(exc))
 
+def _submit(job_class: str, job_id: str, fn, *args) -> dict:
+    """Queue a job that was just created in the store; 429 when the queue is full.
 
-def _run_ingest(job_id: str, scrape_job_id: str):
-    """Embed substantive articles from a completed scrape job and store in law_chunks."""
+    Returns:
+        The response for the client: job id and queue position (0 = started).
+    """
     try:
-        JOBS[job_id]["status"] = "ingesting"
-        scrape_job = JOBS.get(scrape_job_id, {})
+        position = _executor().submit(job_class, job_id, fn, *args)
+    except QueueFull as exc:
+        JOBS.delete(job_id)
+        raise HTTPException(status_code=429, detail=str(exc))
+    return {"job_id": job_id, "queue_position": position}
 
-        if scrape_job.get("status") != "done":
-            raise ValueError("Scrape job is not complete")
 
-        results = scrape_job.get("result", [])
-        to_embed = [r for r in results if r.get("embed") and r.get("articles")]
+# ---------------------------------------------------------------------------
+# Job liveness
+# ---------------------------------------------------------------------------
+_WATCHDOG_STOP = threading.Event()
+
 
-        if not to_embed:
-            JOBS[job_id].update(status="done", chunks_stored=0,
-                                message="No substantive articles found to embed.")
+def _interrupt(job_id: str, error: str) -> bool:
+    """End a job that no process runs anymore; False when it no longer exists."""
+    job = JOBS.get(job_id)
+    if job is None:
+        return False
+    # A DELETE that no worker could act on still counts
+    status = "cancelled" if job.get("cancel_requested") else "error"
+    fields = {"status": status, "error": "Cancelled" if status == "cancelled" else error}
+    try:
+        JOBS.update(job_id, **fields)
+    except KeyError:
+        return False
+    EVENTS.publish(job_id, fields)
+    return True
+
+
+def _reap_stale_jobs(now: float = None) -> list:
+    """Finish jobs that are not terminal but were not updated for ``stale_job_s``.
+
+    Queued and running jobs are refreshed every ``heartbeat_s`` by the API
+    process that queued them and by the worker that runs them, so a stale
+    one was left behind by a process that stopped (a restart, a crash, a
+    killed container). It would otherwise never end: its SSE stream stays
+    open, DELETE is never acted on and retention never expires it.
+
+    Returns:
+        The ids of the reaped jobs.
+    """
+    now = now or time.time()
+    stale_s = CONFIG.get("timeouts", {}).get("stale_job_s", 180)
+    reaped = []
+    for job_id, job in JOBS.items():
+        if job.get("status") in _TERMINAL_STATUSES:
+            continue
+        if now - job.get("updated_at", job.get("created_at", now)) <= stale_s:
+            continue
+        if _interrupt(job_id, "Interrupted: the process running this job stopped (restart or crash)"):
+            reaped.append(job_id)
+    if reaped:
+        print(f"  [jobs] reaped {len(reaped)} jobs left behind by a stopped process")
+    return reaped
+
+
+def _watchdog():
+    """Refresh the heartbeat of this process's jobs and reap the abandoned ones."""
+    interval = CONFIG.get("timeouts", {}).get("heartbeat_s", 30)
+    while True:
+        try:
+            for job_id in (_EXECUTOR.job_ids() if _EXECUTOR is not None else []):
+                try:
+                    JOBS.update(job_id, heartbeat_at=time.time())
+                except KeyError:
+                    pass
+            _reap_stale_jobs()
+        except Exception as exc:
+            print(f"  [jobs] watchdog failed: {exc}")
+        if _WATCHDOG_STOP.wait(interval):
             return
 
-        JOBS[job_id]["progress_text"] = f"Embedding {sum(len(r['articles']) for r in to_embed)} chunks…"
-        create_table()
-        stored = store_chunks(to_embed)
-        stats  = get_stats()
 
-        JOBS[job_id].update(
-            status="done",
-            chunks_stored=stored,
-            db_total=stats["total_chunks"],
-            message=f"Stored {stored} chunks. DB now has {stats['total_chunks']} law chunks total.",
-        )
-    except Exception as exc:
-        JOBS[job_id].update(status="error", error=str(exc))
+# ---------------------------------------------------------------------------
+# Lifecycle
+# ---------------------------------------------------------------------------
+def startup():
+    STARTUP["ready_s"] = round(time.perf_counter() - _IMPORT_STARTED, 3)
+    print(f"  [startup] API ready in {STARTUP['ready_s']:.2f}s")
+    EVENTS.start()
+    RETENTION.start()
+    if CONFIG.get("timeouts", {}).get("heartbeat_s", 30):
+        _WATCHDOG_STOP.clear()
+        threading.Thread(target=_watchdog, name="job-watchdog", daemon=True).start()
+    if CONFIG.get("api", {}).get("warmup", True):
+        threading.Thread(target=_warm_up, name="warm-up", daemon=True).start()
+
+
+async def shutdown():
+    from .predictor import get_registry
+
+    if _LAW_SEARCH is not None:
+        await _LAW_SEARCH.close()
+    get_registry(CONFIG["predictions"]).stop_watching()
+    _WATCHDOG_STOP.set()
+    if _EXECUTOR is not None:
+        for job_id in _EXECUTOR.shutdown():
+            _interrupt(job_id, "Interrupted: the API stopped before the job started")
+    EVENTS.stop()
+    RETENTION.stop()
 
 
 # ---------------------------------------------------------------------------
@@ -163,7 +307,14 @@ def _run_ingest(job_id: str, scrape_job_id: str):
 # ---------------------------------------------------------------------------
 @app.get("/health")
 def health():
-    return {"status": "ok"}
+    return {"status": "ok", "startup": STARTUP, "storage": RETENTION.usage}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """Prometheus metrics of this API process and the job workers it runs."""
+    snapshot = metrics.merge(metrics.REGISTRY.snapshot(), *list(EVENTS.worker_metrics.values()))
+    return PlainTextResponse(metrics.render(snapshot), media_type="text/plain; version=0.0.4")
 
 
 @app.get("/api/document-types")
@@ -172,13 +323,36 @@ def document_types():
 
 
 @app.post("/api/scrape")
-def start_scrape(req: ScrapeRequest, background_tasks: BackgroundTasks):
+def start_scrape(req: ScrapeRequest):
+    if req.end_date < req.start_date:
+        raise HTTPException(status_code=400, detail="end_date must be after start_date")
+    job_id = str(uuid.uuid4())
+    JOBS.create(job_id, status="queued", progress=0, progress_text="", error=None)
+    return _submit("scrape", job_id, run_scrape, req.start_date, req.end_date, req.doc_types)
+
+
+def _check_results(job: dict):
+    """410 once retention has evicted the job's results; otherwise mark them as used."""
+    if job.get("results_evicted"):
+        raise HTTPException(status_code=410, detail="Results were removed by retention; run the job again")
+    if job.get("result_ref"):
+        touch(job["result_ref"])
+
+
+def _public(job: dict) -> dict:
+    # Omit the result file reference from status responses
+    return {k: v for k, v in job.items() if k != "result_ref"}
+
+
+@app.post("/api/pipeline")
+def start_pipeline(req: ScrapeRequest):
+    """Scrape, ingest and predict in one job whose stages run concurrently."""
     if req.end_date < req.start_date:
         raise HTTPException(status_code=400, detail="end_date must be after start_date")
     job_id = str(uuid.uuid4())
-    JOBS[job_id] = {"status": "queued", "progress": 0, "progress_text": "", "error": None}
-    background_tasks.add_task(_run_scrape, job_id, req)
-    return {"job_id": job_id}
+    JOBS.create(job_id, status="queued", progress=0, progress_text="", error=None)
+    return _submit("pipeline", job_id, run_pipeline_job,
+                   req.start_date, req.end_date, req.doc_types)
 
 
 @app.get("/api/jobs/{job_id}")
@@ -186,8 +360,89 @@ def job_status(job_id: str):
     job = JOBS.get(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
-    # Omit large result/filepath from status response
-    return {k: v for k, v in job.items() if k not in ("result", "excel_file")}
+    job = _public(job)
+    if job.get("status") == "queued" and _EXECUTOR is not None:
+        # 1 = next to start; unknown when queued by another API process
+        job["queue_position"] = _EXECUTOR.position(job_id)
+    return job
+
+
+@app.delete("/api/jobs/{job_id}")
+def cancel_job(job_id: str):
+    """Cancel a job: queued jobs are dropped, running jobs stop at their next check.
+
+    A running job quits its browser, aborts in-flight fetches and rolls back
+    an unfinished law DB write within about a second.
+    """
+    job = JOBS.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.get("status") in _TERMINAL_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Job is already {job['status']}")
+
+    if _EXECUTOR is not None and _EXECUTOR.cancel(job_id):
+        fields = {"status": "cancelled", "error": "Cancelled by user"}
+        JOBS.update(job_id, **fields)
+        EVENTS.publish(job_id, fields)
+        return {"job_id": job_id, "status": "cancelled"}
+
+    # Running (or queued by another API process): the worker's cancel token
+    # picks the flag up from the store and records the final status itself,
+    # so a job finishing at this very moment keeps its "done"
+    JOBS.update(job_id, cancel_requested=True)
+    EVENTS.publish(job_id, {"cancel_requested": True})
+    return {"job_id": job_id, "status": "cancelling"}
+
+
+def _sse(data: dict) -> str:
+    return f"event: job\ndata: {dumps(data).decode()}\n\n"
+
+
+@app.get("/api/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """Server-Sent Events stream of a job's state.
+
+    Sends the full job state first, then the merged state whenever it
+    changes; updates arriving within ``events_min_interval_ms`` of each
+    other are coalesced into one event. The stream ends once the job is
+    done or has failed.
+    """
+    if not await run_in_threadpool(JOBS.get, job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    settings = CONFIG.get("api", {})
+    min_interval = settings.get("events_min_interval_ms", 250) / 1000
+    keepalive = settings.get("events_keepalive_s", 5)
+
+    async def stream():
+        # Subscribe before reading the state so no update falls in between
+        subscriber = EVENTS.subscribe(job_id)
+        try:
+            state = _public(await run_in_threadpool(JOBS.get, job_id) or {})
+            yield _sse(state)
+            while state.get("status") not in _TERMINAL_STATUSES:
+                try:
+                    await asyncio.wait_for(subscriber.changed.wait(), keepalive)
+                    changes = subscriber.take()
+                except asyncio.TimeoutError:
+                    # Jobs run by another API process only update the store
+                    latest = await run_in_threadpool(JOBS.get, job_id)
+                    if latest is None:
+                        return
+                    changes = {k: v for k, v in _public(latest).items() if state.get(k) != v}
+                    if not changes:
+                        yield ": keep-alive\n\n"
+                        continue
+                state.update(_public(changes))
+                yield _sse(state)
+                await asyncio.sleep(min_interval)
+        finally:
+            EVENTS.unsubscribe(job_id, subscriber)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.get("/api/jobs/{job_id}/preview")
@@ -195,46 +450,115 @@ def job_preview(job_id: str):
     job = JOBS.get(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
-    rows = job.get("result") or []
-    return {"data": rows[:10], "total": len(rows)}
+    _check_results(job)
+    if not job.get("result_ref"):
+        return {"data": [], "total": 0}
+    return FastJSONResponse({"data": read_results(job["result_ref"], limit=10),
+                             "total": job.get("count", 0)})
+
+
+@app.get("/api/jobs/{job_id}/results")
+def job_results(
+    job_id: str,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    fields: Optional[str] = None,
+    format: str = "json",
+):
+    """Page through a finished job's rows.
+
+    ``fields`` is a comma-separated projection (e.g. ``numac,prediction``).
+    ``format=json`` returns one page plus ``next_cursor``; ``format=ndjson``
+    streams every row from ``cursor`` on, one JSON object per line.
+    """
+    job = JOBS.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    _check_results(job)
+    if job.get("status") != "done" or not job.get("result_ref"):
+        raise HTTPException(status_code=409, detail="Job has no results yet")
+    if format not in ("json", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'json' or 'ndjson'")
+    settings = CONFIG.get("api", {})
+    max_limit = settings.get("results_max_page_size", 1000)
+    if limit is not None and not 1 <= limit <= max_limit:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {max_limit}")
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+    columns = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+
+    if format == "ndjson":
+        def stream():
+            for row, _ in iter_from(job["result_ref"], cursor, columns, limit):
+                yield dumps(row) + b"\n"
+
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+    rows, next_cursor = read_page(
+        job["result_ref"], cursor,
+        limit=limit or settings.get("results_page_size", 100), fields=columns,
+    )
+    return FastJSONResponse({"data": rows, "next_cursor": next_cursor, "total": job.get("count", 0)})
 
 
 @app.post("/api/predict/{scrape_job_id}")
-def start_predict(scrape_job_id: str, background_tasks: BackgroundTasks):
+def start_predict(scrape_job_id: str):
     scrape_job = JOBS.get(scrape_job_id)
     if not scrape_job:
         raise HTTPException(status_code=404, detail="Scrape job not found")
     if scrape_job.get("status") != "done":
         raise HTTPException(status_code=400, detail="Scrape job is not complete yet")
+    _check_results(scrape_job)
 
     job_id = str(uuid.uuid4())
-    JOBS[job_id] = {"status": "queued", "progress": 0, "error": None}
-    background_tasks.add_task(_run_predict, job_id, scrape_job_id)
-    return {"job_id": job_id}
+    JOBS.create(job_id, status="queued", progress=0, error=None, scrape_job_id=scrape_job_id)
+    return _submit("predict", job_id, run_predict, scrape_job_id)
+
+
+@app.post("/api/classify")
+async def classify(req: ClassifyRequest):
+    """Classify raw (draft) regulation text synchronously with the warm model."""
+    texts = ([req.text] if req.text is not None else []) + req.texts
+    if not texts:
+        raise HTTPException(status_code=400, detail="Provide 'text' or 'texts'")
+    max_texts = CONFIG.get("api", {}).get("classify_max_texts", 64)
+    if len(texts) > max_texts:
+        raise HTTPException(status_code=400, detail=f"At most {max_texts} texts per request")
+    try:
+        results = await asyncio.gather(*(_classify_batcher().submit(t) for t in texts))
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=str(exc))
+    return {"results": results}
 
 
 @app.post("/api/ingest/{scrape_job_id}")
-def start_ingest(scrape_job_id: str, background_tasks: BackgroundTasks):
+def start_ingest(scrape_job_id: str):
     """Embed and store substantive articles from a completed scrape job into law_chunks."""
-    if not _LAW_STORE_AVAILABLE:
+    if not law_store_available():
         raise HTTPException(status_code=503, detail="Law database not configured")
     scrape_job = JOBS.get(scrape_job_id)
     if not scrape_job:
         raise HTTPException(status_code=404, detail="Scrape job not found")
     if scrape_job.get("status") != "done":
         raise HTTPException(status_code=400, detail="Scrape job is not complete yet")
+    _check_results(scrape_job)
 
     job_id = str(uuid.uuid4())
-    JOBS[job_id] = {"status": "queued", "progress_text": "Waiting to start…", "error": None}
-    background_tasks.add_task(_run_ingest, job_id, scrape_job_id)
-    return {"job_id": job_id}
+    JOBS.create(job_id, status="queued", progress_text="Waiting to start…", error=None,
+                scrape_job_id=scrape_job_id)
+    return _submit("ingest", job_id, run_ingest, scrape_job_id)
 
 
 @app.get("/api/law-stats")
 def law_stats():
     """Return current law_chunks DB statistics."""
-    if not _LAW_STORE_AVAILABLE:
+    if not law_store_available():
         raise HTTPException(status_code=503, detail="Law database not configured")
+    from .law_store import get_stats
+
     try:
         stats = get_stats()
         return stats
@@ -242,18 +566,71 @@ def law_stats():
         raise HTTPException(status_code=500, detail=str(exc))
 
 
+_LAW_SEARCH = None
+
+
+@app.get("/api/law-search")
+async def law_search(
+    q: str,
+    k: Optional[int] = None,
+    doc_type: list[str] = Query(default=[]),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+):
+    """Semantic search over law_chunks, optionally filtered by doc_type and publication day."""
+    global _LAW_SEARCH
+    if not law_store_available():
+        raise HTTPException(status_code=503, detail="Law database not configured")
+    settings = CONFIG.get("law_search", {})
+    k = k if k is not None else settings.get("default_k", 8)
+    max_k = settings.get("max_k", 50)
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Query 'q' is empty")
+    if not 1 <= k <= max_k:
+        raise HTTPException(status_code=400, detail=f"k must be between 1 and {max_k}")
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from is after date_to")
+
+    if _LAW_SEARCH is None:
+        from .law_search import LawSearch
+
+        _LAW_SEARCH = LawSearch(settings)
+    try:
+        results = await _LAW_SEARCH.search(q, k, doc_type, date_from, date_to)
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=str(exc))
+    return FastJSONResponse({"query": q, "k": k, "results": results})
+
+
 @app.get("/api/download/{job_id}")
-def download(job_id: str):
+def download(job_id: str, format: str = "xlsx"):
+    """Download a finished job's results as ``xlsx`` (default), ``csv`` or ``parquet``.
+
+    Each format is generated on its first download and served from the
+    export cache afterwards. CSV and Parquet stream while they are written;
+    an xlsx workbook is only sent once it has been built.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400,
+                            detail=f"format must be one of {', '.join(EXPORT_FORMATS)}")
     job = JOBS.get(job_id)
-    if not job or job.get("status") != "done":
+    if job:
+        _check_results(job)
+    if not job or job.get("status") != "done" or not job.get("result_ref"):
         raise HTTPException(status_code=404, detail="Results not available")
-    filepath = job.get("excel_file")
-    if not filepath or not os.path.exists(filepath):
+    if not os.path.exists(job["result_ref"]):
         raise HTTPException(status_code=404, detail="File not found")
-    return FileResponse(
-        filepath,
-        filename=job["filename"],
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+
+    media_type, extension = EXPORT_FORMATS[format]
+    filename = job.get("export_name", job_id) + extension
+    filepath = export_path(EXPORTS_DIR, job_id, format)
+    if os.path.exists(filepath):
+        touch(filepath)
+        return FileResponse(filepath, filename=filename, media_type=media_type)
+    return StreamingResponse(
+        stream_export(job["result_ref"], filepath, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
 
 
@@ -0,0 +1,219 @@
+"""
+Metrics — counters, gauges and histograms in the Prometheus text format.
+
+Every process records into its own REGISTRY. Job workers send a cumulative
+snapshot of theirs to the API process over the job events queue (see
+backend.jobs.publish_metrics), and GET /metrics renders the API registry
+merged with the latest snapshot of every worker. A job's own share, the
+difference between two snapshots of its worker, is summarized into the
+job record.
+
+Snapshots are plain dicts ``{(name, labels): value}`` so they pickle
+cheaply; ``labels`` is a sorted tuple of (key, value) pairs and histogram
+values are ``[cumulative bucket counts, sum, count]``.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+# name → (type, help)
+METRICS = {
+    "ria_stage_seconds": ("histogram", "Time spent in one step of a processing stage."),
+    "ria_documents_total": ("counter", "Documents that went through a processing stage."),
+    "ria_embedding_tokens_total": ("counter", "Tokens sent to the embedding API."),
+    "ria_cache_lookups_total": ("counter", "Cache lookups by cache and result (hit/miss)."),
+    "ria_jobs_total": ("counter", "Finished jobs by kind and final status."),
+    "ria_job_seconds": ("histogram", "Job duration by kind."),
+    "ria_http_request_seconds": ("histogram", "API request latency by route and status."),
+    "ria_jobs_stored": ("gauge", "Job records in the job store by status."),
+    "ria_storage_bytes": ("gauge", "Bytes held on disk by result and export files."),
+    "ria_storage_budget_bytes": ("gauge", "Configured byte budget for result and export files."),
+    "ria_retention_evictions_total": ("counter", "Jobs expired (ttl) and files evicted (budget)."),
+}
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._values[key] = value
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._values.get(key)
+            if histogram is None:
+                histogram = self._values[key] = [[0] * len(BUCKETS), 0.0, 0]
+            for i, bound in enumerate(BUCKETS):
+                if value <= bound:
+                    histogram[0][i] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {key: [list(value[0]), value[1], value[2]] if isinstance(value, list) else value
+                    for key, value in self._values.items()}
+
+
+REGISTRY = Registry()
+
+
+def inc(name: str, value: float = 1, **labels):
+    REGISTRY.inc(name, value, **labels)
+
+
+def observe(name: str, value: float, **labels):
+    REGISTRY.observe(name, value, **labels)
+
+
+@contextmanager
+def timed(stage: str):
+    """Observe the duration of the enclosed block as ``ria_stage_seconds{stage=...}``."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        REGISTRY.observe("ria_stage_seconds", time.perf_counter() - started, stage=stage)
+
+
+# ── Snapshots ────────────────────────────────────────────────────────────────
+
+def merge(*snapshots) -> dict:
+    """Sum of several snapshots (e.g. one per process)."""
+    merged = {}
+    for snapshot in snapshots:
+        for key, value in snapshot.items():
+            current = merged.get(key)
+            if current is None:
+                merged[key] = [list(value[0]), value[1], value[2]] if isinstance(value, list) else value
+            elif isinstance(value, list):
+                current[0] = [a + b for a, b in zip(current[0], value[0])]
+                current[1] += value[1]
+                current[2] += value[2]
+            else:
+                merged[key] = current + value
+    return merged
+
+
+def diff(after: dict, before: dict) -> dict:
+    """What was recorded between two snapshots of the same registry."""
+    delta = {}
+    for key, value in after.items():
+        previous = before.get(key)
+        if previous is None:
+            delta[key] = value
+        elif isinstance(value, list):
+            if value[2] > previous[2]:
+                delta[key] = [[a - b for a, b in zip(value[0], previous[0])],
+                              value[1] - previous[1], value[2] - previous[2]]
+        elif value > previous:
+            delta[key] = value - previous
+    return delta
+
+
+def _format_labels(labels: tuple, extra: tuple = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    # Exact digits: "%g" would print a byte gauge of 524288000 as 5.24288e+08
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def render(snapshot: dict) -> str:
+    """Prometheus text exposition (version 0.0.4) of ``snapshot``."""
+    lines = []
+    for name in sorted({name for name, _ in snapshot}):
+        kind, help_text = METRICS.get(name, ("untyped", ""))
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for (metric, labels), value in sorted(snapshot.items(), key=lambda item: item[0]):
+            if metric != name:
+                continue
+            if isinstance(value, list):
+                buckets, total, count = value
+                for bound, bucket in zip(BUCKETS, buckets):
+                    lines.append(f"{name}_bucket{_format_labels(labels, (('le', f'{bound:g}'),))} {bucket}")
+                lines.append(f"{name}_bucket{_format_labels(labels, (('le', '+Inf'),))} {count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {total:.6f}")
+                lines.append(f"{name}_count{_format_labels(labels)} {count}")
+            else:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# ── Per-job summaries ────────────────────────────────────────────────────────
+
+def summarize(delta: dict, seconds: float) -> dict:
+    """Compact per-job view of a snapshot delta, for the job record.
+
+    Returns:
+        {"seconds", "stages": {stage: {"count", "total_s", "mean_s"}},
+         "documents": {stage: n}, "documents_per_s": {stage: rate},
+         "embedding_tokens": n, "cache_hit_rate": {cache: rate}}
+    """
+    stages, documents, lookups = {}, {}, {}
+    tokens = 0
+    for (name, labels), value in delta.items():
+        labels = dict(labels)
+        if name == "ria_stage_seconds":
+            stages[labels["stage"]] = {
+                "count": value[2],
+                "total_s": round(value[1], 3),
+                "mean_s": round(value[1] / value[2], 4) if value[2] else None,
+            }
+        elif name == "ria_documents_total":
+            documents[labels["stage"]] = documents.get(labels["stage"], 0) + int(value)
+        elif name == "ria_embedding_tokens_total":
+            tokens += int(value)
+        elif name == "ria_cache_lookups_total":
+            counts = lookups.setdefault(labels["cache"], {"hit": 0, "miss": 0})
+            counts[labels["result"]] = counts.get(labels["result"], 0) + value
+    return {
+        "seconds": round(seconds, 3),
+        "stages": stages,
+        "documents": documents,
+        "documents_per_s": {stage: round(n / seconds, 3) for stage, n in documents.items()}
+                           if seconds > 0 else {},
+        "embedding_tokens": tokens,
+        "cache_hit_rate": {
+            cache: round(counts["hit"] / (counts["hit"] + counts["miss"]), 4)
+            for cache, counts in lookups.items() if counts["hit"] + counts["miss"]
+        },
+    }
+
+
+class JobMetrics:
+    """Metrics this process records while one job runs."""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self._before = REGISTRY.snapshot()
+        self._started = time.perf_counter()
+
+    def finish(self, status: str) -> dict:
+        """Count the finished job and return its summary (see summarize)."""
+        seconds = time.perf_counter() - self._started
+        delta = diff(REGISTRY.snapshot(), self._before)
+        REGISTRY.inc("ria_jobs_total", kind=self.kind, status=status)
+        REGISTRY.observe("ria_job_seconds", seconds, kind=self.kind)
+        return summarize(delta, seconds)
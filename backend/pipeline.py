@@ -0,0 +1,284 @@
+"""
+Pipelined scrape → classify → ingest/predict job.
+
+Documents flow through the stages as soon as they are available instead of
+each step waiting for the previous one to finish the whole date range:
+
+  listing ─▶ fetch (N threads) ─▶ classify ─┬─▶ embed/store  (law DB)
+                                            └─▶ predict ─▶ result file
+
+Stages run as threads of one job worker and talk over bounded queues, so a
+slow stage applies backpressure upstream instead of letting documents pile
+up in memory. End-to-end time approaches that of the slowest stage rather
+than the sum of all of them.
+"""
+
+import queue
+import threading
+import time
+from contextlib import nullcontext
+from datetime import datetime
+
+_END = object()
+_TIMEOUT = object()
+
+
+class _Stop(Exception):
+    """Another stage failed; unwind without recording a second error."""
+
+
+class _Channel:
+    """Bounded queue between stages; ends once every producer has closed it."""
+
+    def __init__(self, maxsize: int, stop: threading.Event, producers: int = 1):
+        self._queue = queue.Queue(maxsize)
+        self._stop = stop
+        self._producers = producers
+        self._closed = 0
+        self._drained = False
+        self._lock = threading.Lock()
+
+    def depth(self) -> int:
+        return 0 if self._drained else self._queue.qsize()
+
+    def put(self, item):
+        # Blocks while the queue is full — this is the backpressure
+        while True:
+            if self._stop.is_set():
+                raise _Stop()
+            try:
+                self._queue.put(item, timeout=0.2)
+                return
+            except queue.Full:
+                continue
+
+    def close(self):
+        self.put(_END)
+
+    def _next(self, timeout: float = None):
+        """Next item, _END once drained, or _TIMEOUT after ``timeout`` seconds."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self._stop.is_set():
+                raise _Stop()
+            wait = 0.2 if deadline is None else min(0.2, deadline - time.monotonic())
+            if wait <= 0:
+                return _TIMEOUT
+            try:
+                item = self._queue.get(timeout=wait)
+            except queue.Empty:
+                continue
+            if item is not _END:
+                return item
+            with self._lock:
+                if not self._drained:
+                    self._closed += 1
+                    self._drained = self._closed >= self._producers
+                drained = self._drained
+            if drained:
+                self._queue.put(_END)  # let the other consumers see the end too
+                return _END
+
+    def __iter__(self):
+        while True:
+            item = self._next()
+            if item is _END:
+                return
+            yield item
+
+    def batches(self, size: int, max_wait: float):
+        """Yield lists of up to ``size`` items, waiting at most ``max_wait`` to fill one."""
+        while True:
+            item = self._next()
+            if item is _END:
+                return
+            batch = [item]
+            deadline = time.monotonic() + max_wait
+            while len(batch) < size:
+                item = self._next(max(deadline - time.monotonic(), 0.001))
+                if item is _TIMEOUT:
+                    break
+                if item is _END:
+                    yield batch
+                    return
+                batch.append(item)
+            yield batch
+
+
+class _Counters:
+    def __init__(self, names):
+        self._lock = threading.Lock()
+        self.values = {name: 0 for name in names}
+
+    def add(self, name: str, n: int = 1):
+        with self._lock:
+            self.values[name] += n
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self.values)
+
+
+def run_pipeline(start_date, end_date, doc_types: list, config: dict, writer,
+                 ingest: bool = True, progress_callback=None, stats: dict = None,
+                 cancel=None):
+    """Scrape, classify, ingest and predict documents concurrently.
+
+    Args:
+        start_date, end_date, doc_types:  As for scraper.scrape_documents.
+        config:             Full app config (scraping, predictions, pipeline).
+        writer:             backend.results.ResultWriter for the predicted rows.
+        ingest:             Embed and store substantive articles in the law DB.
+                            A failing law DB does not fail the pipeline; its
+                            error is reported as ``embed_error``.
+        progress_callback:  Optional callable(stages) called every
+                            ``progress_interval_s`` with per-stage counts and
+                            queue depths.
+        stats:              Optional dict filled with prediction stats
+                            (cached/predicted, cascade counts).
+        cancel:             Optional backend.cancel.CancelToken; stops every
+                            stage (and quits the browser) once it fires.
+
+    Returns:
+        Per-stage counts once every stage has finished.
+
+    Raises:
+        RuntimeError: A stage other than embed failed; the other stages are
+                      stopped first.
+    """
+    from .predictor import predict_in_batches
+    from .scraper import classify_document, fetch_detail, iter_listing
+
+    settings = config.get("pipeline", {})
+    fetch_workers = settings.get("fetch_workers", 4)
+    queue_size = settings.get("queue_size", 64)
+    stats = stats if stats is not None else {}
+
+    stop = threading.Event()
+    if cancel:
+        cancel.on_cancel(stop.set)
+    timeouts = config.get("timeouts", {})
+    errors = []
+    embed_errors = []
+    counts = _Counters(["listed", "fetched", "classified", "embedded_docs",
+                        "chunks_stored", "predicted"])
+    listed_all = threading.Event()
+    to_fetch = _Channel(queue_size, stop)
+    to_classify = _Channel(queue_size, stop, producers=fetch_workers)
+    to_embed = _Channel(queue_size, stop) if ingest else None
+    to_predict = _Channel(queue_size, stop)
+
+    def listing():
+        stage = cancel.stage("listing", timeouts.get("listing_s")) if cancel else nullcontext()
+        try:
+            with stage:
+                for item in iter_listing(
+                    start_date=datetime.combine(start_date, datetime.min.time()),
+                    end_date=datetime.combine(end_date, datetime.min.time()),
+                    doc_types=doc_types,
+                    url_searchpage=config["scraping"]["url_searchpage"],
+                    cancel=cancel,
+                ):
+                    to_fetch.put(item)
+                    counts.add("listed")
+        finally:
+            listed_all.set()
+        to_fetch.close()
+
+    def fetch():
+        for item in to_fetch:
+            to_classify.put(fetch_detail(item, cancel, timeouts.get("fetch_s", 15)))
+            counts.add("fetched")
+        to_classify.close()
+
+    def classify():
+        for item in to_classify:
+            classify_document(item)
+            if to_embed is not None and item["embed"] and item["articles"]:
+                to_embed.put(item)
+            to_predict.put(item)
+            counts.add("classified")
+        if to_embed is not None:
+            to_embed.close()
+        to_predict.close()
+
+    def embed_failed(exc):
+        if cancel:
+            cancel.raise_if_cancelled()
+        print(f"  [pipeline] embed stage failed, continuing without ingest: {exc}")
+        embed_errors.append(str(exc))
+
+    def embed():
+        # The law DB is a side output: when it fails, the stage records the
+        # error and keeps draining its queue so scraping and predicting go on
+        try:
+            from .law_store import create_table, store_chunks
+
+            create_table()
+        except Exception as exc:
+            embed_failed(exc)
+        for batch in to_embed.batches(settings.get("embed_batch_docs", 16),
+                                      settings.get("batch_max_wait_s", 2)):
+            if embed_errors:
+                continue
+            try:
+                counts.add("chunks_stored", store_chunks(batch, cancel=cancel))
+            except Exception as exc:
+                embed_failed(exc)
+                continue
+            counts.add("embedded_docs", len(batch))
+
+    def predict():
+        predictions = config["predictions"]
+        for batch in to_predict.batches(predictions.get("predict_batch_size", 256),
+                                        settings.get("batch_max_wait_s", 2)):
+            for result in predict_in_batches(batch, predictions, batch_size=len(batch),
+                                             stats=stats):
+                writer.write(result.to_dict(orient="records"))
+            counts.add("predicted", len(batch))
+
+    def run(name, fn):
+        try:
+            fn()
+        except _Stop:
+            pass
+        except Exception as exc:
+            errors.append(f"{name}: {exc}")
+            stop.set()
+
+    stages = [("listing", listing), ("classify", classify), ("predict", predict)]
+    stages += [("fetch", fetch)] * fetch_workers
+    if to_embed is not None:
+        stages.append(("embed", embed))
+    threads = [threading.Thread(target=run, args=stage, name=f"pipeline-{stage[0]}", daemon=True)
+               for stage in stages]
+    for thread in threads:
+        thread.start()
+
+    def report() -> dict:
+        snapshot = counts.snapshot()
+        snapshot["listing_done"] = listed_all.is_set()
+        snapshot["queued"] = {
+            "fetch": to_fetch.depth(),
+            "classify": to_classify.depth(),
+            "predict": to_predict.depth(),
+            **({"embed": to_embed.depth()} if to_embed is not None else {}),
+        }
+        if to_embed is not None:
+            snapshot["embed_error"] = embed_errors[0] if embed_errors else None
+        return snapshot
+
+    interval = settings.get("progress_interval_s", 1)
+    while any(thread.is_alive() for thread in threads):
+        for thread in threads:
+            thread.join(timeout=interval)
+            if thread.is_alive():
+                break
+        if progress_callback:
+            progress_callback(report())
+
+    if cancel:
+        cancel.raise_if_cancelled()
+    if errors:
+        raise RuntimeError("; ".join(dict.fromkeys(errors)))
+    return report()
@@ -0,0 +1,157 @@
+"""
+Prediction cache — SQLite store of classifier outputs per document.
+
+Table: predictions
+  Each row = prediction + certainty of one numac under one model artifact set
+  Key: (numac, model artifact id); a row only serves a lookup whose input
+  text has the same sha256 (text_hash), so a document whose fetch failed or
+  whose text changed is predicted again
+Table: prediction_models
+  When each artifact id was last used to predict, by any process
+  Eviction (run by backend.retention): rows of artifact ids unused for
+  max_model_age_s, then the oldest rows beyond max_entries. Rows of other
+  artifact ids are never served, so a hot swap needs no delete: a worker
+  still on the previous model keeps its rows and leaves the new model's alone.
+"""
+
+import time
+
+from .sqlite_cache import SQLiteCache, chunked, shared_cache
+
+CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS predictions (
+    numac       TEXT NOT NULL,
+    model       TEXT NOT NULL,
+    text_hash   TEXT NOT NULL,
+    prediction  REAL NOT NULL,
+    certainty   REAL NOT NULL,
+    created_at  REAL NOT NULL,
+    PRIMARY KEY (numac, model)
+);
+CREATE INDEX IF NOT EXISTS predictions_created_at_idx ON predictions (created_at);
+CREATE TABLE IF NOT EXISTS prediction_models (
+    model       TEXT PRIMARY KEY,
+    last_used   REAL NOT NULL
+);
+"""
+
+# How often a process refreshes last_used of the model it predicts with
+_TOUCH_S = 60
+
+
+class PredictionCache(SQLiteCache):
+    """Persistent (numac, text hash, artifact id) → (prediction, certainty) lookup."""
+
+    NAME = "prediction"
+    SCHEMA_SQL = CREATE_TABLE_SQL
+
+    def __init__(self, path: str, max_model_age_s: float = 7 * 86400, max_entries: int = None):
+        self.max_model_age_s = max_model_age_s
+        self.max_entries = max_entries
+        self._touched = {}  # model → when this process last refreshed its last_used
+        super().__init__(path)
+        conn = self._connect()
+        try:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(predictions)")}
+            if "text_hash" not in columns:
+                # Written before input texts were hashed; those rows cannot be trusted
+                with conn:
+                    conn.execute("DROP TABLE predictions")
+                conn.executescript(CREATE_TABLE_SQL)
+        finally:
+            conn.close()
+
+    def use_model(self, model: str, now: float = None):
+        """Record that ``model`` is predicting, so eviction keeps its rows."""
+        now = now or time.time()
+        if now - self._touched.get(model, 0) < _TOUCH_S:
+            return
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO prediction_models (model, last_used) VALUES (?, ?)",
+                             (model, now))
+        finally:
+            conn.close()
+        self._touched[model] = now
+
+    def evict(self, now: float = None) -> int:
+        """Drop rows of models unused for max_model_age_s, then the oldest beyond max_entries.
+
+        Returns:
+            The number of rows deleted.
+        """
+        now = now or time.time()
+        cutoff = now - self.max_model_age_s
+        conn = self._connect()
+        try:
+            with conn:
+                # Rows written since the cutoff stay even if their model was
+                # never recorded (e.g. written before prediction_models existed)
+                deleted = conn.execute(
+                    "DELETE FROM predictions WHERE created_at < ? AND model NOT IN "
+                    "(SELECT model FROM prediction_models WHERE last_used >= ?)",
+                    (cutoff, cutoff),
+                ).rowcount
+                conn.execute("DELETE FROM prediction_models WHERE last_used < ?", (cutoff,))
+                if self.max_entries is not None:
+                    deleted += conn.execute(
+                        "DELETE FROM predictions WHERE rowid IN (SELECT rowid FROM predictions "
+                        "ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                        (self.max_entries,),
+                    ).rowcount
+        finally:
+            conn.close()
+        return deleted
+
+    def get_many(self, keys: list, model: str) -> dict:
+        """Return {(numac, text_hash): (prediction, certainty)} for the cached keys."""
+        found = {}
+        unique = list(dict.fromkeys(numac for numac, _ in keys if numac))
+        wanted = set(keys)
+        conn = self._connect()
+        try:
+            for chunk in chunked(unique):
+                placeholders = ",".join(["?"] * len(chunk))
+                rows = conn.execute(
+                    f"SELECT numac, text_hash, prediction, certainty FROM predictions "
+                    f"WHERE model = ? AND numac IN ({placeholders})",
+                    [model, *chunk],
+                ).fetchall()
+                found.update(((numac, digest), (prediction, certainty))
+                             for numac, digest, prediction, certainty in rows
+                             if (numac, digest) in wanted)
+        finally:
+            conn.close()
+
+        hits = sum(1 for key in keys if key in found)
+        self.record(hits, len(keys) - hits)
+        return found
+
+    def put_many(self, items: dict, model: str):
+        """Store {(numac, text_hash): (prediction, certainty)} for ``model``."""
+        items = {key: v for key, v in items.items() if key[0]}
+        if not items:
+            return
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO predictions "
+                    "(numac, model, text_hash, prediction, certainty, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [(numac, model, digest, float(p), float(c), now)
+                     for (numac, digest), (p, c) in items.items()],
+                )
+        finally:
+            conn.close()
+
+
+def open_prediction_cache(settings: dict):
+    """Process-wide PredictionCache for the config.json "prediction_cache" section, or None."""
+    if not settings:
+        return None
+    return shared_cache(PredictionCache, settings["path"],
+                        max_model_age_s=settings.get("max_model_age_s", 7 * 86400),
+                        max_entries=settings.get("max_entries"))
@@ -1,15 +1,26 @@
 import json
 import os
 import pickle
+import re
+import threading
+from dataclasses import dataclass
+from itertools import islice
 
 import numpy as np
 import pandas as pd
-import tensorflow as tf
-import tensorflow.keras.backend as K
-from keras.models import model_from_json
+
+from .metrics import inc, timed
+from .runtime import RUNTIME_SUFFIX, NumpyModel
+from .sqlite_cache import shared_cache
+
+# TensorFlow/Keras are imported inside the functions below, so that importing
+# this module (and serving from an exported NumPy runtime) never loads them.
 
 
 def f1_loss(y_true, y_pred):
+    import tensorflow as tf
+    import tensorflow.keras.backend as K
+
     tp = K.sum(K.cast(y_true * y_pred, "float"), axis=0)
     fp = 0.1 * K.sum(K.cast((1 - y_true) * y_pred, "float"), axis=0)
     fn = 100 * K.sum(K.cast(y_true * (1 - y_pred), "float"), axis=0)
@@ -21,6 +32,9 @@ def f1_loss(y_true, y_pred):
 
 
 def f1(y_true, y_pred):
+    import tensorflow as tf
+    import tensorflow.keras.backend as K
+
     y_pred = K.round(y_pred)
     tp = K.sum(K.cast(y_true * y_pred, "float"), axis=0)
     fp = K.sum(K.cast((1 - y_true) * y_pred, "float"), axis=0)
@@ -39,52 +53,500 @@ def _find_latest(folder, suffix):
     return os.path.join(folder, sorted(files)[-1])
 
 
-def predict_documents(dataset: pd.DataFrame, config: dict) -> pd.DataFrame:
-    model_location = config["model_location"]
-    mode = config["embedder_or_tokenizer"]
+# ---------------------------------------------------------------------------
+# Model artifacts
+# ---------------------------------------------------------------------------
 
-    if mode == "embedder":
-        from sentence_transformers import SentenceTransformer
-        from scripts.embedder import preprocess as embed_preprocess
+# mode -> (sub-folder, model json suffix, weights suffix)
+_NETWORK_FILES = {
+    "embedder": ("lstm", "__model.json", "__model.h5"),
+    "tokenizer": ("nn", "__model.json", ".weights.h5"),
+}
 
-        model = SentenceTransformer(config["sentence_embedder"])
-        preprocessed = embed_preprocess(dataset, model)
-        preprocessed = np.array(list(preprocessed["padded_embedding"]))
-        model_json_path = _find_latest(model_location + "/lstm", "__model.json")
-        weights_path = _find_latest(model_location + "/lstm", "__model.h5")
+_TOKENIZER_PICKLES = ("tokenizer", "normmeans", "normstds", "pca")
 
-    else:  # tokenizer
-        from scripts.tokenizer import preprocess as token_preprocess
+_TIMESTAMP_RE = re.compile(r"^\d+(?:\.\d+)?")
 
-        with open(_find_latest(model_location, "__tokenizer.pickle"), "rb") as f:
-            tokenizer = pickle.load(f)
-        with open(_find_latest(model_location, "__normmeans.pickle"), "rb") as f:
-            norm_means = pickle.load(f)
-        with open(_find_latest(model_location, "__normstds.pickle"), "rb") as f:
-            norm_stds = pickle.load(f)
-        with open(_find_latest(model_location, "__pca.pickle"), "rb") as f:
-            pca_model = pickle.load(f)
 
-        preprocessed = token_preprocess(dataset, tokenizer)
-        preprocessed = (preprocessed - norm_means) / norm_stds
-        if pca_model is not None:
-            preprocessed = pca_model.transform(np.array(preprocessed))
+def _artifact_paths(model_location: str, mode: str) -> dict:
+    """Resolve the newest file of every artifact the given mode needs."""
+    if mode not in _NETWORK_FILES:
+        raise ValueError(f"Unknown prediction mode '{mode}'")
+    folder, json_suffix, weights_suffix = _NETWORK_FILES[mode]
+    paths = {
+        "model_json": _find_latest(os.path.join(model_location, folder), json_suffix),
+        "weights": _find_latest(os.path.join(model_location, folder), weights_suffix),
+    }
+    runtime = _runtime_path(paths["weights"])
+    if os.path.exists(runtime):
+        paths["runtime"] = runtime
+    if mode == "tokenizer":
+        for name in _TOKENIZER_PICKLES:
+            paths[name] = _find_latest(model_location, f"__{name}.pickle")
+    return paths
 
-        model_json_path = _find_latest(model_location + "/nn", "__model.json")
-        weights_path = _find_latest(model_location + "/nn", ".weights.h5")
+
+def _runtime_path(weights_path: str) -> str:
+    """Location of the exported NumPy runtime belonging to a weights file."""
+    folder, name = os.path.split(weights_path)
+    return os.path.join(folder, _TIMESTAMP_RE.match(name).group(0) + RUNTIME_SUFFIX)
+
+
+def load_keras_model(model_json_path: str, weights_path: str):
+    from keras.models import model_from_json
 
     with open(model_json_path) as f:
         model_json = json.load(f)
-
-    trained_model = model_from_json(
+    model = model_from_json(
         json.dumps(model_json),
         custom_objects={"f1_loss": f1_loss, "f1": f1},
     )
-    trained_model.load_weights(weights_path)
+    model.load_weights(weights_path)
+    return model
+
+
+def _artifact_id(mode: str, paths: dict) -> str:
+    """Identify an artifact set by its mode and newest training timestamp."""
+    stamps = []
+    for path in paths.values():
+        match = _TIMESTAMP_RE.match(os.path.basename(path))
+        if match:
+            stamps.append(match.group(0))
+    return f"{mode}:{max(stamps, key=float)}" if stamps else mode
+
+
+def fuse_projection(norm_means, norm_stds, pca_model):
+    """Fold ``(x - norm_means) / norm_stds`` followed by ``pca_model.transform``
+    into one affine map ``x @ weights + bias``.
+
+    Applying the fused map to the sparse tokenizer output never densifies the
+    full vocabulary-sized matrix. Returns None when ``pca_model`` is not a
+    linear projection with ``components_`` (the caller then uses the two-step path).
+    """
+    if pca_model is None or not hasattr(pca_model, "components_"):
+        return None
+    means = np.asarray(norm_means, dtype=np.float64).ravel()
+    stds = np.asarray(norm_stds, dtype=np.float64).ravel()
+    components = np.asarray(pca_model.components_, dtype=np.float64)
+    if getattr(pca_model, "whiten", False):
+        components = components / np.sqrt(pca_model.explained_variance_)[:, None]
+    pca_mean = np.asarray(getattr(pca_model, "mean_", 0.0), dtype=np.float64)
+
+    # ((x - m) / s - mu) @ C.T  ==  x @ (C / s).T - (m / s + mu) @ C.T
+    weights = (components / stds).T
+    bias = -((means / stds + pca_mean) @ components.T)
+    return weights, bias
+
+
+def fold_normalization(norm_means, norm_stds, model):
+    """Fold ``(x - norm_means) / norm_stds`` into the first Dense layer of ``model``.
+
+    Without a PCA step the normalized vector feeds the network directly, and
+    with that layer's kernel W and bias b
+
+        ((x - m) / s) @ W + b  ==  x @ (W / s[:, None]) + (b - (m / s) @ W)
+
+    so the sparse tokenizer output is multiplied by the folded kernel without
+    ever being densified. Keras models are replayed with the NumPy runtime.
+
+    Returns:
+        ((weights, bias), tail) — the affine map as for fuse_projection, and a
+        NumpyModel of the rest of the network starting with the folded
+        layer's activation. None when the network does not start with a
+        Dense layer or uses a layer the runtime cannot replay.
+    """
+    if not isinstance(model, NumpyModel):
+        try:
+            model = NumpyModel.from_keras(model)
+        except ValueError:
+            return None
+    layers = [layer for layer in model.layers if layer[0] not in ("InputLayer", "Dropout")]
+    if not layers or layers[0][0] != "Dense":
+        return None
+    _, spec, weights = layers[0]
+    kernel = np.asarray(weights[0], dtype=np.float64)
+    bias = (np.asarray(weights[1], dtype=np.float64) if spec.get("use_bias", True)
+            else np.zeros(kernel.shape[1]))
+    means = np.asarray(norm_means, dtype=np.float64).ravel()
+    stds = np.asarray(norm_stds, dtype=np.float64).ravel()
+
+    projection = (kernel / stds[:, None], bias - (means / stds) @ kernel)
+    tail = NumpyModel([("Activation", {"activation": spec.get("activation")}, []), *layers[1:]],
+                      dtype=model.dtype)
+    return projection, tail
+
+
+def _load_pickle(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+@dataclass(frozen=True)
+class ModelBundle:
+    """Everything needed to run one prediction mode, loaded once and shared."""
+
+    mode: str
+    artifact_id: str
+    paths: dict
+    model: object  # the network after ``projection`` when that folds its first layer
+    tokenizer: object = None
+    norm_means: object = None
+    norm_stds: object = None
+    pca_model: object = None
+    projection: tuple = None
+    sentence_model: object = None
+
+
+def _load_bundle(config: dict, mode: str, paths: dict = None,
+                 previous: ModelBundle = None) -> ModelBundle:
+    paths = paths or _artifact_paths(config["model_location"], mode)
+
+    # "auto" serves the exported NumPy runtime when one matches the weights
+    runtime = config.get("runtime", "auto")
+    if runtime == "numpy" and "runtime" not in paths:
+        raise FileNotFoundError(
+            f"No exported runtime for {paths['weights']} — run scripts/export_runtime.py"
+        )
+    if runtime != "keras" and "runtime" in paths:
+        model = NumpyModel.load(paths["runtime"])
+    else:
+        model = load_keras_model(paths["model_json"], paths["weights"])
+
+    kwargs = {}
+    if mode == "embedder":
+        # The sentence encoder is not a timestamped artifact — keep it across swaps
+        if previous is not None and previous.sentence_model is not None:
+            kwargs["sentence_model"] = previous.sentence_model
+        else:
+            from sentence_transformers import SentenceTransformer
+            kwargs["sentence_model"] = SentenceTransformer(config["sentence_embedder"])
+    else:
+        kwargs.update(
+            tokenizer=_load_pickle(paths["tokenizer"]),
+            norm_means=_load_pickle(paths["normmeans"]),
+            norm_stds=_load_pickle(paths["normstds"]),
+            pca_model=_load_pickle(paths["pca"]),
+        )
+        kwargs["projection"] = fuse_projection(
+            kwargs["norm_means"], kwargs["norm_stds"], kwargs["pca_model"],
+        )
+        if kwargs["projection"] is None and kwargs["pca_model"] is None and runtime != "keras":
+            folded = fold_normalization(kwargs["norm_means"], kwargs["norm_stds"], model)
+            if folded is not None:
+                kwargs["projection"], model = folded
+
+    return ModelBundle(
+        mode=mode,
+        artifact_id=_artifact_id(mode, paths),
+        paths=paths,
+        model=model,
+        **kwargs,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Registry
+# ---------------------------------------------------------------------------
+
+# Cascade mode: the cheap tokenizer network runs on everything and only
+# uncertain documents are re-scored by the sentence-embedding LSTM.
+CASCADE_STAGES = ("tokenizer", "embedder")
+
+
+def configured_modes(config: dict) -> list:
+    """Bundles the configured ``embedder_or_tokenizer`` mode needs."""
+    mode = config["embedder_or_tokenizer"]
+    return list(CASCADE_STAGES) if mode == "cascade" else [mode]
+
+
+class ModelRegistry:
+    """Process-level cache of loaded model bundles, one per prediction mode.
+
+    Bundles are loaded on first use (or by ``warm``) and reused by every
+    request. ``refresh`` checks ``model_location`` for newer timestamped
+    artifacts, loads them next to the current bundle and then swaps the
+    reference, so in-flight predictions finish on the bundle they started with.
+    """
+
+    def __init__(self, config: dict):
+        self.config = config
+        self._bundles: dict[str, ModelBundle] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+
+    def get(self, mode: str = None) -> ModelBundle:
+        mode = mode or self.config["embedder_or_tokenizer"]
+        bundle = self._bundles.get(mode)
+        if bundle is None:
+            with self._lock:
+                bundle = self._bundles.get(mode)
+                if bundle is None:
+                    bundle = _load_bundle(self.config, mode)
+                    self._bundles[mode] = bundle
+        return bundle
+
+    def warm(self, modes: list = None):
+        for mode in modes or configured_modes(self.config):
+            self.get(mode)
+
+    def refresh(self) -> list:
+        """Swap in newer artifacts for every loaded mode. Returns the swapped modes.
 
-    predictions = trained_model.predict(preprocessed)
+        A mode whose new artifacts fail to load keeps serving its current
+        bundle; the load is retried on the next refresh.
+        """
+        swapped = []
+        for mode, current in list(self._bundles.items()):
+            try:
+                paths = _artifact_paths(self.config["model_location"], mode)
+            except FileNotFoundError:
+                continue
+            if paths == current.paths:
+                continue
+            try:
+                bundle = _load_bundle(self.config, mode, paths, previous=current)
+            except Exception as exc:
+                print(f"  [models] keeping {current.artifact_id}: loading {mode} failed: {exc}")
+                continue
+            with self._lock:
+                self._bundles[mode] = bundle
+            swapped.append(mode)
+            print(f"  [models] {current.artifact_id} → {bundle.artifact_id}")
+        return swapped
+
+    def start_watching(self, interval: float = 60):
+        """Poll the model folder in a daemon thread and hot-swap new artifacts."""
+        if self._watcher is not None or not interval:
+            return
+        self._stop.clear()
+
+        def watch():
+            while not self._stop.wait(interval):
+                try:
+                    self.refresh()
+                except Exception as exc:
+                    print(f"  [models] reload failed: {exc}")
+
+        self._watcher = threading.Thread(target=watch, name="model-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop.set()
+        self._watcher = None
+
+
+_REGISTRIES: dict[str, ModelRegistry] = {}
+_REGISTRIES_LOCK = threading.Lock()
+
+
+def get_registry(config: dict) -> ModelRegistry:
+    """Return the process-wide registry for ``config["model_location"]``."""
+    key = os.path.abspath(config["model_location"])
+    with _REGISTRIES_LOCK:
+        registry = _REGISTRIES.get(key)
+        if registry is None:
+            registry = _REGISTRIES[key] = ModelRegistry(config)
+    return registry
+
+
+def get_lemma_cache(config: dict):
+    """Process-wide LemmaCache from ``config["lemma_cache"]``, or None when disabled."""
+    settings = config.get("lemma_cache")
+    if not settings:
+        return None
+    from .lemma_cache import LemmaCache
+
+    return shared_cache(LemmaCache, settings["path"], max_entries=settings.get("max_entries", 50000))
+
+
+def get_prediction_cache(config: dict):
+    """Process-wide PredictionCache from ``config["prediction_cache"]``, or None."""
+    from .prediction_cache import open_prediction_cache
+
+    return open_prediction_cache(config.get("prediction_cache"))
+
+
+# ---------------------------------------------------------------------------
+# Prediction
+# ---------------------------------------------------------------------------
+
+def _prepare_inputs(bundle: ModelBundle, dataset: pd.DataFrame, config: dict):
+    if bundle.mode == "embedder":
+        from scripts.embedder import preprocess as embed_preprocess
+
+        with timed("sentence_embedding"):
+            preprocessed = embed_preprocess(
+                dataset, bundle.sentence_model,
+                batch_size=config.get("embedding_batch_size", 256),
+            )
+        return np.array(list(preprocessed["padded_embedding"]))
+
+    from scripts.tokenizer import preprocess as token_preprocess
+
+    with timed("spacy"):
+        preprocessed = token_preprocess(
+            dataset, bundle.tokenizer,
+            batch_size=config.get("spacy_batch_size", 16),
+            n_process=config.get("spacy_workers"),
+            cache=get_lemma_cache(config),
+        )
+    if bundle.projection is not None:
+        weights, bias = bundle.projection
+        return np.asarray(preprocessed @ weights) + bias
+
+    preprocessed = (preprocessed - bundle.norm_means) / bundle.norm_stds
+    if bundle.pca_model is not None:
+        preprocessed = bundle.pca_model.transform(np.array(preprocessed))
+    return preprocessed
+
+
+def predict_documents(dataset: pd.DataFrame, config: dict,
+                      bundle: ModelBundle = None) -> pd.DataFrame:
+    if bundle is None:
+        _, predict = _resolve_predictor(config)
+        return predict(dataset, {})
+
+    preprocessed = _prepare_inputs(bundle, dataset, config)
+    with timed("model_predict"):
+        predictions = np.asarray(bundle.model.predict(preprocessed)).reshape(len(dataset), -1)[:, 0]
     result = dataset.assign(
         prediction=np.round(predictions, 0),
         certainty=2 * (np.round(predictions, 2) - 0.5),
     )
     return result
+
+
+def predict_cascade(dataset: pd.DataFrame, config: dict, cheap: ModelBundle,
+                    expensive: ModelBundle, stats: dict) -> pd.DataFrame:
+    """Score with ``cheap``; re-score rows whose certainty is inside the band with ``expensive``."""
+    low, high = config.get("cascade_band", [-0.5, 0.5])
+    result = predict_documents(dataset, config, cheap)
+    uncertain = result["certainty"].between(low, high).to_numpy()
+    if uncertain.any():
+        refined = predict_documents(dataset.loc[uncertain], config, expensive)
+        result.loc[uncertain, "prediction"] = refined["prediction"]
+        result.loc[uncertain, "certainty"] = refined["certainty"]
+
+    stats["cascade_documents"] = stats.get("cascade_documents", 0) + len(dataset)
+    stats["escalated"] = stats.get("escalated", 0) + int(uncertain.sum())
+    return result
+
+
+def _resolve_predictor(config: dict):
+    """Return (model artifact id, callable(DataFrame, stats) -> DataFrame) for the configured mode.
+
+    The bundles are resolved once per call, so a hot swap never mixes two
+    model versions inside one batch.
+    """
+    registry = get_registry(config)
+    mode = config["embedder_or_tokenizer"]
+    if mode != "cascade":
+        bundle = registry.get(mode)
+        return bundle.artifact_id, lambda df, stats: predict_documents(df, config, bundle)
+
+    cheap, expensive = (registry.get(stage) for stage in CASCADE_STAGES)
+    low, high = config.get("cascade_band", [-0.5, 0.5])
+    model_id = f"cascade:{cheap.artifact_id}+{expensive.artifact_id}@{low},{high}"
+    return model_id, lambda df, stats: predict_cascade(df, config, cheap, expensive, stats)
+
+
+def _predict_with_cache(batch: pd.DataFrame, model_id: str, predict, cache,
+                        stats: dict) -> pd.DataFrame:
+    """Serve cached documents from ``cache``; only the rest is preprocessed and predicted.
+
+    Documents are cached by numac and a hash of their text; rows without a
+    numac or with an empty text (a failed fetch) are never cached.
+    """
+    from .lemma_cache import text_hash
+
+    numacs = batch["ref_number"].tolist() if "ref_number" in batch else [None] * len(batch)
+    texts = batch["long_text"].fillna("").astype(str) if "long_text" in batch else [""] * len(batch)
+    keys = [(n, text_hash(t)) if n and t else None for n, t in zip(numacs, texts)]
+    cacheable = [key for key in keys if key]
+    cached = cache.get_many(cacheable, model_id) if cache and cacheable else {}
+    hit = np.array([key in cached for key in keys], dtype=bool)
+
+    result = batch.assign(prediction=np.nan, certainty=np.nan)
+    if hit.any():
+        values = np.array([cached[key] for key, h in zip(keys, hit) if h], dtype=float)
+        result.loc[hit, "prediction"] = values[:, 0]
+        result.loc[hit, "certainty"] = values[:, 1]
+    if not hit.all():
+        predicted = predict(batch.loc[~hit], stats)
+        result.loc[~hit, "prediction"] = predicted["prediction"]
+        result.loc[~hit, "certainty"] = predicted["certainty"]
+        if cache:
+            cache.put_many(
+                {key: (p, c) for key, p, c in zip(
+                    [key for key, h in zip(keys, hit) if not h],
+                    predicted["prediction"], predicted["certainty"],
+                ) if key},
+                model_id,
+            )
+
+    stats["cached"] = stats.get("cached", 0) + int(hit.sum())
+    stats["predicted"] = stats.get("predicted", 0) + int((~hit).sum())
+    inc("ria_documents_total", len(batch), stage="predicted")
+    return result
+
+
+def predict_in_batches(rows, config: dict, batch_size: int = None,
+                       progress_callback=None, stats: dict = None, total: int = None):
+    """Predict ``rows`` (scraper result dicts) in fixed-size micro-batches.
+
+    ``rows`` may be any iterable (e.g. a result file read lazily with
+    backend.results.iter_results); pass ``total`` for progress when it has
+    no length. Yields one result DataFrame per batch, indexed by row
+    position, so the caller can write output incrementally; only one batch
+    of rows and preprocessed features is held in memory at a time. Numacs
+    already predicted by the current model come from the prediction cache.
+    When given, ``stats`` is filled with the number of cached and freshly
+    predicted rows (and, in cascade mode, how many documents were escalated).
+    """
+    stats = stats if stats is not None else {}
+    batch_size = batch_size or config.get("predict_batch_size", 256)
+    cache = get_prediction_cache(config)
+    total = total if total is not None else len(rows)
+    rows = iter(rows)
+    start = 0
+    while True:
+        chunk = list(islice(rows, batch_size))
+        if not chunk:
+            break
+        model_id, predict = _resolve_predictor(config)
+        if cache:
+            cache.use_model(model_id)
+        batch = pd.DataFrame(chunk)
+        batch.index += start
+        yield _predict_with_cache(batch, model_id, predict, cache, stats)
+        start += len(chunk)
+        if progress_callback:
+            progress_callback(min(start, total), total)
+
+
+def cascade_summary(stats: dict) -> dict:
+    """How much expensive-model work the cascade avoided, from predict_in_batches stats."""
+    documents = stats.get("cascade_documents", 0)
+    escalated = stats.get("escalated", 0)
+    return {
+        "documents": documents,
+        "escalated": escalated,
+        "expensive_runs_saved": documents - escalated,
+        "saved_fraction": round(1 - escalated / documents, 4) if documents else None,
+    }
+
+
+def classify_texts(texts: list, config: dict) -> list:
+    """Classify raw texts with the warm model; one result dict per text.
+
+    Runs spaCy in-process: forking ``spacy_workers`` processes costs far more
+    than lemmatizing one /api/classify micro-batch, so only jobs use them.
+    """
+    config = {**config, "spacy_workers": 1}
+    model_id, predict = _resolve_predictor(config)
+    result = predict(pd.DataFrame({"long_text": texts}), {})
+    return [
+        {"prediction": float(p), "certainty": float(c), "model": model_id}
+        for p, c in zip(result["prediction"], result["certainty"])
+    ]
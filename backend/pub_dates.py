@@ -0,0 +1,40 @@
+"""
+Publication dates of Staatsblad listing entries.
+
+Kept apart from backend.scraper so the caches and the law store can place
+documents on a day without importing Selenium and BeautifulSoup.
+"""
+
+import re
+from datetime import datetime
+
+_MONTHS = {
+    # Dutch
+    "januari": 1, "februari": 2, "maart": 3, "april": 4, "mei": 5, "juni": 6,
+    "juli": 7, "augustus": 8, "september": 9, "oktober": 10, "november": 11, "december": 12,
+    # French
+    "janvier": 1, "février": 2, "fevrier": 2, "mars": 3, "avril": 4, "mai": 5, "juin": 6,
+    "juillet": 7, "août": 8, "aout": 8, "septembre": 9, "octobre": 10, "novembre": 11,
+    "décembre": 12, "decembre": 12,
+}
+
+_DATE_PATTERNS = [
+    (re.compile(r"(\d{4})-(\d{2})-(\d{2})"), lambda m: (m[1], m[2], m[3])),
+    (re.compile(r"(\d{1,2})[/.](\d{1,2})[/.](\d{4})"), lambda m: (m[3], m[2], m[1])),
+    (re.compile(r"(\d{1,2})\s+([a-zéû]+)\s+(\d{4})", re.IGNORECASE),
+     lambda m: (m[3], _MONTHS.get(m[2].lower()), m[1])),
+]
+
+
+def parse_pub_date(text: str):
+    """Publication date of a listing entry ("31 januari 2025", "2025-01-31", …), or None."""
+    for pattern, fields in _DATE_PATTERNS:
+        match = pattern.search(text or "")
+        if not match:
+            continue
+        year, month, day = fields(match)
+        try:
+            return datetime(int(year), int(month), int(day)).date()
+        except (TypeError, ValueError):
+            continue
+    return None
@@ -0,0 +1,30 @@
+"""
+JSON responses encoded with orjson.
+
+orjson encodes the large row lists of the result endpoints several times
+faster than the standard library, and serializes NumPy arrays and scalars
+(``prediction``/``certainty`` values) natively. Routes that return big
+payloads build a FastJSONResponse themselves, which also skips FastAPI's
+``jsonable_encoder`` pass over every value.
+"""
+
+import orjson
+from fastapi.responses import JSONResponse
+
+_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(value):
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    return str(value)
+
+
+def dumps(content) -> bytes:
+    """orjson-encoded ``content``; NaN becomes null, unknown types their str()."""
+    return orjson.dumps(content, default=_default, option=_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -0,0 +1,298 @@
+"""
+Job results on disk — one Arrow IPC file per job.
+
+Job records only keep the path (``result_ref``). Rows are written in record
+batches as they are produced and read back through a memory map, so
+previews, pages and prediction input only touch the batches and columns
+they need: the API's RSS stays flat however many jobs have run.
+
+Nested values (e.g. ``articles``) are stored as JSON text; the names of
+those columns are kept in the schema metadata and decoded on read.
+
+Pages are addressed by an opaque cursor (the index of the next row), so
+fetching page N seeks straight to its record batch.
+"""
+
+import base64
+import json
+import os
+
+import pyarrow as pa
+
+_JSON_COLUMNS_KEY = b"json_columns"
+
+# Rows buffered per record batch
+BATCH_ROWS = 1024
+
+
+def _default(value):
+    if hasattr(value, "tolist"):  # NumPy scalar or array
+        return value.tolist()
+    return str(value)
+
+
+def _scalar(value):
+    if hasattr(value, "tolist"):  # NumPy scalar or array
+        value = value.tolist()
+    if isinstance(value, float) and value != value:  # NaN from pandas
+        return None
+    return value
+
+
+def result_path(results_dir: str, job_id: str) -> str:
+    return os.path.join(results_dir, f"{job_id}.arrow")
+
+
+class ResultWriter:
+    """Append rows to a job's result file; the file only appears once closed.
+
+    The schema grows with the rows: a key first seen in a later batch adds a
+    column (null in earlier rows), an all-null column takes the type of its
+    first values and integers widen to floats. Each change rewrites the
+    batches written so far, so it costs one copy of the partial file.
+    Values that cannot share a column (e.g. numbers and text) raise
+    ValueError instead of being coerced.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._tmp_path = path + ".tmp"
+        self._buffer = []
+        self._schema = None
+        self._json_columns = set()
+        self._filled = set()  # columns with a non-null value written
+        self._sink = None
+        self._writer = None
+
+    def write(self, rows):
+        for row in rows:
+            self._buffer.append(row)
+            self.count += 1
+            if len(self._buffer) >= BATCH_ROWS:
+                self._flush()
+
+    def _columns(self, rows: list) -> dict:
+        keys = dict.fromkeys(key for row in rows for key in row)
+        columns = {}
+        for key in keys:
+            values = [_scalar(row.get(key)) for row in rows]
+            if key not in self._json_columns and any(isinstance(v, (list, dict)) for v in values):
+                if key in self._filled:
+                    raise ValueError(f"Result column '{key}' holds nested values after scalar ones")
+                self._json_columns.add(key)
+            if key in self._json_columns:
+                values = [None if v is None else json.dumps(v, ensure_ascii=False, default=_default)
+                          for v in values]
+            columns[key] = values
+        return columns
+
+    def _batch(self, rows: list) -> pa.RecordBatch:
+        arrays, names = [], []
+        for key, values in self._columns(rows).items():
+            try:
+                arrays.append(pa.array(values))
+            except (pa.ArrowInvalid, pa.ArrowTypeError) as exc:
+                raise ValueError(f"Result column '{key}' mixes incompatible values: {exc}") from None
+            names.append(key)
+        return pa.RecordBatch.from_arrays(arrays, names=names)
+
+    def _unify(self, schema: pa.Schema) -> pa.Schema:
+        """Schema holding both the rows written so far and ``schema``."""
+        metadata = {_JSON_COLUMNS_KEY: json.dumps(sorted(self._json_columns)).encode()}
+        schemas = [schema] if self._schema is None else [self._schema, schema]
+        try:
+            unified = pa.unify_schemas(schemas, promote_options="permissive")
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as exc:
+            raise ValueError(f"Result rows do not fit the columns of earlier rows: {exc}") from None
+        return unified.with_metadata(metadata)
+
+    @staticmethod
+    def _conform(batch: pa.RecordBatch, schema: pa.Schema) -> pa.RecordBatch:
+        names = batch.schema.names
+        arrays = [batch.column(field.name).cast(field.type) if field.name in names
+                  else pa.nulls(batch.num_rows, field.type) for field in schema]
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    def _open(self, schema: pa.Schema):
+        self._schema = schema
+        self._sink = pa.OSFile(self._tmp_path, "wb")
+        self._writer = pa.ipc.new_file(self._sink, self._schema)
+
+    def _rewrite(self, schema: pa.Schema):
+        """Copy the batches written so far into a new file with ``schema``."""
+        self._writer.close()
+        self._sink.close()
+        old_path = self._tmp_path + ".old"
+        os.replace(self._tmp_path, old_path)
+        self._open(schema)
+        with pa.memory_map(old_path, "r") as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                self._writer.write_batch(self._conform(reader.get_batch(i), schema))
+        os.remove(old_path)
+
+    def _flush(self):
+        batch = self._batch(self._buffer)
+        schema = self._unify(batch.schema)
+        if self._writer is None:
+            self._open(schema)
+        elif not schema.equals(self._schema, check_metadata=True):
+            self._rewrite(schema)
+        if self._buffer:
+            self._writer.write_batch(self._conform(batch, self._schema))
+            self._filled.update(name for name, column in zip(batch.schema.names, batch.columns)
+                                if column.null_count < len(column))
+        self._buffer = []
+
+    def close(self):
+        if self._buffer or self._writer is None:
+            self._flush()
+        self._writer.close()
+        self._sink.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._sink.close()
+        for path in (self._tmp_path, self._tmp_path + ".old"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def write_results(path: str, rows) -> int:
+    """Write all rows at once; returns the number of rows written."""
+    with ResultWriter(path) as writer:
+        writer.write(rows)
+    return writer.count
+
+
+# ── Reading ───────────────────────────────────────────────────────────────────
+
+class _ResultFile:
+    """Memory-mapped result file; batches are only decoded when read."""
+
+    def __init__(self, path: str):
+        self._source = pa.memory_map(path, "r")
+        self._reader = pa.ipc.open_file(self._source)
+        metadata = self._reader.schema.metadata or {}
+        self.json_columns = set(json.loads(metadata.get(_JSON_COLUMNS_KEY, b"[]")))
+        self.columns = self._reader.schema.names
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._source.close()
+
+    def batches(self, start: int = 0, fields: list = None, limit: int = None):
+        """Yield ``(index of first row, rows)`` per record batch.
+
+        Only rows ``start`` … ``start + limit`` and the requested columns
+        are decoded; other batches are skipped without being read.
+        """
+        columns = self.columns if fields is None else [c for c in fields if c in self.columns]
+        end = None if limit is None else start + limit
+        offset = 0
+        for i in range(self._reader.num_record_batches):
+            if end is not None and offset >= end:
+                return
+            batch = self._reader.get_batch(i)
+            if offset + batch.num_rows <= start:
+                offset += batch.num_rows
+                continue
+            skip = max(start - offset, 0)
+            length = None if end is None else end - offset - skip
+            rows = batch.select(columns).slice(skip, length).to_pylist()
+            for key in self.json_columns.intersection(columns):
+                for row in rows:
+                    if row[key] is not None:
+                        row[key] = json.loads(row[key])
+            yield offset + skip, rows
+            offset += batch.num_rows
+
+
+def iter_results(path: str, fields: list = None):
+    """Yield the rows of a result file one at a time, optionally projected."""
+    with _ResultFile(path) as result:
+        for _, rows in result.batches(fields=fields):
+            yield from rows
+
+
+def read_schema(path: str) -> pa.Schema:
+    with _ResultFile(path) as result:
+        return result._reader.schema
+
+
+def iter_batches(path: str):
+    """Yield the raw record batches of a result file (nested columns as JSON text)."""
+    with _ResultFile(path) as result:
+        for i in range(result._reader.num_record_batches):
+            yield result._reader.get_batch(i)
+
+
+def read_results(path: str, limit: int = None) -> list:
+    with _ResultFile(path) as result:
+        return [row for _, rows in result.batches(limit=limit) for row in rows]
+
+
+# ── Cursors ───────────────────────────────────────────────────────────────────
+
+def encode_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(str(offset).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Row index for ``cursor``; raises ValueError when it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        offset = int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except Exception:
+        raise ValueError(f"Invalid cursor '{cursor}'")
+    if offset < 0:
+        raise ValueError(f"Invalid cursor '{cursor}'")
+    return offset
+
+
+def iter_from(path: str, cursor: str = None, fields: list = None, limit: int = None):
+    """Yield ``(row, next_cursor)`` pairs starting at ``cursor``.
+
+    Args:
+        path:    Result file.
+        cursor:  Cursor returned by an earlier page, or None for the start.
+        fields:  Keys to keep per row, or None for the full row.
+        limit:   Maximum number of rows, or None for all remaining rows.
+
+    Returns:
+        Generator; ``next_cursor`` points just past the yielded row.
+    """
+    start = decode_cursor(cursor) if cursor else 0
+    with _ResultFile(path) as result:
+        for first, rows in result.batches(start, fields, limit):
+            for i, row in enumerate(rows):
+                yield row, encode_cursor(first + i + 1)
+
+
+def read_page(path: str, cursor: str = None, limit: int = 100, fields: list = None):
+    """Read up to ``limit`` rows from ``cursor``.
+
+    Returns:
+        (rows, next_cursor) — next_cursor is None once the file is exhausted.
+    """
+    # Read one row ahead so a full last page does not send the client
+    # after an empty one
+    pairs = list(iter_from(path, cursor, fields, limit + 1))
+    if len(pairs) <= limit:
+        return [row for row, _ in pairs], None
+    return [row for row, _ in pairs[:limit]], pairs[limit - 1][1]
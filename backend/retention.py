@@ -0,0 +1,252 @@
+"""
+Retention — expire finished jobs and keep result files within a byte budget.
+
+Job results and exports live on disk (see backend.results / backend.exports),
+so a long-running deployment grows by every job it ever ran. A sweep, run
+periodically by the API process:
+
+  1. Deletes finished jobs older than the TTL of their status, together
+     with their result and export files.
+  2. While result + export files exceed ``max_result_bytes``, deletes the
+     least recently used ones. Jobs whose results were evicted keep their
+     record and are marked ``results_evicted``; their endpoints answer 410.
+  3. Runs the cache evictions it was given (see backend.prediction_cache).
+
+Files without a job record are only removed from a results folder that
+this job store owns: the first sweep writes the store's fingerprint to
+``.owner`` there, and a store with another fingerprint (e.g. a test run
+against a temporary store) leaves the orphans alone.
+
+Files of jobs that are still queued or running are never evicted, and
+neither are the results of a scrape job that a queued or running predict or
+ingest job (its ``scrape_job_id``) still has to read. Reads go
+through ``touch``, which moves a file's access time forward for the LRU order.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+from .exports import EXPORT_FORMATS
+from .metrics import REGISTRY
+
+TERMINAL_STATUSES = ("done", "error", "cancelled")
+
+# Files without a job record are only removed once they are this old, so a
+# result written just before its job record is never mistaken for one
+_ORPHAN_GRACE_S = 3600
+
+_OWNER_FILE = ".owner"
+
+
+def touch(path: str):
+    """Mark ``path`` as just used (access time only; the mtime is kept)."""
+    try:
+        os.utime(path, (time.time(), os.stat(path).st_mtime))
+    except OSError:
+        pass
+
+
+@dataclass
+class _File:
+    path: str
+    job_id: str
+    kind: str  # "results" or "exports"
+    size: int
+    used: float  # last access
+    modified: float
+
+
+def _scan(directory: str, kind: str, extensions: tuple) -> list:
+    files = []
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return files
+    for entry in entries:
+        job_id, extension = os.path.splitext(entry.name)
+        if extension not in extensions or not entry.is_file():
+            continue  # *.tmp files are still being written
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        files.append(_File(entry.path, job_id, kind, stat.st_size,
+                           max(stat.st_atime, stat.st_mtime), stat.st_mtime))
+    return files
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class Retention:
+    def __init__(self, jobs, results_dir: str, exports_dir: str, settings: dict, owner: str = "",
+                 evictions: tuple = ()):
+        """
+        Args:
+            jobs:         backend.job_store.JobStore.
+            results_dir:  Folder of the ``<job_id>.arrow`` result files.
+            exports_dir:  Folder of the cached ``<job_id>.<ext>`` exports.
+            settings:     config.json "retention" section ({"ttl_s":
+                          {status: seconds}, "max_result_bytes", "interval_s"}).
+            owner:        Identifies ``jobs`` (its URL); only hashed to disk.
+            evictions:    Callables(now) -> rows evicted, run by every sweep
+                          (e.g. dropping prediction cache rows of old models).
+        """
+        self.jobs = jobs
+        self.results_dir = results_dir
+        self.exports_dir = exports_dir
+        self.settings = settings
+        self.owner = hashlib.sha256(owner.encode()).hexdigest()
+        self.evictions = evictions
+        self.usage = {}
+        self._statuses = set()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _files(self) -> list:
+        extensions = tuple(extension for _, extension in EXPORT_FORMATS.values())
+        return (_scan(self.results_dir, "results", (".arrow",))
+                + _scan(self.exports_dir, "exports", extensions))
+
+    def _owns_results(self) -> bool:
+        """Whether orphaned files in results_dir belong to this store; claims the folder if unclaimed."""
+        path = os.path.join(self.results_dir, _OWNER_FILE)
+        try:
+            with open(path) as f:
+                return f.read().strip() == self.owner
+        except FileNotFoundError:
+            pass
+        os.makedirs(self.results_dir, exist_ok=True)
+        with open(path, "w") as f:
+            f.write(self.owner)
+        return True
+
+    def sweep(self, now: float = None) -> dict:
+        """Apply the TTLs and the byte budget once. Returns the usage report."""
+        now = now or time.time()
+        ttl = self.settings.get("ttl_s", {})
+        budget = self.settings.get("max_result_bytes")
+        files = self._files()
+
+        # Results still to be read by an unfinished predict/ingest job
+        records = dict(self.jobs.items())
+        in_use = {job["scrape_job_id"] for job in records.values()
+                  if job.get("scrape_job_id") and job.get("status") not in TERMINAL_STATUSES}
+
+        # 1. TTL per status
+        jobs, expired = {}, set()
+        for job_id, job in records.items():
+            status = job.get("status")
+            age = now - job.get("updated_at", job.get("created_at", now))
+            if (status in TERMINAL_STATUSES and status in ttl and age > ttl[status]
+                    and job_id not in in_use):
+                self.jobs.delete(job_id)
+                expired.add(job_id)
+            else:
+                jobs[job_id] = job
+        for file in files:
+            if file.job_id in expired:
+                _remove(file.path)
+        files = [file for file in files if file.job_id not in expired]
+
+        # 2. Orphaned files (their job is gone), unless another store owns them
+        orphans = [file for file in files if file.job_id not in jobs
+                   and now - file.modified > _ORPHAN_GRACE_S] if self._owns_results() else []
+        for file in orphans:
+            _remove(file.path)
+        files = [file for file in files if file not in orphans]
+
+        # 3. Byte budget, least recently used first
+        evicted = 0
+        total = sum(file.size for file in files)
+        if budget is not None and total > budget:
+            evictable = [file for file in files if file.job_id not in in_use
+                         and jobs.get(file.job_id, {}).get("status") in TERMINAL_STATUSES]
+            for file in sorted(evictable, key=lambda file: file.used):
+                if total <= budget:
+                    break
+                if file not in files:
+                    continue  # export already dropped with its job's results
+                # Exports cannot be downloaded without the results they came from
+                dropped = [other for other in files if other.job_id == file.job_id
+                           and other.kind == "exports"] if file.kind == "results" else []
+                for other in [file, *dropped]:
+                    _remove(other.path)
+                    files.remove(other)
+                    total -= other.size
+                    evicted += 1
+                if file.kind == "results":
+                    try:
+                        self.jobs.update(file.job_id, result_ref=None, results_evicted=now)
+                    except KeyError:
+                        pass
+
+        # 4. Caches with their own eviction rules
+        cache_rows = 0
+        for evict in self.evictions:
+            try:
+                cache_rows += evict(now)
+            except Exception as exc:
+                print(f"  [retention] cache eviction failed: {exc}")
+
+        by_status = {}
+        for job in jobs.values():
+            by_status[job.get("status")] = by_status.get(job.get("status"), 0) + 1
+        self.usage = {
+            "jobs": by_status,
+            "result_bytes": sum(file.size for file in files if file.kind == "results"),
+            "export_bytes": sum(file.size for file in files if file.kind == "exports"),
+            "max_result_bytes": budget,
+            "expired_jobs": len(expired),
+            "evicted_files": evicted + len(orphans),
+            "evicted_cache_rows": cache_rows,
+            "swept_at": now,
+        }
+        self._record(by_status, len(expired), evicted + len(orphans))
+        if cache_rows:
+            print(f"  [retention] evicted {cache_rows} cache rows")
+        if expired or evicted or orphans:
+            print(f"  [retention] expired {len(expired)} jobs, evicted {evicted + len(orphans)} files; "
+                  f"{(self.usage['result_bytes'] + self.usage['export_bytes']) / 1e6:.1f} MB held")
+        return self.usage
+
+    def _record(self, by_status: dict, expired: int, evicted: int):
+        self._statuses.update(by_status)
+        for status in self._statuses:
+            REGISTRY.set("ria_jobs_stored", by_status.get(status, 0), status=str(status))
+        REGISTRY.set("ria_storage_bytes", self.usage["result_bytes"], kind="results")
+        REGISTRY.set("ria_storage_bytes", self.usage["export_bytes"], kind="exports")
+        if self.usage["max_result_bytes"] is not None:
+            REGISTRY.set("ria_storage_budget_bytes", self.usage["max_result_bytes"])
+        REGISTRY.inc("ria_retention_evictions_total", expired, reason="ttl")
+        REGISTRY.inc("ria_retention_evictions_total", evicted, reason="budget")
+
+    def start(self):
+        """Sweep now and then every ``interval_s`` in a daemon thread."""
+        interval = self.settings.get("interval_s", 600)
+        if self._thread is not None or not interval:
+            return
+        self._stop.clear()
+
+        def run():
+            while True:
+                try:
+                    self.sweep()
+                except Exception as exc:
+                    print(f"  [retention] sweep failed: {exc}")
+                if self._stop.wait(interval):
+                    return
+
+        self._thread = threading.Thread(target=run, name="retention", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread = None
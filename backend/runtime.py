@@ -0,0 +1,165 @@
+"""
+TensorFlow-free inference runtime for the classifier networks.
+
+scripts/export_runtime.py converts a Keras JSON + weights model into a
+single ``<timestamp>__runtime.npz`` file next to the weights. That file
+holds a JSON layer spec plus the raw weight arrays; ``NumpyModel`` replays
+the forward pass with plain NumPy, so prediction needs no Keras at all.
+
+Supported layers: InputLayer, Dense, Dropout (identity at inference), LSTM,
+Activation.
+"""
+
+import json
+
+import numpy as np
+
+RUNTIME_SUFFIX = "__runtime.npz"
+
+
+# ── Activations ───────────────────────────────────────────────────────────────
+
+def _sigmoid(x):
+    # tanh form is numerically stable for large |x|
+    return 0.5 * (1.0 + np.tanh(0.5 * x))
+
+
+def _softmax(x):
+    e = np.exp(x - x.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    None: lambda x: x,
+    "relu": lambda x: np.maximum(x, 0),
+    "sigmoid": _sigmoid,
+    "tanh": np.tanh,
+    "softmax": _softmax,
+}
+
+
+def _activation(name):
+    if name not in ACTIVATIONS:
+        raise ValueError(f"Unsupported activation '{name}'")
+    return ACTIVATIONS[name]
+
+
+# ── Layers ────────────────────────────────────────────────────────────────────
+
+def _dense(x, spec, weights):
+    y = x @ weights[0]
+    if spec.get("use_bias", True):
+        y = y + weights[1]
+    return _activation(spec.get("activation"))(y)
+
+
+def _lstm(x, spec, weights):
+    """Keras LSTM forward pass; gate order in the fused kernels is i, f, c, o."""
+    kernel, recurrent_kernel = weights[0], weights[1]
+    bias = weights[2] if spec.get("use_bias", True) else 0.0
+    units = recurrent_kernel.shape[0]
+    act = _activation(spec.get("activation", "tanh"))
+    rec_act = _activation(spec.get("recurrent_activation", "sigmoid"))
+
+    if spec.get("go_backwards"):
+        x = x[:, ::-1]
+
+    n, steps, _ = x.shape
+    # Input projection for all timesteps at once; only the recurrence is sequential
+    projected = x @ kernel + bias
+    h = np.zeros((n, units), dtype=x.dtype)
+    c = np.zeros((n, units), dtype=x.dtype)
+    outputs = []
+    for t in range(steps):
+        z = projected[:, t] + h @ recurrent_kernel
+        i = rec_act(z[:, :units])
+        f = rec_act(z[:, units:2 * units])
+        g = act(z[:, 2 * units:3 * units])
+        o = rec_act(z[:, 3 * units:])
+        c = f * c + i * g
+        h = o * act(c)
+        if spec.get("return_sequences"):
+            outputs.append(h)
+
+    if spec.get("return_sequences"):
+        out = np.stack(outputs, axis=1)
+        return out[:, ::-1] if spec.get("go_backwards") else out
+    return h
+
+
+LAYERS = {
+    "Dense": _dense,
+    "LSTM": _lstm,
+    "Dropout": lambda x, spec, weights: x,
+    "InputLayer": lambda x, spec, weights: x,
+    "Activation": lambda x, spec, weights: _activation(spec.get("activation"))(x),
+}
+
+# Layer config keys the forward pass needs; everything else is training-only
+_SPEC_KEYS = ("activation", "recurrent_activation", "use_bias",
+              "return_sequences", "go_backwards", "units")
+
+
+# ── Model ─────────────────────────────────────────────────────────────────────
+
+class NumpyModel:
+    """Sequential network evaluated with NumPy; mirrors ``keras.Model.predict``."""
+
+    def __init__(self, layers: list, dtype=np.float32):
+        # layers: list of (class_name, spec dict, list of weight arrays)
+        for class_name, _, _ in layers:
+            if class_name not in LAYERS:
+                raise ValueError(f"Unsupported layer '{class_name}'")
+        self.layers = layers
+        self.dtype = dtype
+
+    @classmethod
+    def load(cls, path: str) -> "NumpyModel":
+        with np.load(path, allow_pickle=False) as data:
+            spec = json.loads(str(data["spec"]))
+            layers = [
+                (layer["class_name"], layer["config"],
+                 [data[f"layer{i}_w{j}"] for j in range(layer["n_weights"])])
+                for i, layer in enumerate(spec["layers"])
+            ]
+        return cls(layers)
+
+    def save(self, path: str):
+        arrays = {}
+        spec = {"layers": []}
+        for i, (class_name, config, weights) in enumerate(self.layers):
+            spec["layers"].append({
+                "class_name": class_name,
+                "config": config,
+                "n_weights": len(weights),
+            })
+            for j, w in enumerate(weights):
+                arrays[f"layer{i}_w{j}"] = np.asarray(w, dtype=self.dtype)
+        with open(path, "wb") as f:
+            np.savez(f, spec=np.array(json.dumps(spec)), **arrays)
+
+    @classmethod
+    def from_keras(cls, keras_model) -> "NumpyModel":
+        layers = []
+        for layer in keras_model.layers:
+            class_name = layer.__class__.__name__
+            config = layer.get_config()
+            layers.append((
+                class_name,
+                {k: config[k] for k in _SPEC_KEYS if k in config},
+                [np.asarray(w) for w in layer.get_weights()],
+            ))
+        return cls(layers)
+
+    def predict(self, x, batch_size: int = 1024, **_) -> np.ndarray:
+        x = np.asarray(x, dtype=self.dtype)
+        outputs = []
+        for start in range(0, len(x), batch_size):
+            y = x[start:start + batch_size]
+            for class_name, spec, weights in self.layers:
+                y = LAYERS[class_name](y, spec, weights)
+            outputs.append(y)
+        if not outputs:
+            return np.zeros((0, 1), dtype=self.dtype)
+        return np.concatenate(outputs, axis=0)
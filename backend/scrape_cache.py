@@ -0,0 +1,222 @@
+"""
+Scrape cache — SQLite store of scraped documents per (doc_type, publication day).
+
+Table: scrape_days
+  Each row = one (doc_type, day) whose listing was scraped completely,
+  including days on which nothing was published
+Table: scrape_documents
+  Each row = one fetched and classified document of a covered day
+  Key: (doc_type, day, ref_number)
+
+Only days at least ``min_age_days`` old are cached: the Staatsblad does not
+change past issues, so those entries never expire. A scrape job reads the
+covered days from here and only scrapes the remaining date ranges.
+"""
+
+import json
+import time
+from datetime import date, timedelta
+
+from .pub_dates import parse_pub_date
+from .sqlite_cache import SQLiteCache
+
+CREATE_TABLES_SQL = """
+CREATE TABLE IF NOT EXISTS scrape_days (
+    doc_type    TEXT NOT NULL,
+    day         TEXT NOT NULL,
+    scraped_at  REAL NOT NULL,
+    PRIMARY KEY (doc_type, day)
+);
+CREATE TABLE IF NOT EXISTS scrape_documents (
+    doc_type    TEXT NOT NULL,
+    day         TEXT NOT NULL,
+    ref_number  TEXT NOT NULL,
+    position    INTEGER NOT NULL,
+    data        TEXT NOT NULL,
+    PRIMARY KEY (doc_type, day, ref_number)
+);
+"""
+
+
+def _days(start: date, end: date):
+    day = start
+    while day <= end:
+        yield day
+        day += timedelta(days=1)
+
+
+def uncovered_ranges(start: date, end: date, covered: set) -> list:
+    """Contiguous (start, end) ranges of the days in [start, end] not in ``covered``."""
+    ranges = []
+    for day in _days(start, end):
+        if day in covered:
+            continue
+        if ranges and ranges[-1][1] == day - timedelta(days=1):
+            ranges[-1] = (ranges[-1][0], day)
+        else:
+            ranges.append((day, day))
+    return ranges
+
+
+class ScrapeCache(SQLiteCache):
+    """Persistent (doc_type, day) → scraped documents lookup.
+
+    Hits count days served from the cache, misses days that had to be scraped.
+    """
+
+    NAME = "scrape_day"
+    SCHEMA_SQL = CREATE_TABLES_SQL
+
+    def __init__(self, path: str, min_age_days: int = 1):
+        self.min_age_days = min_age_days
+        super().__init__(path)
+
+    def covered_days(self, doc_type: str, start: date, end: date) -> set:
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT day FROM scrape_days WHERE doc_type = ? AND day BETWEEN ? AND ?",
+                (doc_type, start.isoformat(), end.isoformat()),
+            ).fetchall()
+        finally:
+            conn.close()
+        return {date.fromisoformat(day) for (day,) in rows}
+
+    def get_documents(self, doc_type: str, start: date, end: date) -> list:
+        """Cached ``(day, document)`` pairs of ``doc_type`` published in [start, end]."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT day, data FROM scrape_documents "
+                "WHERE doc_type = ? AND day BETWEEN ? AND ? ORDER BY day, position",
+                (doc_type, start.isoformat(), end.isoformat()),
+            ).fetchall()
+        finally:
+            conn.close()
+        return [(date.fromisoformat(day), json.loads(data)) for day, data in rows]
+
+    def put_range(self, doc_type: str, start: date, end: date, documents: list,
+                  today: date = None, incomplete: set = frozenset()) -> int:
+        """Cache a scrape of ``doc_type`` over [start, end].
+
+        Days younger than ``min_age_days`` are left out, as are the days in
+        ``incomplete`` (their listing or a detail fetch failed), so they are
+        scraped again next time. Nothing is cached when ``incomplete``
+        contains None (the listing itself was cut short) or a document's
+        publication day cannot be determined, since no day could then be
+        marked complete.
+
+        Returns:
+            Number of days cached.
+        """
+        if None in incomplete:
+            print(f"  [scrape-cache] listing of {doc_type} in {start}…{end} was incomplete; not caching")
+            return 0
+        by_day = {}
+        for document in documents:
+            day = parse_pub_date(document.get("pub_date", ""))
+            if day is None or not start <= day <= end:
+                print(f"  [scrape-cache] cannot place pub_date {document.get('pub_date')!r} "
+                      f"in {start}…{end}; not caching {doc_type} for this range")
+                return 0
+            by_day.setdefault(day, []).append(document)
+
+        last_final = (today or date.today()) - timedelta(days=self.min_age_days)
+        days = [day for day in _days(start, end) if day <= last_final and day not in incomplete]
+        if not days:
+            return 0
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO scrape_documents "
+                    "(doc_type, day, ref_number, position, data) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (doc_type, day.isoformat(), document.get("ref_number", ""), position,
+                         json.dumps(document, ensure_ascii=False, default=str))
+                        for day in days
+                        for position, document in enumerate(by_day.get(day, []))
+                    ],
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO scrape_days (doc_type, day, scraped_at) VALUES (?, ?, ?)",
+                    [(doc_type, day.isoformat(), now) for day in days],
+                )
+        finally:
+            conn.close()
+        return len(days)
+
+
+def scrape_with_cache(cache: ScrapeCache, start: date, end: date, doc_types: list, scrape,
+                      today: date = None, progress_callback=None) -> tuple:
+    """Assemble documents for [start, end] from the cache, scraping only uncovered days.
+
+    The days some doc type still lacks are grouped into ranges, and each
+    range is scraped once, in one browser session, for every doc type that
+    lacks any of its days. A type that already had some of those days cached
+    gets them from the fresh scrape instead.
+
+    Args:
+        cache:      ScrapeCache.
+        start, end: Publication date range (inclusive).
+        doc_types:  Document types to return.
+        scrape:     Callable(doc_types, start, end, progress) -> (documents,
+                    incomplete); runs one scrape of several doc types over
+                    one date range. ``progress`` is a callable(done, total)
+                    for that scrape. ``incomplete`` holds the (doc_type, day)
+                    pairs whose documents may be missing (day None: the
+                    whole range); those days are not cached.
+        today:      Reference day for ``min_age_days`` (defaults to today).
+        progress_callback: Optional callable(done, total) over all scraped
+                    days; ``done`` is fractional while a range is scraped.
+
+    Returns:
+        (documents, {"cached_days": int, "scraped_days": int}); days are
+        counted per doc type.
+    """
+    covered = {doc_type: cache.covered_days(doc_type, start, end) for doc_type in doc_types}
+    # Read before scraping so newly cached days are not returned twice
+    cached = {doc_type: cache.get_documents(doc_type, start, end) if covered[doc_type] else []
+              for doc_type in doc_types}
+    covered_by_all = set.intersection(*covered.values()) if covered else set()
+    plan = []
+    for range_start, range_end in uncovered_ranges(start, end, covered_by_all):
+        days = set(_days(range_start, range_end))
+        plan.append((range_start, range_end,
+                     [doc_type for doc_type in doc_types if days - covered[doc_type]]))
+
+    total_days = sum((range_end - range_start).days + 1 for range_start, range_end, _ in plan)
+    done_days = 0
+    scraped = {doc_type: [] for doc_type in doc_types}  # (start, end, documents) per range
+    for range_start, range_end, types in plan:
+        length = (range_end - range_start).days + 1
+
+        def progress(done, total, before=done_days, length=length):
+            if progress_callback and total:
+                progress_callback(before + length * done / total, total_days)
+
+        documents, incomplete = scrape(types, range_start, range_end, progress)
+        for doc_type in types:
+            own = [document for document in documents if document.get("doc_type") == doc_type]
+            cache.put_range(doc_type, range_start, range_end, own, today,
+                            {day for other, day in incomplete if other == doc_type})
+            scraped[doc_type].append((range_start, range_end, own))
+        done_days += length
+        if progress_callback:
+            progress_callback(done_days, total_days)
+
+    result = []
+    cached_days = scraped_days = 0
+    for doc_type in doc_types:
+        ranges = scraped[doc_type]
+        fresh = {day for range_start, range_end, _ in ranges for day in _days(range_start, range_end)}
+        cached_days += len(covered[doc_type] - fresh)
+        scraped_days += len(fresh)
+        segments = [(day, [document]) for day, document in cached[doc_type] if day not in fresh]
+        segments += [(range_start, documents) for range_start, _, documents in ranges]
+        # Cached days and scraped ranges no longer overlap, so this is date order
+        for _, segment in sorted(segments, key=lambda item: item[0]):
+            result.extend(segment)
+    cache.record(cached_days, scraped_days)
+    return result, {"cached_days": cached_days, "scraped_days": scraped_days}
@@ -6,10 +6,15 @@ from urllib.parse import urljoin
 import requests
 from bs4 import BeautifulSoup
 from selenium import webdriver
+from selenium.common.exceptions import NoSuchElementException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import Select, WebDriverWait
 
+from .admission import browser_slot, fetch_slot
+from .metrics import inc, timed
+from .pub_dates import parse_pub_date
+
 
 # ---------------------------------------------------------------------------
 # Doc-type classification
@@ -137,30 +142,42 @@ def get_driver():
 # Main scraper
 # ---------------------------------------------------------------------------
 
-def scrape_documents(start_date: datetime, end_date: datetime, doc_types: list,
-                     url_searchpage: str, url_detail_page: str,
-                     progress_callback=None, max_results: int = None):
-    """Scrape ejustice.just.fgov.be for Belgian regulatory documents.
+def _quit(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass  # already quit by a cancelled job
 
-    Args:
-        start_date:       Start of publication date range.
-        end_date:         End of publication date range.
-        doc_types:        List of document type strings matching the site dropdown.
-        url_searchpage:   URL of the ejustice search form.
-        url_detail_page:  Base URL for building detail page links.
-        progress_callback: Optional callable(current, total) for progress reporting.
-        max_results:      Cap total results per doc_type (useful for testing).
 
-    Returns:
-        List of dicts with keys:
-          ref_number, pub_date, short_text, url, doc_type,
-          long_text, articles, embed (bool)
+def iter_listing(start_date: datetime, end_date: datetime, doc_types: list,
+                 url_searchpage: str, max_results: int = None, cancel=None,
+                 incomplete: set = None):
+    """Yield search-result entries page by page, as the browser reaches them.
+
+    Each entry is a dict with keys: ref_number, pub_date, short_text, url,
+    doc_type. The browser is closed when the generator is exhausted or closed,
+    or as soon as ``cancel`` (a backend.cancel.CancelToken) fires. Waits for a
+    free browser slot (see backend.admission) before launching Chrome.
+
+    The doc types whose listing was cut short (missing from the dropdown,
+    a page that could not be reached, or ``max_results``) are added to the
+    optional ``incomplete`` set.
     """
-    driver = get_driver()
-    scraping_result = []
+    with browser_slot(cancel):
+        yield from _iter_listing(start_date, end_date, doc_types, url_searchpage,
+                                 max_results, cancel,
+                                 incomplete if incomplete is not None else set())
+
+
+def _iter_listing(start_date, end_date, doc_types, url_searchpage, max_results, cancel, incomplete):
+    with timed("chrome_launch"):
+        driver = get_driver()
+    unregister = cancel.on_cancel(lambda: _quit(driver)) if cancel else None
 
     try:
         for doc_type in doc_types:
+            if cancel:
+                cancel.raise_if_cancelled()
             if doc_type in SKIP_TYPES:
                 continue
 
@@ -171,26 +188,31 @@ def scrape_documents(start_date: datetime, end_date: datetime, doc_types: list,
 
             if doc_type not in all_options:
                 print(f"  [skip] '{doc_type}' not found in site dropdown")
+                incomplete.add(doc_type)
                 continue
 
             # Fill and submit search form
-            driver.get(url_searchpage)
-            Select(driver.find_element(By.XPATH, "//select[@name='dt']")).select_by_value(doc_type)
+            with timed("listing_search"):
+                driver.get(url_searchpage)
+                Select(driver.find_element(By.XPATH, "//select[@name='dt']")).select_by_value(doc_type)
 
-            start_el = driver.find_element(By.XPATH, "//input[@name='pdd']")
-            driver.execute_script("arguments[0].value = arguments[1]", start_el, start_date.strftime("%Y-%m-%d"))
+                start_el = driver.find_element(By.XPATH, "//input[@name='pdd']")
+                driver.execute_script("arguments[0].value = arguments[1]", start_el, start_date.strftime("%Y-%m-%d"))
 
-            end_el = driver.find_element(By.XPATH, "//input[@name='pdf']")
-            driver.execute_script("arguments[0].value = arguments[1]", end_el, end_date.strftime("%Y-%m-%d"))
+                end_el = driver.find_element(By.XPATH, "//input[@name='pdf']")
+                driver.execute_script("arguments[0].value = arguments[1]", end_el, end_date.strftime("%Y-%m-%d"))
 
-            driver.find_element(By.XPATH, '//button[text()="Zoeken"]').click()
-            WebDriverWait(driver, 10).until(EC.url_contains("rech_res.pl"))
+                driver.find_element(By.XPATH, '//button[text()="Zoeken"]').click()
+                WebDriverWait(driver, 10).until(EC.url_contains("rech_res.pl"))
 
-            type_results = []
+            found = 0
 
             # Paginate through results
             while True:
-                soup = BeautifulSoup(driver.page_source, features="lxml")
+                if cancel:
+                    cancel.raise_if_cancelled()
+                with timed("listing_parse"):
+                    soup = BeautifulSoup(driver.page_source, features="lxml")
 
                 for tag in soup.find_all("div", {"class": "list"}):
                     contents = tag.find_all("div", {"class": "list-item--content"})
@@ -201,61 +223,149 @@ def scrape_documents(start_date: datetime, end_date: datetime, doc_types: list,
                         pub_date = content.find("p", {"class": "list-item--date"})
                         if not anchor:
                             continue
-                        type_results.append({
+                        yield {
                             "ref_number": button.text.strip(),
                             "pub_date": pub_date.text if pub_date else "",
                             "short_text": anchor.text.strip(),
                             "url": urljoin(url_searchpage, anchor["href"]),
                             "doc_type": doc_type,
-                        })
-                        if max_results and len(type_results) >= max_results:
+                        }
+                        inc("ria_documents_total", stage="listed")
+                        found += 1
+                        if max_results and found >= max_results:
                             break
 
-                    if max_results and len(type_results) >= max_results:
+                    if max_results and found >= max_results:
                         break
 
-                if max_results and len(type_results) >= max_results:
+                if max_results and found >= max_results:
+                    incomplete.add(doc_type)
                     break
 
                 try:
                     next_btn = driver.find_element(
                         By.XPATH, "//a[@class='pagination-button pagination-next']"
                     )
-                    next_btn.click()
-                except Exception:
+                except NoSuchElementException:
+                    break  # last page
+                try:
+                    with timed("listing_next_page"):
+                        next_btn.click()
+                except Exception as exc:
+                    if cancel:
+                        cancel.raise_if_cancelled()
+                    print(f"  [listing] '{doc_type}' stopped after {found} results, "
+                          f"next page failed: {exc}")
+                    incomplete.add(doc_type)
                     break
 
-            scraping_result.extend(type_results)
-
+    except Exception:
+        # Browser calls fail once a cancelled job has quit the driver
+        if cancel:
+            cancel.raise_if_cancelled()
+        raise
     finally:
-        driver.quit()
-
-    # Fetch full text and classify each result
-    total = len(scraping_result)
-    for i, item in enumerate(scraping_result):
-        try:
-            page = requests.get(item["url"], timeout=15)
-            soup = BeautifulSoup(page.text, features="lxml")
+        if unregister:
+            unregister()
+        _quit(driver)
+    if cancel:
+        cancel.raise_if_cancelled()
+
+
+def _download(url: str, timeout: float, cancel=None) -> str:
+    # Streamed in chunks so a cancelled job drops the connection mid-download
+    with fetch_slot(cancel), timed("detail_fetch"), \
+            requests.get(url, timeout=timeout, stream=True) as page:
+        chunks = []
+        for chunk in page.iter_content(chunk_size=65536):
+            if cancel:
+                cancel.raise_if_cancelled()
+            chunks.append(chunk)
+        return b"".join(chunks).decode(page.encoding or "utf-8", errors="replace")
+
+
+def fetch_detail(item: dict, cancel=None, timeout: float = 15) -> dict:
+    """Fetch the full text of a listed document into ``item["long_text"]``.
+
+    ``item["fetch_failed"]`` tells whether the page could not be downloaded
+    or parsed; ``long_text`` is then empty.
+    """
+    if cancel:
+        cancel.raise_if_cancelled()
+    try:
+        html = _download(item["url"], timeout, cancel)
+        with timed("detail_parse"):
+            soup = BeautifulSoup(html, features="lxml")
             main = soup.find("main", {"class": "page__inner page__inner--content article-text"})
 
             # FIX: extract ALL text, not just the first <p>
-            full_text = main.get_text(separator="\n", strip=True) if main else ""
-            item["long_text"] = full_text
-
-            # Decide whether to embed and split into articles
-            if is_substantive(full_text, item["doc_type"]):
-                item["articles"] = split_into_articles(full_text)
-                item["embed"] = True
-            else:
-                item["articles"] = []
-                item["embed"] = False
-
-        except Exception as e:
-            item["long_text"] = ""
-            item["articles"] = []
-            item["embed"] = False
+            item["long_text"] = main.get_text(separator="\n", strip=True) if main else ""
+        item["fetch_failed"] = False
+        inc("ria_documents_total", stage="fetched")
+    except Exception:
+        if cancel:
+            cancel.raise_if_cancelled()
+        inc("ria_documents_total", stage="fetch_failed")
+        item["long_text"] = ""
+        item["fetch_failed"] = True
+    return item
+
+
+def classify_document(item: dict) -> dict:
+    """Decide whether to embed a fetched document and split it into articles."""
+    full_text = item.get("long_text", "")
+    with timed("is_substantive"):
+        substantive = is_substantive(full_text, item["doc_type"])
+    if substantive:
+        item["articles"] = split_into_articles(full_text)
+        item["embed"] = True
+    else:
+        item["articles"] = []
+        item["embed"] = False
+    inc("ria_documents_total", stage="classified")
+    return item
+
+
+def scrape_documents(start_date: datetime, end_date: datetime, doc_types: list,
+                     url_searchpage: str, url_detail_page: str,
+                     progress_callback=None, max_results: int = None,
+                     cancel=None, fetch_timeout: float = 15, incomplete: set = None):
+    """Scrape ejustice.just.fgov.be for Belgian regulatory documents.
+
+    Args:
+        start_date:       Start of publication date range.
+        end_date:         End of publication date range.
+        doc_types:        List of document type strings matching the site dropdown.
+        url_searchpage:   URL of the ejustice search form.
+        url_detail_page:  Base URL for building detail page links.
+        progress_callback: Optional callable(current, total) for progress reporting.
+        max_results:      Cap total results per doc_type (useful for testing).
+        cancel:           Optional backend.cancel.CancelToken; quits the browser
+                          and aborts in-flight fetches once it fires.
+        fetch_timeout:    Timeout in seconds per detail page request.
+        incomplete:       Optional set that receives a (doc_type, day) pair
+                          per publication day whose documents may be missing
+                          (a failed detail fetch); day is None when the whole
+                          listing of the doc type was cut short.
 
+    Returns:
+        List of dicts with keys:
+          ref_number, pub_date, short_text, url, doc_type,
+          long_text, fetch_failed (bool), articles, embed (bool)
+    """
+    truncated = set()
+    scraping_result = list(iter_listing(start_date, end_date, doc_types,
+                                        url_searchpage, max_results, cancel, truncated))
+
+    # Fetch full text and classify each result
+    total = len(scraping_result)
+    for i, item in enumerate(scraping_result):
+        classify_document(fetch_detail(item, cancel, fetch_timeout))
         if progress_callback:
             progress_callback(i + 1, total)
 
+    if incomplete is not None:
+        incomplete.update((doc_type, None) for doc_type in truncated)
+        incomplete.update((item["doc_type"], parse_pub_date(item["pub_date"]))
+                          for item in scraping_result if item["fetch_failed"])
     return scraping_result
@@ -0,0 +1,88 @@
+"""
+SQLite cache base — plumbing shared by the lemma, prediction and scrape caches.
+
+Each cache is one SQLite file in WAL mode, opened with a short-lived
+connection per call so every process (API and job workers) can share it.
+Hit/miss counters are kept per process and mirrored into the
+``ria_cache_lookups_total`` metric.
+"""
+
+import os
+import sqlite3
+import threading
+
+from .metrics import inc
+
+# SQLite limits the number of bound parameters per statement
+CHUNK = 500
+
+
+def chunked(values: list):
+    """``values`` in slices of at most CHUNK items."""
+    for i in range(0, len(values), CHUNK):
+        yield values[i: i + CHUNK]
+
+
+class SQLiteCache:
+    """Base of the SQLite-backed caches.
+
+    Subclasses set ``NAME`` (the ``cache`` label of the lookup metric) and
+    ``SCHEMA_SQL`` (the statements creating their tables and indexes).
+    """
+
+    NAME = ""
+    SCHEMA_SQL = ""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL;")
+            with conn:
+                conn.executescript(self.SCHEMA_SQL)
+        finally:
+            conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def record(self, hits: int, misses: int):
+        """Count ``hits`` and ``misses`` of one lookup."""
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+        inc("ria_cache_lookups_total", hits, cache=self.NAME, result="hit")
+        inc("ria_cache_lookups_total", misses, cache=self.NAME, result="miss")
+
+    def stats(self) -> dict:
+        """Hit/miss counters of this process."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+_CACHES: dict = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def shared_cache(cls, path: str, **kwargs):
+    """Process-wide instance of ``cls`` for the SQLite file at ``path``.
+
+    Args:
+        cls:     SQLiteCache subclass.
+        path:    Database file; relative paths are resolved once, here.
+        kwargs:  Passed to ``cls`` when the instance is created.
+    """
+    key = (cls, os.path.abspath(path))
+    with _CACHES_LOCK:
+        cache = _CACHES.get(key)
+        if cache is None:
+            cache = _CACHES[key] = cls(key[1], **kwargs)
+    return cache
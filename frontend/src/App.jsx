@@ -14,6 +14,7 @@ function StatusBadge({ status }) {
     ingesting: { label: 'Indexing',  color: '#d97706' },
     done:      { label: 'Done',      color: '#276749' },
     error:     { label: 'Error',     color: '#c53030' },
+    cancelled: { label: 'Cancelled', color: '#718096' },
   }
   const s = map[status] || { label: status, color: '#718096' }
   return (
@@ -24,6 +25,21 @@ function StatusBadge({ status }) {
   )
 }
 
+// Follow a job's Server-Sent Events; returns a function that closes the stream
+function watchJob(jobId, onUpdate) {
+  const source = new EventSource(`${API}/api/jobs/${jobId}/events`)
+  source.addEventListener('job', e => {
+    const job = JSON.parse(e.data)
+    if (['done', 'error', 'cancelled'].includes(job.status)) source.close()
+    onUpdate(job)
+  })
+  return () => source.close()
+}
+
+function cancelJob(jobId) {
+  return fetch(`${API}/api/jobs/${jobId}`, { method: 'DELETE' })
+}
+
 function ProgressBar({ value }) {
   return (
     <div style={{ background: '#e2e8f0', borderRadius: 4, height: 8, margin: '8px 0' }}>
@@ -55,9 +71,9 @@ export default function App() {
   // ingest state (auto-triggered after scrape)
   const [ingestJob, setIngestJob]   = useState(null) // { id, status, chunks_stored, db_total, message, error }
 
-  const scrapeTimer   = useRef(null)
-  const predictTimer  = useRef(null)
-  const ingestTimer   = useRef(null)
+  const scrapeStream  = useRef(() => {})
+  const predictStream = useRef(() => {})
+  const ingestStream  = useRef(() => {})
 
   // Fetch available document types from backend
   useEffect(() => {
@@ -69,8 +85,8 @@ export default function App() {
 
   // ── scraping ────────────────────────────────────────────────────────────────
   async function handleScrape() {
-    clearInterval(scrapeTimer.current)
-    clearInterval(ingestTimer.current)
+    scrapeStream.current()
+    ingestStream.current()
     setPredictJob(null)
     setIngestJob(null)
     setPreview([])
@@ -93,49 +109,36 @@ export default function App() {
     const { job_id } = data
     setScrapeJob({ id: job_id, status: 'queued', progress: 0, progress_text: '' })
 
-    scrapeTimer.current = setInterval(async () => {
-      const s = await fetch(`${API}/api/jobs/${job_id}`).then(r => r.json())
+    scrapeStream.current = watchJob(job_id, async s => {
       setScrapeJob(prev => ({ ...prev, ...s, id: job_id }))
 
       if (s.status === 'done') {
-        clearInterval(scrapeTimer.current)
         const p = await fetch(`${API}/api/jobs/${job_id}/preview`).then(r => r.json())
         setPreview(p.data)
         setTotal(p.total)
 
-        // Auto-poll the ingest job the backend triggered automatically
+        // Follow the ingest job the backend triggered automatically
         if (s.ingest_job_id) {
           setIngestJob({ id: s.ingest_job_id, status: 'queued', progress_text: 'Starting…' })
-          ingestTimer.current = setInterval(async () => {
-            const ingest = await fetch(`${API}/api/jobs/${s.ingest_job_id}`).then(r => r.json())
+          ingestStream.current = watchJob(s.ingest_job_id, ingest => {
             setIngestJob(prev => ({ ...prev, ...ingest, id: s.ingest_job_id }))
-            if (ingest.status === 'done' || ingest.status === 'error') {
-              clearInterval(ingestTimer.current)
-            }
-          }, 2000)
+          })
         }
       }
-      if (s.status === 'error') {
-        clearInterval(scrapeTimer.current)
-      }
-    }, 2000)
+    })
   }
 
   // ── predictions ─────────────────────────────────────────────────────────────
   async function handlePredict() {
-    clearInterval(predictTimer.current)
+    predictStream.current()
 
     const res = await fetch(`${API}/api/predict/${scrapeJob.id}`, { method: 'POST' })
     const { job_id } = await res.json()
     setPredictJob({ id: job_id, status: 'queued' })
 
-    predictTimer.current = setInterval(async () => {
-      const s = await fetch(`${API}/api/jobs/${job_id}`).then(r => r.json())
+    predictStream.current = watchJob(job_id, s => {
       setPredictJob(prev => ({ ...prev, ...s, id: job_id }))
-      if (s.status === 'done' || s.status === 'error') {
-        clearInterval(predictTimer.current)
-      }
-    }, 2000)
+    })
   }
 
   const scraping   = scrapeJob?.status === 'scraping'  || scrapeJob?.status === 'queued'
@@ -196,9 +199,18 @@ export default function App() {
               <>
                 <ProgressBar value={scrapeJob.progress || 0} />
                 <p className="muted">{scrapeJob.progress_text || 'Starting…'} ({scrapeJob.progress || 0}%)</p>
+                <button className="btn secondary"
+                  onClick={() => cancelJob(scrapeJob.id)}
+                  disabled={scrapeJob.cancel_requested}>
+                  {scrapeJob.cancel_requested ? 'Cancelling…' : 'Cancel'}
+                </button>
               </>
             )}
 
+            {scrapeJob.status === 'cancelled' && (
+              <p className="muted">Scrape cancelled.</p>
+            )}
+
             {scrapeJob.status === 'done' && (
               <p className="ok">Found <strong>{total}</strong> documents</p>
             )}
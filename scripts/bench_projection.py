@@ -0,0 +1,79 @@
+"""
+Benchmark the fused normalization + PCA projection
+==================================================
+Times the two-step tokenizer-mode path ((x - means) / stds, then
+pca.transform) against the fused sparse projection on synthetic vectorizer
+output of realistic vocabulary size. tests/test_projection.py checks that
+both give the same result on the same artifacts.
+
+Usage:
+    python scripts/bench_projection.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+from scipy import sparse
+from sklearn.decomposition import PCA
+
+# Allow running from project root
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from backend.predictor import fuse_projection
+
+N_DOCS = 2000
+N_FEATURES = 20000
+N_COMPONENTS = 64
+DENSITY = 0.005
+
+
+def make_artifacts(whiten=False, seed=0):
+    """(docs, norm_means, norm_stds, fitted PCA) on synthetic sparse vectorizer output."""
+    rng = np.random.default_rng(seed)
+    train = sparse.random(400, N_FEATURES, density=DENSITY, format="csr", random_state=seed)
+    norm_means = np.asarray(train.mean(axis=0)).ravel()
+    norm_stds = np.sqrt(np.asarray(train.multiply(train).mean(axis=0)).ravel() - norm_means ** 2)
+    norm_stds[norm_stds == 0] = 1.0
+    pca = PCA(n_components=N_COMPONENTS, whiten=whiten, random_state=seed)
+    pca.fit((train.toarray() - norm_means) / norm_stds)
+    docs = sparse.random(N_DOCS, N_FEATURES, density=DENSITY, format="csr", random_state=rng)
+    return docs, norm_means, norm_stds, pca
+
+
+def two_step(docs, norm_means, norm_stds, pca):
+    preprocessed = (docs - norm_means) / norm_stds
+    return pca.transform(np.array(preprocessed))
+
+
+def fused(docs, projection):
+    weights, bias = projection
+    return np.asarray(docs @ weights) + bias
+
+
+def benchmark(repeats=3):
+    docs, norm_means, norm_stds, pca = make_artifacts()
+    projection = fuse_projection(norm_means, norm_stds, pca)
+
+    def best(fn):
+        timings = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    slow = best(lambda: two_step(docs, norm_means, norm_stds, pca))
+    fast = best(lambda: fused(docs, projection))
+    print(f"\n  {N_DOCS} docs × {N_FEATURES} features → {N_COMPONENTS} components")
+    print(f"  two-step (dense) : {slow * 1000:8.1f} ms")
+    print(f"  fused (sparse)   : {fast * 1000:8.1f} ms   ({slow / fast:.1f}× faster)")
+
+
+if __name__ == "__main__":
+    print(f"\n{'='*70}")
+    print("  FUSED PROJECTION BENCHMARK")
+    print(f"{'='*70}")
+    benchmark()
+    print()
@@ -13,8 +13,6 @@ Created on Thu Jan 18 16:40:48 2024
 """
 import numpy as np
 
-from tqdm import tqdm
-
 def create_embedding(text, model):
     lines = text.splitlines()
     sent_embeddings = [
@@ -31,19 +29,51 @@ def pad_embedding(embedding, target_size):
         padded_embedding = embedding[-target_size:]
     return padded_embedding
 
-def preprocess(dataset, model):
-    tqdm.pandas(desc="!Embedding progress")
-    
+def encode_unique_lines(documents, model, batch_size=256):
+    """Encode every distinct line of the documents once, in large batches.
+
+    Returns the matrix of unique line vectors and, per document, the row
+    indices of its lines in that matrix.
+    """
+    line_index = {}
+    doc_indices = []
+    for lines in documents:
+        doc_indices.append([line_index.setdefault(line, len(line_index)) for line in lines])
+
+    unique_lines = list(line_index)
+    if unique_lines:
+        vectors = model.encode(unique_lines, batch_size=batch_size,
+                               show_progress_bar=True, convert_to_numpy=True)
+    else:
+        vectors = np.zeros((0, model.get_sentence_embedding_dimension()), dtype=np.float32)
+    return vectors, doc_indices
+
+def _object_column(arrays):
+    # Keep one array per row — numpy would otherwise stack equal-shaped arrays
+    column = np.empty(len(arrays), dtype=object)
+    for i, array in enumerate(arrays):
+        column[i] = array
+    return column
+
+def preprocess(dataset, model, target_size=100, batch_size=256):
+    all_lines = [str(text).splitlines() for text in dataset['long_text']]
+    # Only the last target_size lines survive padding — don't encode the rest
+    kept_lines = [lines[-target_size:] for lines in all_lines]
+
+    vectors, doc_indices = encode_unique_lines(kept_lines, model, batch_size=batch_size)
+    embeddings = [vectors[indices] for indices in doc_indices]
+
     prep_data = dataset.assign(
-        embedding = dataset['long_text'].progress_apply(lambda x: create_embedding(x, model))
-        )
-    
-    prep_data = prep_data.assign(
-        nr_lines = prep_data["embedding"].apply(len)
+        embedding = _object_column(embeddings),
+        nr_lines = [len(lines) for lines in all_lines],
         )
-    
+
     prep_data = prep_data.assign(
-        padded_embedding = prep_data["embedding"].apply(lambda x: pad_embedding(x,100))
+        padded_embedding = _object_column([
+            pad_embedding(embedding, target_size) if len(embedding)
+            else np.zeros((target_size, vectors.shape[1]), dtype=vectors.dtype)
+            for embedding in embeddings
+            ])
         )
-    
-    return prep_data
\ No newline at end of file
+
+    return prep_data
@@ -0,0 +1,84 @@
+"""
+Export classifier networks to the TensorFlow-free NumPy runtime
+================================================================
+Keras JSON + weights → <timestamp>__runtime.npz (next to the weights)
+
+The exported file is only written after its outputs match Keras on random
+inputs, so the API can serve it without TensorFlow installed.
+
+Usage:
+    # Export the latest nn (tokenizer) and lstm (embedder) models
+    python scripts/export_runtime.py
+
+    # Export only one of them
+    python scripts/export_runtime.py --modes tokenizer
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+# Allow running from project root
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from backend.predictor import _artifact_paths, _runtime_path, load_keras_model
+from backend.runtime import NumpyModel
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "config.json")
+
+
+def parity_inputs(keras_model, n: int = 16, seed: int = 0) -> np.ndarray:
+    """Random inputs shaped like the model's input (n rows unless the batch size is fixed)."""
+    n = keras_model.input_shape[0] or n
+    shape = tuple(keras_model.input_shape[1:])
+    return np.random.default_rng(seed).normal(size=(n,) + shape).astype(np.float32)
+
+
+def max_parity_error(keras_model, numpy_model, x: np.ndarray) -> float:
+    expected = keras_model.predict(x, verbose=0)
+    actual = numpy_model.predict(x)
+    return float(np.max(np.abs(expected - actual)))
+
+
+def export(model_location: str, mode: str, tolerance: float = 1e-5) -> str:
+    paths = _artifact_paths(model_location, mode)
+    keras_model = load_keras_model(paths["model_json"], paths["weights"])
+    numpy_model = NumpyModel.from_keras(keras_model)
+
+    error = max_parity_error(keras_model, numpy_model, parity_inputs(keras_model))
+    print(f"  [{mode}] max |keras - numpy| = {error:.2e}")
+    if error > tolerance:
+        raise RuntimeError(f"{mode}: runtime output differs from Keras by {error:.2e}")
+
+    # Write then rename, so the model watcher never picks up a partial file
+    out_path = _runtime_path(paths["weights"])
+    tmp_path = out_path + ".tmp"
+    numpy_model.save(tmp_path)
+    os.replace(tmp_path, out_path)
+    print(f"  [{mode}] ✅ {out_path}")
+    return out_path
+
+
+def main():
+    with open(CONFIG_PATH) as f:
+        config = json.load(f)
+
+    parser = argparse.ArgumentParser(description="Export classifier models to the NumPy runtime")
+    parser.add_argument("--modes", nargs="+", default=["tokenizer", "embedder"],
+                        choices=["tokenizer", "embedder"],
+                        help="Which networks to export")
+    parser.add_argument("--model-location", default=config["predictions"]["model_location"],
+                        help="Folder holding the timestamped model artifacts")
+    parser.add_argument("--tolerance", type=float, default=1e-5,
+                        help="Max allowed absolute difference to Keras outputs")
+    args = parser.parse_args()
+
+    for mode in args.modes:
+        export(args.model_location, mode, tolerance=args.tolerance)
+
+
+if __name__ == "__main__":
+    main()
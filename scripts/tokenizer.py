@@ -5,27 +5,91 @@ Created on Mon Sep 16 16:35:05 2024
 @author: lucp8733
 """
 
+import os
+
 import spacy
 from tqdm import tqdm
 
-def extraxt_lemmas(line, 
-                   nlp_model):
+SPACY_MODEL = "nl_core_news_lg"
+
+# Components the rule-based Dutch lemmatizer depends on (POS tags feed the
+# lemma rules); is_stop is a lexical attribute and needs no component at all.
+LEMMA_COMPONENTS = {"tok2vec", "tagger", "morphologizer", "attribute_ruler", "lemmatizer"}
+
+MAX_CHARS = 1000000
+
+_NLP_CACHE = {}
+
+
+def load_nlp(model_name=SPACY_MODEL):
+    """Load a spaCy pipeline once per process, keeping only the lemma components."""
+    nlp = _NLP_CACHE.get(model_name)
+    if nlp is None:
+        nlp = spacy.load(model_name)
+        nlp.select_pipes(disable=[name for name in nlp.pipe_names
+                                  if name not in LEMMA_COMPONENTS])
+        _NLP_CACHE[model_name] = nlp
+    return nlp
+
+def clean_text(line):
     line = line.replace("\n", " ")
-    if len(line) > 1000000:
-        line = line[:1000000]
-    nlp_line = nlp_model(line)
+    if len(line) > MAX_CHARS:
+        line = line[:MAX_CHARS]
+    return line
+
+def doc_to_lemmas(nlp_line):
     lemma_line = [token.lemma_ for token in nlp_line if not token.is_stop]
     return " ".join(lemma_line)
 
-def preprocess(dataset, tokenizer):
-    tqdm.pandas(desc="!Tokenizing progress")
-    
-    nlp = spacy.load("nl_core_news_lg", disable = ['parser','ner'])
-    
+def extraxt_lemmas(line,
+                   nlp_model):
+    return doc_to_lemmas(nlp_model(clean_text(line)))
+
+def lemmatize(texts, nlp_model, batch_size=16, n_process=None):
+    """Lemmatize many texts through nlp.pipe, spread over n_process workers."""
+    texts = [clean_text(text) for text in texts]
+    if not texts:
+        return []
+    if n_process is None:
+        n_process = os.cpu_count() or 1
+    n_process = max(1, min(n_process, len(texts) // batch_size or 1))
+
+    docs = nlp_model.pipe(texts, batch_size=batch_size, n_process=n_process)
+    return [doc_to_lemmas(doc) for doc in tqdm(docs, total=len(texts), desc="!Tokenizing progress")]
+
+def lemmatize_cached(texts, cache, model_name=SPACY_MODEL, batch_size=16, n_process=None):
+    """Lemmatize through a LemmaCache; spaCy is only loaded when something misses."""
+    from backend.lemma_cache import spacy_model_key, text_hash
+
+    texts = [clean_text(text) for text in texts]
+    hashes = [text_hash(text) for text in texts]
+    model_key = spacy_model_key(model_name)
+    cached = cache.get_many(hashes, model_key)
+
+    missing = {}
+    for h, text in zip(hashes, texts):
+        if h not in cached:
+            missing.setdefault(h, text)
+    if missing:
+        lemmas = lemmatize(list(missing.values()), load_nlp(model_name),
+                           batch_size=batch_size, n_process=n_process)
+        computed = dict(zip(missing, lemmas))
+        cache.put_many(computed, model_key)
+        cached.update(computed)
+
+    return [cached[h] for h in hashes]
+
+def preprocess(dataset, tokenizer, batch_size=16, n_process=None, cache=None):
+    texts = dataset['long_text'].fillna("").astype(str)
+    if cache is not None:
+        lemma_text = lemmatize_cached(texts, cache, batch_size=batch_size, n_process=n_process)
+    else:
+        lemma_text = lemmatize(texts, load_nlp(), batch_size=batch_size, n_process=n_process)
+
     prep_data = dataset.assign(
-        lemma_text = dataset['long_text'].progress_apply(lambda x: extraxt_lemmas(x, nlp))
+        lemma_text = lemma_text
        )
-    
+
     prep_data = tokenizer.transform(prep_data['lemma_text'].values)
-    
-    return prep_data
\ No newline at end of file
+
+    return prep_data
@@ -0,0 +1,13 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# backend.jobs opens the job store and picks its results folder on import,
+# and backend.main creates the admission lock files; keep the tests off the
+# app's own, whose files the test store does not know
+_TMP = tempfile.mkdtemp(prefix="ria-tests-")
+os.environ.setdefault("JOB_RESULTS_DIR", os.path.join(_TMP, "job_results"))
+os.environ.setdefault("JOB_STORE_URL", "sqlite:///" + os.path.join(_TMP, "jobs.sqlite3"))
+os.environ.setdefault("ADMISSION_LOCK_DIR", os.path.join(_TMP, "admission"))
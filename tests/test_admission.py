@@ -0,0 +1,75 @@
+"""
+Tests for the browser/fetch slots: the limit holds across threads and
+processes, waiting stays cancellable, and a killed holder frees its slot.
+"""
+
+import os
+import subprocess
+import sys
+import textwrap
+import time
+
+import pytest
+
+from backend import admission
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(admission.__file__)))
+
+
+class Deadline:
+    """Stands in for a CancelToken that fires after ``seconds``."""
+
+    def __init__(self, seconds):
+        self.at = time.monotonic() + seconds
+
+    def raise_if_cancelled(self):
+        if time.monotonic() > self.at:
+            raise TimeoutError("no slot")
+
+
+@pytest.fixture
+def limits(tmp_path):
+    admission.install_limits(*admission.create_limits(
+        {"lock_dir": str(tmp_path), "max_browsers": 1, "max_fetches": 2}))
+    yield tmp_path
+    admission.install_limits(None, 0, 0)
+
+
+def test_slots_are_limited(limits):
+    with admission.fetch_slot(), admission.fetch_slot():
+        with pytest.raises(TimeoutError):
+            with admission.fetch_slot(Deadline(0.5)):
+                pass
+    with admission.fetch_slot(Deadline(0.5)):
+        pass
+
+
+def test_killed_holder_frees_its_slot(limits):
+    holder = subprocess.Popen([sys.executable, "-c", textwrap.dedent(f"""
+        import sys, time
+        sys.path.insert(0, {ROOT!r})
+        from backend import admission
+        admission.install_limits({str(limits)!r}, 1, 1)
+        with admission.browser_slot():
+            print("holding", flush=True)
+            time.sleep(60)
+    """)], stdout=subprocess.PIPE, text=True)
+    try:
+        assert holder.stdout.readline().strip() == "holding"
+        with pytest.raises(TimeoutError):
+            with admission.browser_slot(Deadline(0.5)):
+                pass
+    finally:
+        holder.kill()
+        holder.wait()
+    with admission.browser_slot(Deadline(2)):
+        pass
+
+
+def test_relative_lock_dir_is_under_the_project_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(admission, "_ROOT", str(tmp_path))
+    monkeypatch.chdir(tmp_path / "..")
+    lock_dir, _, _ = admission.create_limits({"lock_dir": "./cache/admission"})
+    assert lock_dir == str(tmp_path / "cache" / "admission")
+    assert admission.create_limits({"lock_dir": str(tmp_path / "abs")})[0] == str(tmp_path / "abs")
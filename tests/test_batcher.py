@@ -0,0 +1,80 @@
+"""
+Tests for the micro-batcher in front of /api/classify: concurrent items are
+coalesced up to the size limit, a lone item is flushed after the wait
+window, and a failing item only fails its own caller.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from backend.batcher import MicroBatcher
+
+
+def recording(fn=lambda item: item * 2):
+    calls = []
+
+    def batch_fn(items):
+        calls.append(list(items))
+        return [fn(item) for item in items]
+
+    return batch_fn, calls
+
+
+def test_concurrent_items_are_coalesced_up_to_max_batch():
+    batch_fn, calls = recording()
+    batcher = MicroBatcher(batch_fn, max_batch_size=4, max_wait_ms=50)
+
+    async def run():
+        return await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+
+    assert asyncio.run(run()) == [i * 2 for i in range(10)]
+    assert [len(call) for call in calls] == [4, 4, 2]
+    assert sum(calls, []) == list(range(10))
+
+
+def test_lone_item_is_flushed_after_max_wait():
+    batch_fn, calls = recording()
+    batcher = MicroBatcher(batch_fn, max_batch_size=32, max_wait_ms=30)
+
+    async def run():
+        started = time.monotonic()
+        result = await batcher.submit(5)
+        return result, time.monotonic() - started
+
+    result, elapsed = asyncio.run(run())
+    assert result == 10 and calls == [[5]]
+    assert 0.02 <= elapsed < 1
+
+
+def test_a_failing_item_only_fails_its_own_caller():
+    def double(item):
+        if item == "bad":
+            raise ValueError("cannot classify")
+        return item * 2
+
+    batch_fn, calls = recording(double)
+    batcher = MicroBatcher(batch_fn, max_batch_size=8, max_wait_ms=50)
+
+    async def run():
+        return await asyncio.gather(*(batcher.submit(item) for item in ("a", "bad", "c")),
+                                    return_exceptions=True)
+
+    a, bad, c = asyncio.run(run())
+    assert (a, c) == ("aa", "cc")
+    assert isinstance(bad, ValueError)
+    assert calls[0] == ["a", "bad", "c"]
+    assert sorted(map(tuple, calls[1:])) == [("a",), ("bad",), ("c",)]
+
+
+def test_batcher_keeps_serving_after_a_failure():
+    batch_fn, _ = recording(lambda item: 1 / item)
+    batcher = MicroBatcher(batch_fn, max_wait_ms=1)
+
+    async def run():
+        with pytest.raises(ZeroDivisionError):
+            await batcher.submit(0)
+        return await batcher.submit(4)
+
+    assert asyncio.run(run()) == 0.25
@@ -0,0 +1,174 @@
+"""
+Tests for job cancellation and timeouts: CancelToken deadlines, stage
+timeouts and callbacks, DELETE /api/jobs/{id} on queued and running jobs,
+the final status a runner records, and the law DB rollback on cancel.
+"""
+
+import importlib.util
+import sys
+import threading
+import time
+import types
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import jobs, main
+from backend.cancel import CancelToken, JobCancelled, JobTimeout
+from backend.executor import JobExecutor
+from backend.metrics import JobMetrics
+
+
+def wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_job_deadline_fires_a_timeout():
+    with CancelToken(timeout=0.05, poll_interval=0.01) as token:
+        assert wait_for(lambda: token.cancelled)
+        with pytest.raises(JobTimeout, match="job timed out after 0.05s"):
+            token.raise_if_cancelled()
+
+
+def test_stage_timeout_raises_when_the_stage_ends():
+    with CancelToken(poll_interval=0.01) as token:
+        with pytest.raises(JobTimeout, match="fetch timed out"):
+            with token.stage("fetch", timeout=0.05):
+                assert wait_for(lambda: token.cancelled)
+
+    # A stage that finishes in time leaves the token alone
+    with CancelToken(poll_interval=0.01) as token:
+        with token.stage("fetch", timeout=5):
+            pass
+        time.sleep(0.05)
+        assert not token.cancelled
+
+
+def test_callbacks_fire_once_and_can_be_unregistered():
+    calls = []
+    with CancelToken(poll_interval=0.01) as token:
+        token.on_cancel(lambda: calls.append("quit browser"))
+        unregister = token.on_cancel(lambda: calls.append("unregistered"))
+        unregister()
+        threads = [threading.Thread(target=token.cancel) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        token.cancel(JobTimeout("later"))
+        assert calls == ["quit browser"]
+        assert str(token.error) == "Cancelled"
+
+        # Registered after firing: runs right away
+        token.on_cancel(lambda: calls.append("late"))
+        assert calls == ["quit browser", "late"]
+
+
+def test_polled_cancel_flag_fires_the_token():
+    flag = threading.Event()
+    with CancelToken(flag.is_set, poll_interval=0.01) as token:
+        assert not token.cancelled
+        flag.set()
+        assert wait_for(lambda: token.cancelled)
+        with pytest.raises(JobCancelled, match="Cancelled by user"):
+            token.raise_if_cancelled()
+
+
+@pytest.mark.parametrize("error, status", [
+    (JobCancelled("Cancelled by user"), "cancelled"),
+    (JobTimeout("scrape timed out after 5s"), "error"),
+    (RuntimeError("boom"), "error"),
+])
+def test_runner_final_status(error, status):
+    main.JOBS.create("final-status", status="running")
+    try:
+        jobs._fail("final-status", error, JobMetrics("scrape"))
+        job = main.JOBS.get("final-status")
+        assert (job["status"], job["error"]) == (status, str(error))
+    finally:
+        main.JOBS.delete("final-status")
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # No workers: submitted jobs stay queued in the executor
+    monkeypatch.setattr(main, "_EXECUTOR", JobExecutor({"scrape": {"workers": 0, "max_queued": 5}}))
+    return TestClient(main.app)
+
+
+def test_delete_drops_a_queued_job(client):
+    main.JOBS.create("queued-job", status="queued")
+    main._EXECUTOR.submit("scrape", "queued-job", print)
+
+    response = client.delete("/api/jobs/queued-job")
+
+    assert response.json() == {"job_id": "queued-job", "status": "cancelled"}
+    assert main.JOBS.get("queued-job")["status"] == "cancelled"
+    assert main._EXECUTOR.position("queued-job") is None
+    assert client.delete("/api/jobs/queued-job").status_code == 409
+
+
+def test_delete_flags_a_running_job_for_its_worker(client):
+    main.JOBS.create("running-job", status="running")
+
+    response = client.delete("/api/jobs/running-job")
+
+    assert response.json() == {"job_id": "running-job", "status": "cancelling"}
+    assert main.JOBS.get("running-job")["cancel_requested"] is True
+    # The worker's token picks the flag up on its first poll
+    with jobs._cancel_token("running-job") as token:
+        assert wait_for(lambda: token.cancelled)
+        jobs._fail("running-job", token.error, JobMetrics("scrape"))
+    assert main.JOBS.get("running-job")["status"] == "cancelled"
+
+
+def test_delete_of_unknown_job(client):
+    assert client.delete("/api/jobs/no-such-job").status_code == 404
+
+
+def test_cancelled_store_chunks_rolls_back(monkeypatch):
+    class Connection:
+        def __init__(self):
+            self.calls = []
+
+        def cursor(self):
+            return self
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            pass
+
+        def commit(self):
+            self.calls.append("commit")
+
+        def rollback(self):
+            self.calls.append("rollback")
+
+    psycopg2 = types.ModuleType("psycopg2")
+    extras = types.ModuleType("psycopg2.extras")
+    psycopg2.extras = extras
+    monkeypatch.setitem(sys.modules, "psycopg2", psycopg2)
+    monkeypatch.setitem(sys.modules, "psycopg2.extras", extras)
+
+    token = CancelToken(poll_interval=60)
+    # Cancelled while the upsert runs: nothing may be committed
+    extras.execute_values = lambda cur, sql, rows, template=None: token.cancel()
+    # Loaded outside sys.modules, so other tests never see the stubbed psycopg2
+    spec = importlib.util.find_spec("backend.law_store")
+    law_store = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(law_store)
+    monkeypatch.setattr(law_store, "embed_batch", lambda texts, cancel=None: [[0.0]] * len(texts))
+
+    conn = Connection()
+    item = {"embed": True, "ref_number": "2025000001", "doc_type": "Wet", "pub_date": "2025-01-01",
+            "articles": [{"article_num": "1", "text": "Artikel 1."}]}
+    with token, pytest.raises(JobCancelled):
+        law_store.store_chunks([item], conn=conn, cancel=token)
+    assert conn.calls == ["rollback"]
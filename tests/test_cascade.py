@@ -0,0 +1,86 @@
+"""
+Tests for cascade prediction with stubbed bundles: only certainties inside
+``cascade_band`` (edges included) are re-scored by the expensive model, the
+stats count escalations, and the prediction cache key names both artifacts
+and the band.
+"""
+
+import types
+
+import pandas as pd
+import pytest
+
+from backend import predictor
+from backend.predictor import cascade_summary, predict_cascade, predict_in_batches
+
+CHEAP = types.SimpleNamespace(artifact_id="tokenizer-20250101")
+EXPENSIVE = types.SimpleNamespace(artifact_id="embedder-20250102")
+
+# Certainty the cheap model gives each text
+CHEAP_CERTAINTY = {"sure no": -0.9, "low edge": -0.5, "unsure": 0.1, "high edge": 0.5, "sure yes": 0.8}
+
+
+@pytest.fixture
+def scored(monkeypatch):
+    """Stub predict_documents; returns the texts each bundle was asked to score."""
+    calls = {CHEAP.artifact_id: [], EXPENSIVE.artifact_id: []}
+
+    def predict_documents(dataset, config, bundle):
+        texts = dataset["long_text"].tolist()
+        calls[bundle.artifact_id].append(texts)
+        if bundle is CHEAP:
+            certainty = [CHEAP_CERTAINTY[t] for t in texts]
+        else:
+            certainty = [1.0] * len(texts)
+        return dataset.assign(prediction=[float(c > 0) for c in certainty], certainty=certainty)
+
+    monkeypatch.setattr(predictor, "predict_documents", predict_documents)
+    registry = types.SimpleNamespace(get={"tokenizer": CHEAP, "embedder": EXPENSIVE}.get)
+    monkeypatch.setattr(predictor, "get_registry", lambda config: registry)
+    return calls
+
+
+def documents(texts):
+    return pd.DataFrame({"ref_number": [f"2025{i:06d}" for i in range(len(texts))], "long_text": texts})
+
+
+def test_only_the_band_is_escalated(scored):
+    stats = {}
+    result = predict_cascade(documents(list(CHEAP_CERTAINTY)), {"cascade_band": [-0.5, 0.5]},
+                             CHEAP, EXPENSIVE, stats)
+
+    assert scored[EXPENSIVE.artifact_id] == [["low edge", "unsure", "high edge"]]
+    assert result["certainty"].tolist() == [-0.9, 1.0, 1.0, 1.0, 0.8]
+    assert result["prediction"].tolist() == [0.0, 1.0, 1.0, 1.0, 1.0]
+    assert stats == {"cascade_documents": 5, "escalated": 3}
+    assert cascade_summary(stats) == {"documents": 5, "escalated": 3, "expensive_runs_saved": 2,
+                                      "saved_fraction": 0.4}
+
+
+def test_nothing_in_the_band_skips_the_expensive_model(scored):
+    stats = {}
+    predict_cascade(documents(["sure no", "sure yes"]), {"cascade_band": [-0.5, 0.5]},
+                    CHEAP, EXPENSIVE, stats)
+    assert scored[EXPENSIVE.artifact_id] == []
+    assert cascade_summary(stats)["saved_fraction"] == 1.0
+    assert cascade_summary({})["saved_fraction"] is None
+
+
+def test_cache_key_names_both_artifacts_and_the_band(scored, tmp_path):
+    config = {"embedder_or_tokenizer": "cascade", "cascade_band": [-0.5, 0.5],
+              "prediction_cache": {"path": str(tmp_path / "predictions.sqlite3")}}
+    model_id, _ = predictor._resolve_predictor(config)
+    assert model_id == "cascade:tokenizer-20250101+embedder-20250102@-0.5,0.5"
+
+    rows = documents(["unsure", "sure yes"]).to_dict("records")
+    stats = {}
+    list(predict_in_batches(rows, config, stats=stats))
+    list(predict_in_batches(rows, config, stats=stats))
+    assert stats == {"cascade_documents": 2, "escalated": 1, "predicted": 2, "cached": 2}
+
+    # A narrower band is another cache entry: the documents are scored again
+    narrow = {**config, "cascade_band": [0.0, 0.2]}
+    assert predictor._resolve_predictor(narrow)[0].endswith("@0.0,0.2")
+    stats = {}
+    list(predict_in_batches(rows, narrow, stats=stats))
+    assert stats["predicted"] == 2
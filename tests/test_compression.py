@@ -0,0 +1,97 @@
+"""
+Tests for response compression: Accept-Encoding negotiation, the size
+threshold, and passing Server-Sent Events and file downloads through as-is.
+"""
+
+import gzip
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from backend import compression
+from backend.compression import CompressionMiddleware, negotiate
+from backend.responses import FastJSONResponse
+
+BIG = {"data": [{"numac": str(i), "prediction": 0.5} for i in range(200)]}
+
+
+@pytest.fixture
+def client(tmp_path):
+    download = tmp_path / "export.csv"
+    download.write_text("numac,prediction\n" * 200)
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=512)
+
+    @app.get("/big")
+    def big():
+        return FastJSONResponse(BIG)
+
+    @app.get("/small")
+    def small():
+        return FastJSONResponse({"ok": True})
+
+    @app.get("/ndjson")
+    def ndjson():
+        return StreamingResponse((json.dumps(row).encode() + b"\n" for row in BIG["data"]),
+                                 media_type="application/x-ndjson")
+
+    @app.get("/events")
+    def events():
+        return StreamingResponse((f"data: {i}\n\n".encode() * 100 for i in range(3)),
+                                 media_type="text/event-stream")
+
+    @app.get("/download")
+    def download_file():
+        return FileResponse(download, media_type="text/csv")
+
+    return TestClient(app)
+
+
+def get(client, path, accept):
+    # stream() leaves the body encoded, so the raw bytes can be checked
+    with client.stream("GET", path, headers={"Accept-Encoding": accept}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+def test_negotiate():
+    assert negotiate("gzip, deflate") == "gzip"
+    assert negotiate("gzip;q=0, deflate") is None
+    assert negotiate("*") == ("br" if compression.brotli is not None else "gzip")
+    assert negotiate("") is None
+
+
+def test_json_is_gzipped_when_accepted(client):
+    response, body = get(client, "/big", "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers or int(response.headers["content-length"]) == len(body)
+    assert json.loads(gzip.decompress(body)) == BIG
+
+
+def test_streamed_ndjson_is_gzipped(client):
+    response, body = get(client, "/ndjson", "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert [json.loads(line) for line in gzip.decompress(body).splitlines()] == BIG["data"]
+
+
+@pytest.mark.parametrize("path, accept", [("/big", "identity"), ("/small", "gzip")])
+def test_unaccepted_or_small_bodies_are_sent_as_is(client, path, accept):
+    response, body = get(client, path, accept)
+    assert "content-encoding" not in response.headers
+    assert json.loads(body)
+
+
+@pytest.mark.parametrize("path", ["/events", "/download"])
+def test_events_and_downloads_pass_through(client, path):
+    response, body = get(client, path, "gzip, br")
+    assert "content-encoding" not in response.headers
+    assert body.startswith((b"data: 0", b"numac,prediction"))
+
+
+def test_brotli_is_preferred_when_installed(client):
+    brotli = pytest.importorskip("brotli")
+    response, body = get(client, "/big", "gzip, br")
+    assert response.headers["content-encoding"] == "br"
+    assert json.loads(brotli.decompress(body)) == BIG
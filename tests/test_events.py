@@ -0,0 +1,143 @@
+"""
+Tests for job events: fan-out to every subscriber, the worker queue
+listener, and the SSE stream — coalescing bursts of updates into one event,
+keep-alives with store re-reads, and closing once the job is finished.
+"""
+
+import asyncio
+import json
+
+from backend import main
+from backend.events import METRICS, JobEvents
+
+
+def test_publish_fans_out_and_merges_per_subscriber():
+    events = JobEvents()
+
+    async def run():
+        first, second = events.subscribe("job"), events.subscribe("job")
+        other = events.subscribe("other")
+        events.publish("job", {"progress": 10})
+        events.publish("job", {"progress": 20, "progress_text": "Scraping"})
+        await asyncio.sleep(0)
+        events.unsubscribe("job", second)
+        events.publish("job", {"progress": 30})
+        await asyncio.sleep(0)
+        events.unsubscribe("job", first)
+        return first.take(), second.take(), other.changed.is_set()
+
+    first, second, other_changed = asyncio.run(run())
+    assert first == {"progress": 30, "progress_text": "Scraping"}
+    assert second == {"progress": 20, "progress_text": "Scraping"}
+    assert not other_changed
+    assert list(events._subscribers) == ["other"]
+
+
+def test_listener_delivers_worker_updates_and_metrics():
+    events = JobEvents()
+    events.start()
+
+    async def run():
+        subscriber = events.subscribe("job")
+        events.queue.put((METRICS, (1234, {"counters": {}})))
+        events.queue.put(("job", {"status": "done"}))
+        await asyncio.wait_for(subscriber.changed.wait(), 5)
+        return subscriber.take()
+
+    try:
+        assert asyncio.run(run()) == {"status": "done"}
+        assert events.worker_metrics == {1234: {"counters": {}}}
+    finally:
+        events.stop()
+
+
+async def open_stream(job_id: str) -> tuple:
+    """Run the SSE route; returns (task, queue of parsed events or ``"keep-alive"``)."""
+    received = asyncio.Queue()
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": f"/api/jobs/{job_id}/events", "raw_path": f"/api/jobs/{job_id}/events".encode(),
+        "root_path": "", "query_string": b"", "headers": [],
+        "server": ("testserver", 80), "client": ("testclient", 50000),
+    }
+
+    async def receive():
+        await asyncio.Event().wait()  # the client never disconnects
+
+    async def send(message):
+        body = message.get("body", b"")
+        if message["type"] == "http.response.body" and body:
+            if body.startswith(b": keep-alive"):
+                received.put_nowait("keep-alive")
+            else:
+                data = body.decode().split("data: ", 1)[1]
+                received.put_nowait(json.loads(data))
+
+    return asyncio.create_task(main.app(scope, receive, send)), received
+
+
+async def next_event(received):
+    return await asyncio.wait_for(received.get(), 5)
+
+
+async def next_change(received) -> dict:
+    """Next event that is not a keep-alive."""
+    event = await next_event(received)
+    while event == "keep-alive":
+        event = await next_event(received)
+    return event
+
+
+def test_stream_coalesces_updates_and_ends_when_done(monkeypatch):
+    monkeypatch.setitem(main.CONFIG["api"], "events_min_interval_ms", 200)
+    main.JOBS.create("sse-job", status="running", progress=0, result_ref="/tmp/hidden.arrow")
+
+    async def run():
+        task, received = await open_stream("sse-job")
+        first = await next_event(received)
+        assert first["progress"] == 0 and "result_ref" not in first
+
+        main.EVENTS.publish("sse-job", {"progress": 10})
+        assert (await next_event(received))["progress"] == 10
+
+        # Published while the stream waits out events_min_interval_ms
+        for progress in (20, 30, 40):
+            main.EVENTS.publish("sse-job", {"progress": progress})
+        main.EVENTS.publish("sse-job", {"progress_text": "Scraping"})
+        merged = await next_event(received)
+        assert (merged["progress"], merged["progress_text"]) == (40, "Scraping")
+
+        main.EVENTS.publish("sse-job", {"status": "done", "progress": 100})
+        assert (await next_event(received))["status"] == "done"
+        await asyncio.wait_for(task, 5)  # the stream closed by itself
+        assert received.empty()
+
+    try:
+        asyncio.run(run())
+    finally:
+        main.JOBS.delete("sse-job")
+
+
+def test_stream_rereads_the_store_between_keepalives(monkeypatch):
+    monkeypatch.setitem(main.CONFIG["api"], "events_min_interval_ms", 0)
+    monkeypatch.setitem(main.CONFIG["api"], "events_keepalive_s", 0.05)
+    main.JOBS.create("sse-remote", status="running", progress=0)
+
+    async def run():
+        task, received = await open_stream("sse-remote")
+        await next_event(received)
+        assert await next_event(received) == "keep-alive"
+
+        # Updated by another API process: no event is published here
+        main.JOBS.update("sse-remote", progress=50)
+        assert (await next_change(received))["progress"] == 50
+
+        main.JOBS.update("sse-remote", status="error", error="boom")
+        event = await next_change(received)
+        assert (event["status"], event["error"]) == ("error", "boom")
+        await asyncio.wait_for(task, 5)
+
+    try:
+        asyncio.run(run())
+    finally:
+        main.JOBS.delete("sse-remote")
@@ -0,0 +1,89 @@
+"""
+Tests for result exports: each format round-trips the rows, the first
+download is cached and reused, and unknown formats are rejected.
+"""
+
+import io
+import json
+
+import pyarrow.csv as csv
+import pyarrow.parquet as pq
+import pytest
+from fastapi.testclient import TestClient
+from openpyxl import load_workbook
+
+from backend import main, results
+from backend.exports import EXPORT_FORMATS, export_path, stream_export
+from backend.results import write_results
+
+ROWS = [{"numac": str(2025000000 + i), "prediction": i / 4, "articles": [{"article_num": str(i)}]}
+        for i in range(5)]
+
+
+def read_export(data: bytes, fmt: str) -> list:
+    """Rows of an export as {column: value} with ``articles`` decoded."""
+    if fmt == "csv":
+        rows = csv.read_csv(io.BytesIO(data), convert_options=csv.ConvertOptions(
+            column_types={"numac": "string"})).to_pylist()
+    elif fmt == "parquet":
+        rows = pq.read_table(io.BytesIO(data)).to_pylist()
+    else:
+        sheet = load_workbook(io.BytesIO(data), read_only=True).active
+        header, *values = list(sheet.values)
+        rows = [dict(zip(header, row)) for row in values]
+    return [{**row, "articles": json.loads(row["articles"])} for row in rows]
+
+
+@pytest.fixture
+def result_ref(tmp_path, monkeypatch):
+    monkeypatch.setattr(results, "BATCH_ROWS", 2)
+    path = str(tmp_path / "job.arrow")
+    write_results(path, ROWS)
+    return path
+
+
+@pytest.mark.parametrize("fmt", list(EXPORT_FORMATS))
+def test_stream_export_round_trips(tmp_path, result_ref, fmt):
+    path = export_path(str(tmp_path / "exports"), "job", fmt)
+    data = b"".join(stream_export(result_ref, path, fmt))
+
+    assert read_export(data, fmt) == ROWS
+    with open(path, "rb") as f:
+        assert f.read() == data
+    assert [p.name for p in (tmp_path / "exports").iterdir()] == [f"job{EXPORT_FORMATS[fmt][1]}"]
+
+
+def test_interrupted_export_is_not_cached(tmp_path, result_ref):
+    path = export_path(str(tmp_path / "exports"), "job", "csv")
+    stream = stream_export(result_ref, path, "csv")
+    next(stream)
+    stream.close()
+    assert list((tmp_path / "exports").iterdir()) == []
+
+
+@pytest.fixture
+def client(tmp_path, result_ref, monkeypatch):
+    monkeypatch.setattr(main, "EXPORTS_DIR", str(tmp_path / "exports"))
+    main.JOBS.create("export-job", status="done", result_ref=result_ref, export_name="results")
+    yield TestClient(main.app)
+    main.JOBS.delete("export-job")
+
+
+@pytest.mark.parametrize("fmt", list(EXPORT_FORMATS))
+def test_download_builds_once_then_serves_the_cache(client, tmp_path, fmt):
+    first = client.get("/api/download/export-job", params={"format": fmt})
+    assert first.status_code == 200
+    assert first.headers["content-disposition"] == f'attachment; filename="results{EXPORT_FORMATS[fmt][1]}"'
+    assert read_export(first.content, fmt) == ROWS
+
+    cached = tmp_path / "exports" / f"export-job{EXPORT_FORMATS[fmt][1]}"
+    assert cached.read_bytes() == first.content
+    cached.write_bytes(b"from the cache")
+    second = client.get("/api/download/export-job", params={"format": fmt})
+    assert second.content == b"from the cache"
+
+
+def test_download_rejects_unknown_formats(client):
+    response = client.get("/api/download/export-job", params={"format": "pdf"})
+    assert response.status_code == 400
+    assert client.get("/api/download/missing-job").status_code == 404
@@ -0,0 +1,61 @@
+"""
+Tests for reaping jobs that were left queued or running by a process that
+stopped, for the executor reporting the jobs it holds, and for the app's
+lifespan interrupting the jobs it drops at shutdown.
+"""
+
+import time
+
+from fastapi.testclient import TestClient
+
+from backend import main
+from backend.executor import JobExecutor
+
+
+def test_jobs_left_behind_are_reaped(monkeypatch):
+    monkeypatch.setitem(main.CONFIG["timeouts"], "stale_job_s", 60)
+    old = time.time() - 120
+    main.JOBS.create("reap-running", status="running", created_at=old)
+    main.JOBS.create("reap-cancelled", status="queued", cancel_requested=True, created_at=old)
+    main.JOBS.create("reap-fresh", status="running")
+    main.JOBS.create("reap-done", status="done", created_at=old)
+
+    reaped = set(main._reap_stale_jobs())
+    assert {"reap-running", "reap-cancelled"} <= reaped
+    assert not {"reap-fresh", "reap-done"} & reaped
+    assert main.JOBS.get("reap-running")["status"] == "error"
+    assert "Interrupted" in main.JOBS.get("reap-running")["error"]
+    assert main.JOBS.get("reap-cancelled")["status"] == "cancelled"
+    assert main.JOBS.get("reap-fresh")["status"] == "running"
+
+
+def test_heartbeat_keeps_a_job_alive(monkeypatch):
+    monkeypatch.setitem(main.CONFIG["timeouts"], "stale_job_s", 60)
+    main.JOBS.create("beating", status="running", created_at=time.time() - 120)
+    main.JOBS.update("beating", heartbeat_at=time.time())
+    assert "beating" not in main._reap_stale_jobs()
+
+
+def test_shutdown_returns_the_dropped_queue():
+    executor = JobExecutor({"scrape": {"workers": 0, "max_queued": 5}})
+    executor.submit("scrape", "queued-1", print)
+    executor.submit("scrape", "queued-2", print)
+    assert sorted(executor.job_ids()) == ["queued-1", "queued-2"]
+    assert executor.shutdown() == ["queued-1", "queued-2"]
+    assert executor.job_ids() == []
+
+
+def test_lifespan_interrupts_jobs_still_queued_at_shutdown(monkeypatch):
+    monkeypatch.setitem(main.CONFIG["api"], "warmup", False)
+    monkeypatch.setitem(main.RETENTION.settings, "interval_s", 0)
+    monkeypatch.setattr(main, "_EXECUTOR", JobExecutor({"scrape": {"workers": 0, "max_queued": 5}}))
+    main.JOBS.create("queued-at-shutdown", status="queued")
+    main._EXECUTOR.submit("scrape", "queued-at-shutdown", print)
+
+    with TestClient(main.app) as client:
+        assert client.get("/health").json()["startup"]["ready_s"] >= 0
+        assert not main._WATCHDOG_STOP.is_set()
+
+    assert main._WATCHDOG_STOP.is_set()
+    job = main.JOBS.get("queued-at-shutdown")
+    assert job["status"] == "error" and "before the job started" in job["error"]
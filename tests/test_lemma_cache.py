@@ -0,0 +1,55 @@
+"""
+Tests for the lemma cache: least recently used rows are evicted past
+``max_entries``, and a new spaCy model or version misses every old key.
+"""
+
+import sys
+import types
+
+import pytest
+
+from backend import lemma_cache
+from backend.lemma_cache import LemmaCache, spacy_model_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Deterministic time for last_used; advance with ``clock.now += 1``."""
+    clock = types.SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(lemma_cache, "time", types.SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+
+def test_least_recently_used_rows_are_evicted(tmp_path, clock):
+    cache = LemmaCache(str(tmp_path / "lemmas.sqlite3"), max_entries=3)
+    for h in ("a", "b", "c"):
+        cache.put_many({h: f"lemmas {h}"}, "nl")
+        clock.now += 1
+    cache.get_many(["a"], "nl")  # "b" is now the least recently used
+    clock.now += 1
+
+    cache.put_many({"d": "lemmas d"}, "nl")
+
+    assert cache.get_many(["a", "b", "c", "d"], "nl") == {"a": "lemmas a", "c": "lemmas c", "d": "lemmas d"}
+    assert cache.stats()["entries"] == 3
+
+
+def test_model_key_changes_with_spacy_model_or_version(tmp_path, monkeypatch):
+    versions = {"nl_core_news_lg": "3.7.0"}
+    spacy = types.ModuleType("spacy")
+    spacy.__version__ = "3.7.2"
+    spacy.util = types.SimpleNamespace(get_package_version=versions.get)
+    monkeypatch.setitem(sys.modules, "spacy", spacy)
+
+    cache = LemmaCache(str(tmp_path / "lemmas.sqlite3"))
+    old_key = spacy_model_key("nl_core_news_lg")
+    assert old_key == "nl_core_news_lg==3.7.0/spacy==3.7.2"
+    cache.put_many({"h": "lemmas"}, old_key)
+    assert cache.get_many(["h"], spacy_model_key("nl_core_news_lg")) == {"h": "lemmas"}
+
+    versions["nl_core_news_lg"] = "3.8.0"
+    assert cache.get_many(["h"], spacy_model_key("nl_core_news_lg")) == {}
+    versions["nl_core_news_lg"] = "3.7.0"
+    spacy.__version__ = "3.8.1"
+    assert cache.get_many(["h"], spacy_model_key("nl_core_news_lg")) == {}
+    assert cache.get_many(["h"], spacy_model_key("nl_core_news_md")) == {}
@@ -0,0 +1,70 @@
+"""
+Tests for metrics: cumulative histogram buckets, merging per-worker
+snapshots, job deltas and the Prometheus text rendering of counters,
+gauges and histograms.
+"""
+
+from backend.metrics import BUCKETS, Registry, diff, merge, render
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    for value in (0.003, 0.2, 0.2, 7, 5000):
+        registry.observe("ria_stage_seconds", value, stage="fetch")
+
+    buckets, total, count = registry.snapshot()[("ria_stage_seconds", (("stage", "fetch"),))]
+    by_bound = dict(zip(BUCKETS, buckets))
+    assert (by_bound[0.005], by_bound[0.25], by_bound[10], by_bound[1800]) == (1, 3, 4, 4)
+    assert (total, count) == (5007.403, 5)
+
+
+def test_merge_sums_worker_snapshots():
+    first, second = Registry(), Registry()
+    first.inc("ria_documents_total", 3, stage="scraped")
+    second.inc("ria_documents_total", 4, stage="scraped")
+    second.inc("ria_documents_total", 1, stage="predicted")
+    first.observe("ria_stage_seconds", 0.01, stage="fetch")
+    second.observe("ria_stage_seconds", 1, stage="fetch")
+    before = first.snapshot()
+
+    merged = merge(first.snapshot(), second.snapshot())
+
+    assert merged[("ria_documents_total", (("stage", "scraped"),))] == 7
+    assert merged[("ria_documents_total", (("stage", "predicted"),))] == 1
+    buckets, total, count = merged[("ria_stage_seconds", (("stage", "fetch"),))]
+    assert (buckets[BUCKETS.index(0.01)], buckets[BUCKETS.index(1)], total, count) == (1, 2, 1.01, 2)
+    assert first.snapshot() == before  # merging never changes its inputs
+
+    first.inc("ria_documents_total", 2, stage="scraped")
+    assert diff(first.snapshot(), before) == {("ria_documents_total", (("stage", "scraped"),)): 2}
+
+
+def test_render_counter_gauge_and_histogram():
+    registry = Registry()
+    registry.inc("ria_cache_lookups_total", 2, cache="lemma", result="hit")
+    registry.set("ria_storage_bytes", 524288000, kind="results")
+    registry.set("ria_storage_bytes", 1.5, kind="exports")
+    registry.observe("ria_job_seconds", 42, kind='scrape "daily"')
+
+    lines = render(registry.snapshot()).splitlines()
+
+    assert lines[:3] == [
+        "# HELP ria_cache_lookups_total Cache lookups by cache and result (hit/miss).",
+        "# TYPE ria_cache_lookups_total counter",
+        'ria_cache_lookups_total{cache="lemma",result="hit"} 2',
+    ]
+    assert "# TYPE ria_job_seconds histogram" in lines
+    assert 'ria_job_seconds_bucket{kind="scrape \\"daily\\"",le="30"} 0' in lines
+    assert 'ria_job_seconds_bucket{kind="scrape \\"daily\\"",le="60"} 1' in lines
+    assert 'ria_job_seconds_bucket{kind="scrape \\"daily\\"",le="+Inf"} 1' in lines
+    assert 'ria_job_seconds_sum{kind="scrape \\"daily\\""} 42.000000' in lines
+    assert 'ria_job_seconds_count{kind="scrape \\"daily\\""} 1' in lines
+    assert "# TYPE ria_storage_bytes gauge" in lines
+    assert 'ria_storage_bytes{kind="results"} 524288000' in lines
+    assert 'ria_storage_bytes{kind="exports"} 1.5' in lines
+
+
+def test_render_unknown_metric_is_untyped():
+    registry = Registry()
+    registry.inc("custom_total")
+    assert render(registry.snapshot()) == "# HELP custom_total \n# TYPE custom_total untyped\ncustom_total 1\n"
@@ -0,0 +1,77 @@
+"""
+Tests for hot-swapping model artifacts: a newer timestamped artifact set is
+loaded and swapped in by reference, a failed load keeps the current bundle,
+and the watcher thread picks new artifacts up on its own.
+"""
+
+import time
+
+import pytest
+
+from backend import predictor
+from backend.predictor import ModelBundle, ModelRegistry, _artifact_id
+
+
+@pytest.fixture
+def model_location(tmp_path, monkeypatch):
+    """Model folder with one embedder artifact set; loading is stubbed."""
+    def load_bundle(config, mode, paths=None, previous=None):
+        paths = paths or predictor._artifact_paths(config["model_location"], mode)
+        with open(paths["weights"]) as f:
+            if f.read() == "corrupt":
+                raise OSError("unable to open the weights file")
+        return ModelBundle(mode=mode, artifact_id=_artifact_id(mode, paths), paths=paths, model=object())
+
+    monkeypatch.setattr(predictor, "_load_bundle", load_bundle)
+    (tmp_path / "lstm").mkdir()
+    add_artifacts(tmp_path, "1742571401.1")
+    return tmp_path
+
+
+def add_artifacts(location, stamp, weights=""):
+    (location / "lstm" / f"{stamp}__model.json").write_text("{}")
+    (location / "lstm" / f"{stamp}__model.h5").write_text(weights)
+
+
+def test_newer_artifacts_are_swapped_in_by_reference(model_location):
+    registry = ModelRegistry({"model_location": str(model_location), "embedder_or_tokenizer": "embedder"})
+    in_flight = registry.get()
+    assert in_flight.artifact_id == "embedder:1742571401.1"
+    assert registry.refresh() == []
+
+    add_artifacts(model_location, "1750000000.5")
+    assert registry.refresh() == ["embedder"]
+
+    swapped = registry.get()
+    assert swapped.artifact_id == "embedder:1750000000.5"
+    # A prediction holding the old bundle finishes on it
+    assert in_flight.artifact_id == "embedder:1742571401.1" and in_flight is not swapped
+    assert registry.refresh() == [] and registry.get() is swapped
+
+
+def test_failed_load_keeps_the_current_bundle(model_location):
+    registry = ModelRegistry({"model_location": str(model_location), "embedder_or_tokenizer": "embedder"})
+    current = registry.get()
+
+    add_artifacts(model_location, "1750000000.5", weights="corrupt")
+    assert registry.refresh() == []
+    assert registry.get() is current
+
+    # Fixed on disk: the next refresh picks it up
+    add_artifacts(model_location, "1750000000.5")
+    assert registry.refresh() == ["embedder"]
+    assert registry.get().artifact_id == "embedder:1750000000.5"
+
+
+def test_watcher_swaps_new_artifacts(model_location):
+    registry = ModelRegistry({"model_location": str(model_location), "embedder_or_tokenizer": "embedder"})
+    registry.get()
+    registry.start_watching(interval=0.02)
+    try:
+        add_artifacts(model_location, "1750000000.5")
+        deadline = time.monotonic() + 3
+        while registry.get().artifact_id != "embedder:1750000000.5" and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert registry.get().artifact_id == "embedder:1750000000.5"
+    finally:
+        registry.stop_watching()
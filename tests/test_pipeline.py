@@ -0,0 +1,138 @@
+"""
+Tests for the pipelined scrape → classify → ingest/predict job, with the
+scraper, predictor and law store replaced by in-memory stand-ins.
+"""
+
+import itertools
+import sys
+import threading
+import types
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from backend.pipeline import _Channel, _Stop, run_pipeline
+
+CONFIG = {
+    "scraping": {"url_searchpage": "https://example.invalid/search"},
+    "predictions": {"predict_batch_size": 4},
+    "pipeline": {"fetch_workers": 2, "queue_size": 4, "embed_batch_docs": 2,
+                 "batch_max_wait_s": 0.05, "progress_interval_s": 0.05},
+    "timeouts": {},
+}
+
+
+class Writer:
+    def __init__(self):
+        self.rows = []
+
+    def write(self, rows):
+        self.rows.extend(rows)
+
+
+def listing(n):
+    def iter_listing(**kwargs):
+        items = range(n) if n is not None else itertools.count()
+        for i in items:
+            yield {"ref_number": str(i), "doc_type": "Wet", "pub_date": "2025-01-01"}
+    return iter_listing
+
+
+def fetch_detail(item, cancel=None, timeout=None):
+    item["long_text"] = f"text {item['ref_number']}"
+    return item
+
+
+def classify_document(item):
+    item["embed"] = True
+    item["articles"] = [{"article_num": "1", "text": item["long_text"]}]
+    return item
+
+
+def predict_in_batches(batch, config, batch_size, stats):
+    yield pd.DataFrame(batch).assign(prediction=1.0)
+
+
+@pytest.fixture
+def stages(monkeypatch):
+    """Install stand-ins for the modules run_pipeline imports; returns them."""
+    scraper = types.SimpleNamespace(iter_listing=listing(10), fetch_detail=fetch_detail,
+                                    classify_document=classify_document)
+    predictor = types.SimpleNamespace(predict_in_batches=predict_in_batches)
+    stored = []
+    law_store = types.SimpleNamespace(create_table=lambda: None,
+                                      store_chunks=lambda batch, cancel=None: stored.extend(batch) or len(batch))
+    monkeypatch.setitem(sys.modules, "backend.scraper", scraper)
+    monkeypatch.setitem(sys.modules, "backend.predictor", predictor)
+    monkeypatch.setitem(sys.modules, "backend.law_store", law_store)
+    return types.SimpleNamespace(scraper=scraper, law_store=law_store, stored=stored)
+
+
+def run(ingest=True):
+    writer = Writer()
+    report = run_pipeline(date(2025, 1, 1), date(2025, 1, 1), ["Wet"], CONFIG, writer, ingest=ingest)
+    return report, writer
+
+
+def test_channel_ends_once_every_producer_closed():
+    channel = _Channel(8, threading.Event(), producers=2)
+    channel.put(1)
+    channel.close()
+    channel.put(2)
+    channel.close()
+    assert list(channel) == [1, 2]
+    assert list(channel) == []  # later consumers see the end too
+
+
+def test_stop_unblocks_a_full_channel():
+    stop = threading.Event()
+    channel = _Channel(1, stop)
+    channel.put(1)
+    raised = []
+
+    def producer():
+        try:
+            channel.put(2)
+        except _Stop:
+            raised.append(True)
+
+    thread = threading.Thread(target=producer)
+    thread.start()
+    stop.set()
+    thread.join(timeout=2)
+    assert raised == [True]
+
+
+def test_every_document_is_predicted_and_stored(stages):
+    report, writer = run()
+    assert sorted(row["ref_number"] for row in writer.rows) == [str(i) for i in range(10)]
+    assert report["predicted"] == report["listed"] == 10
+    assert report["embedded_docs"] == len(stages.stored) == 10
+    assert report["embed_error"] is None
+    assert report["queued"] == {"fetch": 0, "classify": 0, "predict": 0, "embed": 0}
+
+
+def test_embed_failure_keeps_predicting(stages):
+    def store_chunks(batch, cancel=None):
+        raise ConnectionError("database unreachable")
+
+    stages.law_store.store_chunks = store_chunks
+    report, writer = run()
+    assert len(writer.rows) == 10
+    assert report["embedded_docs"] == 0
+    assert report["embed_error"] == "database unreachable"
+
+
+def test_stage_failure_stops_the_pipeline(stages):
+    def failing_fetch(item, cancel=None, timeout=None):
+        if item["ref_number"] == "3":
+            raise ValueError("bad page")
+        return fetch_detail(item)
+
+    # An endless listing only ends because the failure stops every stage
+    stages.scraper.iter_listing = listing(None)
+    stages.scraper.fetch_detail = failing_fetch
+    with pytest.raises(RuntimeError, match="fetch: bad page"):
+        run()
+    assert not [t for t in threading.enumerate() if t.name.startswith("pipeline-")]
@@ -0,0 +1,64 @@
+"""
+Tests for serving predictions from the prediction cache: only rows whose
+numac and input text both match are served, empty texts are never cached,
+rows are kept per model across a hot swap and evicted by model age and size.
+"""
+
+import time
+
+import pandas as pd
+
+from backend.prediction_cache import PredictionCache
+from backend.predictor import _predict_with_cache
+
+
+def batch(texts):
+    return pd.DataFrame({"ref_number": [str(i) for i in range(len(texts))], "long_text": texts})
+
+
+def test_changed_or_empty_texts_are_predicted_again(tmp_path):
+    cache = PredictionCache(str(tmp_path / "predictions.sqlite3"))
+    predicted = []
+
+    def predict(rows, stats):
+        predicted.append(rows["long_text"].tolist())
+        return rows.assign(prediction=1.0, certainty=0.5)
+
+    _predict_with_cache(batch(["a", "", "c"]), "model-1", predict, cache, {})
+    stats = {}
+    result = _predict_with_cache(batch(["a", "", "changed"]), "model-1", predict, cache, stats)
+
+    assert predicted == [["a", "", "c"], ["", "changed"]]
+    assert stats == {"cached": 1, "predicted": 2}
+    assert result["prediction"].tolist() == [1.0, 1.0, 1.0]
+
+
+def test_a_worker_on_the_previous_model_keeps_the_new_models_rows(tmp_path):
+    path = str(tmp_path / "predictions.sqlite3")
+    new_worker, old_worker = PredictionCache(path), PredictionCache(path)
+    key = ("2025000001", "hash")
+
+    new_worker.use_model("model-2")
+    new_worker.put_many({key: (1.0, 0.8)}, "model-2")
+    # Freshly spawned worker whose registry still serves model-1
+    old_worker.use_model("model-1")
+    old_worker.put_many({key: (0.0, -0.4)}, "model-1")
+
+    assert new_worker.get_many([key], "model-2") == {key: (1.0, 0.8)}
+    assert old_worker.get_many([key], "model-1") == {key: (0.0, -0.4)}
+
+
+def test_eviction_drops_unused_models_then_the_oldest_rows(tmp_path):
+    cache = PredictionCache(str(tmp_path / "predictions.sqlite3"), max_model_age_s=100, max_entries=2)
+    keys = [(f"20250000{i}", "hash") for i in range(3)]
+    cache.use_model("old", now=1000)
+    cache.put_many({keys[0]: (1.0, 0.5)}, "old")
+    cache.use_model("current", now=1000)
+    cache.put_many({key: (1.0, 0.5) for key in keys}, "current")
+
+    # Much later: "current" is still predicting, "old" has not been used since
+    later = time.time() + 1000
+    cache.use_model("current", now=later)
+    assert cache.evict(now=later) == 1 + 1  # the row of "old", then one row over max_entries
+    assert cache.get_many(keys[:1], "old") == {}
+    assert len(cache.get_many(keys, "current")) == 2
@@ -0,0 +1,70 @@
+"""
+Parity tests for the fused normalization + PCA projection.
+Compares the two-step tokenizer-mode path ((x - means) / stds, then
+pca.transform) with the fused sparse projection on the synthetic artifacts
+of scripts/bench_projection.py, which times the two. Without PCA, the
+normalization folded into the first Dense layer is checked at the shipped
+nn network's shape.
+"""
+
+import numpy as np
+from scipy import sparse
+
+from backend.predictor import fold_normalization, fuse_projection
+from backend.runtime import NumpyModel
+from scripts.bench_projection import DENSITY, fused, make_artifacts, two_step
+
+TOLERANCE = 1e-8
+
+# Input width and hidden units of model/classifier/nn/*__model.json
+NN_FEATURES = 20248
+NN_UNITS = 16
+
+
+def check_parity(whiten):
+    docs, norm_means, norm_stds, pca = make_artifacts(whiten=whiten)
+    expected = two_step(docs, norm_means, norm_stds, pca)
+    actual = fused(docs, fuse_projection(norm_means, norm_stds, pca))
+    error = float(np.max(np.abs(expected - actual)))
+    print(f"  [whiten={whiten!s:5s}] max |two-step - fused| = {error:.2e}")
+    assert error <= TOLERANCE * max(1.0, float(np.max(np.abs(expected))))
+
+
+def test_fused_projection_parity():
+    check_parity(whiten=False)
+
+
+def test_fused_projection_parity_whitened():
+    check_parity(whiten=True)
+
+
+def make_nn(seed=0):
+    rng = np.random.default_rng(seed)
+    model = NumpyModel([
+        ("Dense", {"activation": "relu", "units": NN_UNITS},
+         [rng.normal(0, 0.05, (NN_FEATURES, NN_UNITS)), rng.normal(0, 0.1, NN_UNITS)]),
+        ("Dropout", {}, []),
+        ("Dense", {"activation": "sigmoid", "units": 1},
+         [rng.normal(0, 0.5, (NN_UNITS, 1)), rng.normal(0, 0.1, 1)]),
+    ])
+    norm_means = rng.uniform(0, 0.05, NN_FEATURES)
+    norm_stds = rng.uniform(0.05, 1.0, NN_FEATURES)
+    docs = sparse.random(500, NN_FEATURES, density=DENSITY, format="csr", random_state=seed)
+    return docs, norm_means, norm_stds, model
+
+
+def test_folded_first_layer_parity():
+    docs, norm_means, norm_stds, model = make_nn()
+    expected = model.predict((docs.toarray() - norm_means) / norm_stds)
+    (weights, bias), tail = fold_normalization(norm_means, norm_stds, model)
+    assert weights.shape == (NN_FEATURES, NN_UNITS)
+    actual = tail.predict(np.asarray(docs @ weights) + bias)
+    error = float(np.max(np.abs(expected - actual)))
+    print(f"  [folded nn] max |two-step - folded| = {error:.2e}")
+    assert error <= 1e-5
+
+
+def test_fold_needs_a_leading_dense_layer():
+    lstm = NumpyModel([("LSTM", {"units": 2}, [np.zeros((3, 8)), np.zeros((2, 8)), np.zeros(8)])])
+    assert fold_normalization(np.zeros(3), np.ones(3), lstm) is None
+
@@ -0,0 +1,50 @@
+"""
+Tests for result files: the schema widens with later rows instead of being
+fixed by the first record batch, and incompatible values are rejected.
+"""
+
+import pyarrow as pa
+import pytest
+
+from backend import results
+from backend.results import ResultWriter, read_results, read_schema
+
+
+@pytest.fixture(autouse=True)
+def small_batches(monkeypatch):
+    monkeypatch.setattr(results, "BATCH_ROWS", 2)
+
+
+def write(path, rows):
+    with ResultWriter(str(path)) as writer:
+        writer.write(rows)
+
+
+def test_later_rows_widen_the_schema(tmp_path):
+    path = tmp_path / "job.arrow"
+    rows = [
+        {"n": 1, "empty": None},
+        {"n": 2, "empty": None},
+        {"n": 1.5, "empty": 2},
+        {"n": 3, "empty": None, "late": "x", "articles": [1, 2]},
+    ]
+    write(path, rows)
+
+    schema = read_schema(str(path))
+    assert schema.field("n").type == pa.float64()
+    assert schema.field("empty").type == pa.int64()
+    assert read_results(str(path)) == [
+        {"n": 1.0, "empty": None, "late": None, "articles": None},
+        {"n": 2.0, "empty": None, "late": None, "articles": None},
+        {"n": 1.5, "empty": 2, "late": None, "articles": None},
+        {"n": 3.0, "empty": None, "late": "x", "articles": [1, 2]},
+    ]
+    assert not (tmp_path / "job.arrow.tmp.old").exists()
+
+
+@pytest.mark.parametrize("late", [{"n": "text"}, {"n": [1]}])
+def test_incompatible_values_raise(tmp_path, late):
+    path = tmp_path / "job.arrow"
+    with pytest.raises(ValueError):
+        write(path, [{"n": 1}, {"n": 2}, late, late])
+    assert list(tmp_path.iterdir()) == []
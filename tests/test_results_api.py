@@ -0,0 +1,57 @@
+"""
+Tests for paging through a job's results: cursors round-trip across record
+batches, NDJSON resumes from a cursor, and malformed cursors answer 400.
+"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import main, results
+from backend.results import encode_cursor, write_results
+
+ROWS = [{"numac": str(i), "prediction": i / 10, "articles": [i]} for i in range(7)]
+
+
+@pytest.fixture
+def job_id(tmp_path, monkeypatch):
+    monkeypatch.setattr(results, "BATCH_ROWS", 3)
+    path = str(tmp_path / "results.arrow")
+    write_results(path, ROWS)
+    main.JOBS.create("paged", status="done", result_ref=path, count=len(ROWS))
+    yield "paged"
+    main.JOBS.delete("paged")
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app)
+
+
+def test_cursor_pages_cover_every_row_once(client, job_id):
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, "fields": "numac,articles"}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get(f"/api/jobs/{job_id}/results", params=params).json()
+        seen += page["data"]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [{"numac": r["numac"], "articles": r["articles"]} for r in ROWS]
+
+
+def test_ndjson_resumes_from_a_cursor(client, job_id):
+    response = client.get(f"/api/jobs/{job_id}/results",
+                          params={"format": "ndjson", "cursor": encode_cursor(4)})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line) for line in response.text.splitlines()] == ROWS[4:]
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor(-1)])
+def test_bad_cursors_are_rejected(client, job_id, cursor):
+    response = client.get(f"/api/jobs/{job_id}/results", params={"cursor": cursor})
+    assert response.status_code == 400
+    assert "Invalid cursor" in response.json()["detail"]
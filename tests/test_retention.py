@@ -0,0 +1,87 @@
+"""
+Tests for retention: TTL expiry, LRU eviction under the byte budget, and
+keeping the results a queued or running predict/ingest job still reads.
+"""
+
+import os
+
+import pytest
+
+from backend.job_store import SQLiteJobStore
+from backend.retention import Retention
+
+NOW = 1_000_000.0
+DAY = 86400
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+
+
+def retention(tmp_path, store, **settings):
+    return Retention(store, str(tmp_path / "results"), str(tmp_path / "exports"), settings)
+
+
+def add_job(tmp_path, store, job_id, status, age=0, used=NOW, size=100, **fields):
+    """Job record finished ``age`` seconds before NOW, with a result file of ``size`` bytes."""
+    path = tmp_path / "results" / f"{job_id}.arrow"
+    path.parent.mkdir(exist_ok=True)
+    path.write_bytes(b"x" * size)
+    os.utime(path, (used, used))
+    store.create(job_id, status=status, created_at=NOW - age, result_ref=str(path), **fields)
+    return path
+
+
+def test_ttl_expires_finished_jobs_only(tmp_path, store):
+    old = add_job(tmp_path, store, "old", "done", age=2 * DAY)
+    fresh = add_job(tmp_path, store, "fresh", "done", age=60)
+    running = add_job(tmp_path, store, "running", "running", age=2 * DAY)
+
+    usage = retention(tmp_path, store, ttl_s={"done": DAY}).sweep(NOW)
+
+    assert usage["expired_jobs"] == 1
+    assert "old" not in store and not old.exists()
+    assert fresh.exists() and running.exists() and "running" in store
+
+
+def test_budget_evicts_least_recently_used(tmp_path, store):
+    stale = add_job(tmp_path, store, "stale", "done", used=NOW - 3600)
+    recent = add_job(tmp_path, store, "recent", "done", used=NOW - 60)
+
+    usage = retention(tmp_path, store, max_result_bytes=150).sweep(NOW)
+
+    assert not stale.exists() and recent.exists()
+    assert store.get("stale")["result_ref"] is None
+    assert store.get("stale")["results_evicted"] == NOW
+    assert usage["result_bytes"] == 100
+
+
+def test_results_read_by_unfinished_jobs_are_kept(tmp_path, store):
+    scrape = add_job(tmp_path, store, "scrape", "done", age=2 * DAY, used=NOW - 3600)
+    other = add_job(tmp_path, store, "other", "done", used=NOW - 60)
+    store.create("predict", status="queued", created_at=NOW, scrape_job_id="scrape")
+    sweeper = retention(tmp_path, store, ttl_s={"done": DAY}, max_result_bytes=150)
+
+    sweeper.sweep(NOW)
+    assert scrape.exists() and "scrape" in store
+    assert not other.exists()
+
+    store.update("predict", status="done")
+    sweeper.sweep(NOW)
+    assert not scrape.exists() and "scrape" not in store
+
+
+def test_orphans_are_left_to_the_store_that_owns_them(tmp_path, store):
+    def sweep(owner):
+        Retention(store, str(tmp_path / "results"), str(tmp_path / "exports"), {}, owner=owner).sweep(NOW)
+
+    sweep("sqlite:///app")  # claims the folder
+    orphan = tmp_path / "results" / "orphan.arrow"
+    orphan.write_bytes(b"x")
+    os.utime(orphan, (NOW - DAY, NOW - DAY))
+
+    sweep("sqlite:///test")
+    assert orphan.exists()
+    sweep("sqlite:///app")
+    assert not orphan.exists()
@@ -0,0 +1,65 @@
+"""
+Parity test for the TensorFlow-free NumPy runtime.
+Rebuilds the shipped nn (tokenizer) and lstm (embedder) architectures from
+their model JSON, exports them to the runtime format and compares the
+predictions against Keras on random inputs.
+"""
+
+import json
+import os
+import tempfile
+
+from backend.predictor import _artifact_paths
+from backend.runtime import NumpyModel
+from scripts.export_runtime import max_parity_error, parity_inputs
+
+MODEL_LOCATION = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              "model", "classifier")
+TOLERANCE = 1e-5
+
+# Layer arguments that matter for the forward pass
+_LAYER_ARGS = ("units", "activation", "recurrent_activation", "use_bias",
+               "return_sequences", "go_backwards")
+
+
+def build_keras_model(model_json_path):
+    """Rebuild a shipped architecture layer by layer.
+
+    The lstm JSON was written by Keras 2, which Keras 3 cannot deserialize
+    directly; initialised weights are enough to compare the maths.
+    """
+    import keras
+
+    with open(model_json_path) as f:
+        layers = json.load(f)["config"]["layers"]
+
+    input_config = layers[0]["config"]
+    shape = input_config.get("batch_shape") or input_config["batch_input_shape"]
+    model = keras.Sequential([keras.Input(shape=tuple(shape[1:]))])
+    for layer in layers[1:]:
+        config = layer["config"]
+        layer_cls = getattr(keras.layers, layer["class_name"])
+        model.add(layer_cls(**{k: config[k] for k in _LAYER_ARGS if k in config}))
+    return model
+
+
+def check_parity(mode):
+    keras_model = build_keras_model(_artifact_paths(MODEL_LOCATION, mode)["model_json"])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model__runtime.npz")
+        NumpyModel.from_keras(keras_model).save(path)
+        numpy_model = NumpyModel.load(path)
+
+    error = max_parity_error(keras_model, numpy_model, parity_inputs(keras_model, n=8))
+    print(f"  [{mode:9s}] max |keras - numpy| = {error:.2e}")
+    assert error <= TOLERANCE, f"{mode}: runtime differs from Keras by {error:.2e}"
+
+
+def test_tokenizer_network_parity():
+    check_parity("tokenizer")
+
+
+def test_embedder_network_parity():
+    check_parity("embedder")
+
@@ -0,0 +1,107 @@
+"""
+Tests for the scrape cache: uncovered date ranges, assembling results from
+cached and freshly scraped days, and leaving incomplete days uncovered.
+"""
+
+from datetime import date
+
+from backend.scrape_cache import ScrapeCache, scrape_with_cache, uncovered_ranges
+
+TODAY = date(2025, 3, 1)
+
+
+def doc(doc_type, day, ref):
+    return {"doc_type": doc_type, "pub_date": day.isoformat(), "ref_number": ref}
+
+
+def fake_scraper(documents, incomplete=()):
+    """scrape callable over ``documents``; records the ranges it was asked for."""
+    calls = []
+
+    def scrape(doc_types, start, end, progress):
+        calls.append((doc_types, start, end))
+        found = [d for d in documents if d["doc_type"] in doc_types
+                 and start.isoformat() <= d["pub_date"] <= end.isoformat()]
+        for i in range(len(found)):
+            progress(i + 1, len(found))
+        return found, set(incomplete)
+
+    return scrape, calls
+
+
+def test_uncovered_ranges():
+    covered = {date(2025, 1, 2), date(2025, 1, 3), date(2025, 1, 6)}
+    assert uncovered_ranges(date(2025, 1, 1), date(2025, 1, 7), covered) == [
+        (date(2025, 1, 1), date(2025, 1, 1)),
+        (date(2025, 1, 4), date(2025, 1, 5)),
+        (date(2025, 1, 7), date(2025, 1, 7)),
+    ]
+    assert uncovered_ranges(date(2025, 1, 2), date(2025, 1, 3), covered) == []
+    assert uncovered_ranges(date(2025, 1, 1), date(2025, 1, 2), set()) == [
+        (date(2025, 1, 1), date(2025, 1, 2)),
+    ]
+
+
+def test_second_scrape_is_served_from_cache(tmp_path):
+    cache = ScrapeCache(str(tmp_path / "scrape.sqlite3"))
+    documents = [doc("Wet", date(2025, 1, 1), "a"), doc("Wet", date(2025, 1, 3), "b")]
+    scrape, calls = fake_scraper(documents)
+
+    first, stats = scrape_with_cache(cache, date(2025, 1, 1), date(2025, 1, 3), ["Wet"], scrape, TODAY)
+    assert first == documents
+    assert stats == {"cached_days": 0, "scraped_days": 3}
+
+    second, stats = scrape_with_cache(cache, date(2025, 1, 1), date(2025, 1, 4), ["Wet"], scrape, TODAY)
+    assert second == documents
+    assert stats == {"cached_days": 3, "scraped_days": 1}
+    assert calls[-1] == (["Wet"], date(2025, 1, 4), date(2025, 1, 4))
+
+
+def test_recent_days_are_not_cached(tmp_path):
+    cache = ScrapeCache(str(tmp_path / "scrape.sqlite3"), min_age_days=1)
+    scrape, _ = fake_scraper([])
+    scrape_with_cache(cache, date(2025, 2, 27), date(2025, 3, 1), ["Wet"], scrape, TODAY)
+    assert cache.covered_days("Wet", date(2025, 2, 27), date(2025, 3, 1)) == {
+        date(2025, 2, 27), date(2025, 2, 28),
+    }
+
+
+def test_failed_fetch_leaves_its_day_uncovered(tmp_path):
+    cache = ScrapeCache(str(tmp_path / "scrape.sqlite3"))
+    documents = [doc("Wet", date(2025, 1, 1), "a"), doc("Wet", date(2025, 1, 2), "b")]
+    scrape, _ = fake_scraper(documents, incomplete={("Wet", date(2025, 1, 2))})
+
+    scrape_with_cache(cache, date(2025, 1, 1), date(2025, 1, 3), ["Wet"], scrape, TODAY)
+    assert cache.covered_days("Wet", date(2025, 1, 1), date(2025, 1, 3)) == {
+        date(2025, 1, 1), date(2025, 1, 3),
+    }
+    assert [d for _, d in cache.get_documents("Wet", date(2025, 1, 1), date(2025, 1, 3))] == documents[:1]
+
+
+def test_truncated_listing_caches_nothing(tmp_path):
+    cache = ScrapeCache(str(tmp_path / "scrape.sqlite3"))
+    scrape, _ = fake_scraper([doc("Wet", date(2025, 1, 1), "a")], incomplete={("Wet", None)})
+
+    scrape_with_cache(cache, date(2025, 1, 1), date(2025, 1, 3), ["Wet"], scrape, TODAY)
+    assert cache.covered_days("Wet", date(2025, 1, 1), date(2025, 1, 3)) == set()
+
+
+def test_uncovered_days_are_scraped_once_for_all_doc_types(tmp_path):
+    cache = ScrapeCache(str(tmp_path / "scrape.sqlite3"))
+    documents = [doc("Wet", date(2025, 1, 1), "a"), doc("Decreet", date(2025, 1, 2), "b"),
+                 doc("Wet", date(2025, 1, 3), "c")]
+    scrape, calls = fake_scraper(documents)
+    scrape_with_cache(cache, date(2025, 1, 1), date(2025, 1, 1), ["Wet"], scrape, TODAY)
+
+    progress = []
+    result, stats = scrape_with_cache(cache, date(2025, 1, 1), date(2025, 1, 3), ["Wet", "Decreet"],
+                                      scrape, TODAY, lambda done, total: progress.append((done, total)))
+    # Decreet lacks day 1, so that day is scraped again for both types, in one call
+    assert calls[1:] == [(["Wet", "Decreet"], date(2025, 1, 1), date(2025, 1, 3))]
+    assert result == [documents[0], documents[2], documents[1]]
+    assert stats == {"cached_days": 0, "scraped_days": 6}
+    assert progress[-1] == (3, 3)
+    assert [done for done, _ in progress] == sorted(done for done, _ in progress)
+    assert cache.covered_days("Decreet", date(2025, 1, 1), date(2025, 1, 3)) == {
+        date(2025, 1, 1), date(2025, 1, 2), date(2025, 1, 3),
+    }